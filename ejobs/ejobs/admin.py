@@ -1,13 +1,15 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from django.contrib import admin
+from django.db.models import Avg, Count, Max, Sum
 from django.http import HttpResponse
 from django.template.response import TemplateResponse
 from django.urls import path
+from django.utils import timezone
 from vnpay.models import Billing
 
 from jobs.utils import get_statistics_user, get_statistics_job
-from jobs.models import Job, Employer, Seeker, User, Service, Technology, EmployerService
+from jobs.models import Job, Employer, Seeker, User, Service, Technology, EmployerService, SlowQuery
 
 class CustomAdminSite(admin.AdminSite):
     site_header = 'Quản trị hệ thống tìm kiếm việc làm'
@@ -18,6 +20,9 @@ class CustomAdminSite(admin.AdminSite):
         custom_urls = [
             path('stats_user/', self.admin_view(self.stats_user_view), name='stats_user'),
             path('stats_job/', self.admin_view(self.stats_job_view), name='stats_job'),
+            path('slow_queries/', self.admin_view(self.slow_queries_view), name='slow_queries'),
+            path('slow_queries/<str:fingerprint>/', self.admin_view(self.slow_query_detail_view),
+                 name='slow_query_detail'),
 
         ]
         return custom_urls + urls
@@ -63,6 +68,43 @@ class CustomAdminSite(admin.AdminSite):
         }
         return TemplateResponse(request, 'admin/stats_job.html', context)
 
+    def slow_queries_view(self, request):
+        # Truy vấn chậm gom theo fingerprint, nhóm tốn nhiều thời gian nhất lên đầu
+        days = request.GET.get('days', '7')
+        days = int(days) if days.isdigit() else 7
+        since = timezone.now() - timedelta(days=days)
+        groups = SlowQuery.objects.filter(created_date__gte=since).values('fingerprint').annotate(
+            count=Count('id'),
+            total_duration=Sum('duration'),
+            avg_duration=Avg('duration'),
+            max_duration=Max('duration'),
+            last_seen=Max('created_date'),
+            sql=Max('sql'),
+            view=Max('view'),
+        ).order_by('-total_duration')[:100]
+
+        context = {
+            **self.each_context(request),
+            'title': 'Truy vấn chậm',
+            'groups': groups,
+            'days': days,
+            'day_choices': [1, 7, 30],
+        }
+        return TemplateResponse(request, 'admin/slow_queries.html', context)
+
+    def slow_query_detail_view(self, request, fingerprint):
+        queries = SlowQuery.objects.filter(fingerprint=fingerprint)[:50]
+        views = SlowQuery.objects.filter(fingerprint=fingerprint).values('view') \
+            .annotate(count=Count('id'), avg_duration=Avg('duration')).order_by('-count')
+        context = {
+            **self.each_context(request),
+            'title': 'Truy vấn chậm',
+            'fingerprint': fingerprint,
+            'queries': queries,
+            'views': views,
+        }
+        return TemplateResponse(request, 'admin/slow_query_detail.html', context)
+
 class EmployerAdmin(admin.ModelAdmin):
     list_display = ['id', 'company_name', 'user', 'approval_status']
     search_fields = ['company_name']
@@ -81,7 +123,7 @@ class UserAdmin(admin.ModelAdmin):
 
 
 class ServiceAdmin(admin.ModelAdmin):
-    list_display = ['id', 'name']
+    list_display = ['id', 'name', 'code']
 
 
 admin_site = CustomAdminSite(name='custom_admin')
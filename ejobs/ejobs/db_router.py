@@ -0,0 +1,136 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject, empty
+
+# Trạng thái định tuyến của request hiện tại, None khi chạy ngoài request (command, shell...)
+_request_state = ContextVar('db_routing_state', default=None)
+
+# Đang ghi dữ liệu nội bộ (đẩy bộ đếm, log truy vấn chậm...), không tính là request đã ghi
+_internal_write = ContextVar('db_internal_write', default=False)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingState:
+    def __init__(self, request):
+        self.request = request
+        self.use_primary = request.method not in SAFE_METHODS
+        self.wrote = False
+        self.pins = {}
+
+    def is_pinned(self):
+        key = pin_key(self.request)
+        if key not in self.pins:
+            self.pins[key] = bool(cache.get(key))
+        return self.pins[key]
+
+
+def pin_key(request):
+    # Ghim theo người dùng, người chưa đăng nhập thì theo địa chỉ IP
+    user = getattr(request, 'user', None)
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        # Chưa xác thực xong, không ép tải user (tránh truy vấn session lồng nhau)
+        user = None
+    if user is not None and user.is_authenticated:
+        return f'db_pin:user:{user.pk}'
+    return f'db_pin:ip:{request.META.get("REMOTE_ADDR")}'
+
+
+class PrimaryReplicaRouter:
+    # Ghi luôn vào primary, đọc an toàn trong request được chuyển sang replica
+    def _replicas(self):
+        return getattr(settings, 'DATABASE_REPLICAS', [])
+
+    def db_for_read(self, model, **hints):
+        replicas = self._replicas()
+        state = _request_state.get()
+        if not replicas or state is None or state.use_primary or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state.is_pinned():
+            # Người dùng vừa ghi dữ liệu, đọc từ primary để thấy ngay thay đổi
+            state.use_primary = True
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None and not _internal_write.get():
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in self._replicas()
+
+
+class ReplicaRoutingMiddleware:
+    # View có thể ép đọc từ primary bằng thuộc tính primary_db_actions (True hoặc danh sách action)
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState(request)
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+
+        if state.wrote:
+            cache.set(pin_key(request), True, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _request_state.get()
+        if state is not None:
+            apply_primary_actions(state, request, view_func)
+        return None
+
+
+def apply_primary_actions(state, request, view_func):
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    primary_actions = getattr(view_class, 'primary_db_actions', None)
+    if not primary_actions:
+        return
+
+    action = getattr(view_func, 'actions', {}).get(request.method.lower())
+    if primary_actions is True or action in primary_actions:
+        state.use_primary = True
+
+
+@contextmanager
+def internal_writes():
+    # Ghi dữ liệu không do người dùng thay đổi: không ghim người dùng vào primary
+    # và các lần đọc sau trong request vẫn được chuyển sang replica
+    token = _internal_write.set(True)
+    try:
+        yield
+    finally:
+        _internal_write.reset(token)
+
+
+@contextmanager
+def subrequest_routing(request, view_func):
+    # Request con (batch API) được định tuyến như một request độc lập trong request cha
+    parent = _request_state.get()
+    state = RoutingState(request)
+    if parent is not None and parent.wrote:
+        # Request con trước đã ghi, các request con sau phải đọc từ primary
+        state.use_primary = True
+    apply_primary_actions(state, request, view_func)
+    token = _request_state.set(state)
+    try:
+        yield state
+    finally:
+        _request_state.reset(token)
+        if parent is not None and state.wrote:
+            parent.wrote = True
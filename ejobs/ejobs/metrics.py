@@ -0,0 +1,309 @@
+import atexit
+import fcntl
+import hmac
+import json
+import math
+import os
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+# Số liệu theo định dạng text của Prometheus. Mỗi process giữ số liệu trong bộ nhớ và định kỳ ghi ra
+# {METRICS_DIR}/{pid}.json, /metrics gộp file của mọi worker (gunicorn nhiều process)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+UPLOAD_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Số liệu đã cộng dồn của các process đã dừng
+ARCHIVE_FILE = 'archive.json'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labels):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values = {}
+
+    def key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labels)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    # Gauge của các process đang chạy được cộng lại
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self.registry.lock:
+            self.values[self.key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labels, buckets):
+        super().__init__(registry, name, documentation, labels)
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            # [số lần quan sát theo bucket (không cộng dồn)..., tổng]
+            sample = self.values.get(key)
+            if sample is None:
+                sample = self.values[key] = [0] * len(self.buckets) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample[index] += 1
+                    break
+            sample[-1] += value
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.flushed_at = 0
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter(self, name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()):
+        return self._register(Gauge(self, name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labels, buckets))
+
+    def reset(self):
+        # Process con sau fork không mang theo số liệu của process cha
+        with self.lock:
+            for metric in self.metrics.values():
+                metric.values.clear()
+            self.flushed_at = 0
+
+    def snapshot(self):
+        with self.lock:
+            return {name: [[list(key), value] for key, value in metric.values.items()]
+                    for name, metric in self.metrics.items() if metric.values}
+
+    def flush(self, force=False):
+        if not force and time.monotonic() - self.flushed_at < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self.flushed_at = time.monotonic()
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        _write(os.path.join(settings.METRICS_DIR, f'{os.getpid()}.json'), self.snapshot())
+
+    def collect(self):
+        # Gộp số liệu của mọi process: counter/histogram cộng cả process đã dừng, gauge chỉ tính process còn chạy.
+        # Khóa file để hai lần scrape đồng thời không cộng file của process đã dừng hai lần
+        self.flush(force=True)
+        with open(os.path.join(settings.METRICS_DIR, 'collect.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._archive_dead()
+            merged = {name: {} for name in self.metrics}
+            for filename in os.listdir(settings.METRICS_DIR):
+                if not filename.endswith('.json'):
+                    continue
+                alive = filename != ARCHIVE_FILE
+                for name, samples in (_read(os.path.join(settings.METRICS_DIR, filename)) or {}).items():
+                    metric = self.metrics.get(name)
+                    if metric is None or (metric.kind == 'gauge' and not alive):
+                        continue
+                    _merge(merged[name], metric, samples)
+        return merged
+
+    def _archive_dead(self):
+        # Cộng counter/histogram của process đã dừng vào một file chung rồi xóa file của process đó:
+        # số file không tăng theo số lần worker khởi động lại mà tổng vẫn không bị giảm
+        dead = [filename for filename in os.listdir(settings.METRICS_DIR)
+                if filename.endswith('.json') and filename != ARCHIVE_FILE
+                and not _is_alive(int(filename[:-len('.json')]))]
+        if not dead:
+            return
+        archive_path = os.path.join(settings.METRICS_DIR, ARCHIVE_FILE)
+        archive = {name: {tuple(key): value for key, value in samples}
+                   for name, samples in (_read(archive_path) or {}).items()}
+        for filename in dead:
+            for name, samples in (_read(os.path.join(settings.METRICS_DIR, filename)) or {}).items():
+                metric = self.metrics.get(name)
+                if metric is not None and metric.kind != 'gauge':
+                    _merge(archive.setdefault(name, {}), metric, samples)
+        _write(archive_path, {name: [[list(key), value] for key, value in samples.items()]
+                              for name, samples in archive.items()})
+        for filename in dead:
+            os.remove(os.path.join(settings.METRICS_DIR, filename))
+
+    def render(self):
+        lines = []
+        for name, samples in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for key, value in sorted(samples.items()):
+                labels = list(zip(metric.labels, key))
+                if metric.kind != 'histogram':
+                    lines.append(f'{name}{_labels(labels)} {value}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets, value):
+                    cumulative += count
+                    le = '+Inf' if bound == math.inf else str(bound)
+                    lines.append(f'{name}_bucket{_labels(labels + [("le", le)])} {cumulative}')
+                lines.append(f'{name}_sum{_labels(labels)} {value[-1]}')
+                lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path, data):
+    # Ghi ra file tạm rồi đổi tên để process khác không đọc phải file ghi dở
+    with open(path + '.tmp', 'w') as f:
+        json.dump(data, f)
+    os.replace(path + '.tmp', path)
+
+
+def _merge(merged, metric, samples):
+    for key, value in samples:
+        key = tuple(key)
+        if metric.kind == 'histogram':
+            total = merged.get(key, [0] * len(value))
+            merged[key] = [a + b for a, b in zip(total, value)]
+        else:
+            merged[key] = merged.get(key, 0) + value
+
+
+def _is_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Process của user khác vẫn đang chạy
+        pass
+    return True
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    escaped = ('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+               for name, value in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+registry = Registry()
+os.register_at_fork(after_in_child=registry.reset)
+
+REQUEST_LATENCY = registry.histogram(
+    'ejobs_http_request_duration_seconds', 'Thời gian xử lý request theo view/action', ['view', 'method', 'status'])
+REQUEST_QUERIES = registry.histogram(
+    'ejobs_http_request_db_queries', 'Số truy vấn DB mỗi request', ['view'], buckets=QUERY_BUCKETS)
+DB_QUERIES = registry.counter('ejobs_db_queries_total', 'Tổng số truy vấn DB', ['database'])
+CACHE_REQUESTS = registry.counter(
+    'ejobs_cache_requests_total', 'Số lần đọc cache theo loại, result là hit hoặc miss', ['cache', 'result'])
+QUEUE_DEPTH = registry.gauge('ejobs_queue_depth', 'Số mục đang chờ trong hàng đợi ghi của process', ['queue'])
+UPLOAD_DURATION = registry.histogram(
+    'ejobs_cloudinary_upload_duration_seconds', 'Thời gian tải file lên Cloudinary', ['outcome'],
+    buckets=UPLOAD_BUCKETS)
+
+
+def record_cache(cache_name, hit):
+    CACHE_REQUESTS.inc(cache=cache_name, result='hit' if hit else 'miss')
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unresolved'
+
+
+class MetricsMiddleware:
+    # Chỉ được thêm vào MIDDLEWARE khi ENABLE_METRICS
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_cloudinary()
+        atexit.register(registry.flush, force=True)
+
+    def __call__(self, request):
+        queries = {}
+
+        def count_query(execute, sql, params, many, context):
+            alias = context['connection'].alias
+            queries[alias] = queries.get(alias, 0) + 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(count_query))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        view = view_name(request)
+        REQUEST_LATENCY.observe(elapsed, view=view, method=request.method, status=response.status_code)
+        REQUEST_QUERIES.observe(sum(queries.values()), view=view)
+        for alias, count in queries.items():
+            DB_QUERIES.inc(count, database=alias)
+        registry.flush()
+        return response
+
+
+_cloudinary_instrumented = False
+
+
+def instrument_cloudinary():
+    # CloudinaryField tải file lên qua cloudinary.uploader.upload_resource, bọc hàm này để đo thời gian
+    global _cloudinary_instrumented
+    if _cloudinary_instrumented:
+        return
+    _cloudinary_instrumented = True
+    from cloudinary import uploader
+    upload_resource = uploader.upload_resource
+
+    def timed_upload_resource(*args, **kwargs):
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            result = upload_resource(*args, **kwargs)
+            outcome = 'success'
+            return result
+        finally:
+            UPLOAD_DURATION.observe(time.perf_counter() - start, outcome=outcome)
+
+    uploader.upload_resource = timed_upload_resource
+
+
+def metrics_view(request):
+    # Chưa cấu hình METRICS_TOKEN thì từ chối mọi request, không để lộ số liệu khi quên đặt token
+    token = settings.METRICS_TOKEN
+    if not token or not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,85 @@
+import atexit
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+
+HEADER = 'X-Profile'
+
+
+class ProfileStore:
+    # Gộp profile của các request được lấy mẫu theo từng view, ghi định kỳ ra file pstats
+    # ({view}.{pid}.prof, mỗi process một file để các worker không ghi đè lên nhau)
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.dirty = set()
+        self.flushed_at = time.monotonic()
+
+    def add(self, key, profiler):
+        with self.lock:
+            if key in self.stats:
+                self.stats[key].add(profiler)
+            else:
+                self.stats[key] = pstats.Stats(profiler)
+            self.dirty.add(key)
+            due = time.monotonic() - self.flushed_at >= settings.PROFILING_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+            for key in self.dirty:
+                path = os.path.join(settings.PROFILING_DIR, f'{key}.{os.getpid()}.prof')
+                # Ghi ra file tạm rồi đổi tên để lệnh gộp không đọc phải file ghi dở
+                self.stats[key].dump_stats(path + '.tmp')
+                os.replace(path + '.tmp', path)
+            self.dirty.clear()
+            self.flushed_at = time.monotonic()
+
+
+def view_key(request):
+    # Tên view (vd: statistics-applications-per-month) và method, dùng làm tên file
+    match = getattr(request, 'resolver_match', None)
+    name = match.view_name if match else 'unresolved'
+    return re.sub(r'[^\w.-]', '_', f'{name}.{request.method}')
+
+
+class ProfilingMiddleware:
+    # Chạy cProfile cho một phần request (PROFILING_SAMPLE_RATE) hoặc request có header
+    # X-Profile khớp PROFILING_TOKEN. Chỉ được thêm vào MIDDLEWARE khi ENABLE_PROFILING
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.store = ProfileStore()
+        atexit.register(self.store.flush)
+
+    def should_profile(self, request):
+        token = request.headers.get(HEADER)
+        if token and settings.PROFILING_TOKEN:
+            return hmac.compare_digest(token, settings.PROFILING_TOKEN)
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Đã có profiler khác chạy trong thread này
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        self.store.add(view_key(request), profiler)
+        response[HEADER] = 'sampled'
+        return response
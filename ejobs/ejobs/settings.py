@@ -27,6 +27,20 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['192.168.1.120']
 
+# Hồ sơ chạy, chọn bằng biến môi trường EJOBS_PROFILE:
+# web - worker phục vụ API, không nạp công cụ phát triển
+# dev - mặc định, có swagger/redoc
+# debug - như dev và bật thêm django-debug-toolbar
+PROFILE = os.environ.get('EJOBS_PROFILE', 'dev')
+ENABLE_API_DOCS = PROFILE in ('dev', 'debug')
+ENABLE_DEBUG_TOOLBAR = PROFILE == 'debug'
+# Lấy mẫu profile của request thật (ejobs/profiling.py), bật bằng biến môi trường EJOBS_PROFILING=1
+ENABLE_PROFILING = os.environ.get('EJOBS_PROFILING') == '1'
+# Số liệu Prometheus tại /metrics (ejobs/metrics.py), bật bằng biến môi trường EJOBS_METRICS=1
+ENABLE_METRICS = os.environ.get('EJOBS_METRICS') == '1'
+# Ghi lại truy vấn chậm (jobs/slow_queries.py), bật bằng biến môi trường EJOBS_SLOW_QUERY_LOG=1
+ENABLE_SLOW_QUERY_LOG = os.environ.get('EJOBS_SLOW_QUERY_LOG') == '1'
+
 
 # Application definition
 
@@ -40,14 +54,17 @@ INSTALLED_APPS = [
     'jobs.apps.JobsConfig',
     'rest_framework',
     'oauth2_provider',
-    'drf_yasg',
-    'debug_toolbar',
     'storages',
     's3direct',
     'vnpay',
     'corsheaders',
 ]
 
+if ENABLE_API_DOCS:
+    INSTALLED_APPS.append('drf_yasg')
+if ENABLE_DEBUG_TOOLBAR:
+    INSTALLED_APPS.append('debug_toolbar')
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -57,8 +74,22 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'ejobs.db_router.ReplicaRoutingMiddleware',
 ]
 
+if ENABLE_DEBUG_TOOLBAR:
+    MIDDLEWARE.insert(0, 'debug_toolbar.middleware.DebugToolbarMiddleware')
+    INTERNAL_IPS = ['127.0.0.1']
+
+if ENABLE_PROFILING:
+    MIDDLEWARE.insert(0, 'ejobs.profiling.ProfilingMiddleware')
+
+if ENABLE_METRICS:
+    MIDDLEWARE.insert(0, 'ejobs.metrics.MetricsMiddleware')
+
+if ENABLE_SLOW_QUERY_LOG:
+    MIDDLEWARE.append('jobs.slow_queries.SlowQueryMiddleware')
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 
@@ -66,8 +97,144 @@ REST_FRAMEWORK = {
     # 'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     # 'PAGE_SIZE': 4,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'oauth2_provider.contrib.rest_framework.OAuth2Authentication',
-    )
+        'jobs.authentication.CachedOAuth2Authentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'jobs.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    # Giới hạn request cho các endpoint dễ bị lạm dụng (jobs/throttling.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'otp_email': '3/m',
+        'otp_ip': '20/h',
+        'search_user': '60/m',
+        'search_ip': '120/m',
+        'apply_user': '10/m',
+    },
+}
+
+# Cache dùng chung giữa các worker (Redis, địa chỉ lấy từ biến môi trường EJOBS_REDIS_URL): token bị thu hồi
+# được xóa khỏi cache xác thực của mọi worker ngay lập tức.
+# Không đặt EJOBS_REDIS_URL thì dùng cache trong bộ nhớ của từng process, chỉ dành cho phát triển với một process
+REDIS_URL = os.environ.get('EJOBS_REDIS_URL', '')
+USE_LOCAL_CACHE = not REDIS_URL
+# Token bucket của throttle (jobs/throttling.py) dùng alias 'throttle', cập nhật nguyên tử trên Redis nên đúng với nhiều worker
+if USE_LOCAL_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'throttle': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'throttle',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        'throttle': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'throttle',
+        },
+    }
+
+# Thời gian tối đa (giây) lưu kết quả xác thực access token, không vượt quá hạn của token.
+# Với cache trong bộ nhớ, token bị thu hồi ở một worker vẫn hợp lệ ở worker khác tối đa chừng này giây
+OAUTH2_TOKEN_CACHE_TIMEOUT = 30 if USE_LOCAL_CACHE else 300
+
+# Thời gian tối đa (giây) lưu danh sách dịch vụ còn hiệu lực của nhà tuyển dụng
+ENTITLEMENT_CACHE_TIMEOUT = 600
+
+# Bộ đệm lượt xem/lượt hiển thị việc làm được ghi xuống DB sau mỗi khoảng thời gian (giây)
+# hoặc khi số việc làm trong bộ đệm đạt ngưỡng, bởi một luồng nền trong mỗi process (không ghi trong request)
+JOB_COUNTER_FLUSH_INTERVAL = 30
+JOB_COUNTER_MAX_BUFFER = 1000
+JOB_COUNTER_BACKGROUND_FLUSH = True
+
+# Chỉ mục gợi ý tìm kiếm (jobs/typeahead.py) được xây dựng lại định kỳ ở luồng nền để loại việc làm hết hạn (giây),
+# thay đổi việc làm từ worker khác được đọc từ nhật ký JobChange tối đa một lần mỗi TYPEAHEAD_SYNC_INTERVAL giây
+TYPEAHEAD_REBUILD_INTERVAL = 600
+TYPEAHEAD_SYNC_INTERVAL = 5
+TYPEAHEAD_BACKGROUND_REBUILD = True
+
+# Ma trận kỹ năng ứng viên (jobs/matching.py) được cập nhật khi sửa hồ sơ và xây dựng lại định kỳ (giây)
+SEEKER_MATRIX_REBUILD_INTERVAL = 3600
+
+# Danh sách việc làm nổi bật tính sẵn (jobs/featured.py): số việc làm mỗi danh sách, chu kỳ tính lại (giây),
+# khoảng cách tối thiểu giữa hai lần tính lại khi việc làm thay đổi (giây), số ngày gần đây của danh sách trending
+FEATURED_LIST_SIZE = 100
+FEATURED_LIST_REFRESH_INTERVAL = 300
+FEATURED_LIST_MIN_REBUILD_INTERVAL = 30
+FEATURED_TRENDING_DAYS = 30
+
+# Cụm việc làm trên bản đồ (jobs/clusters.py): số đếm theo ô geohash được tính sẵn, chu kỳ tính lại (giây) và
+# khoảng cách tối thiểu giữa hai lần tính lại khi việc làm thay đổi (giây)
+CLUSTER_REFRESH_INTERVAL = 300
+CLUSTER_MIN_REBUILD_INTERVAL = 30
+
+# Việc làm đề xuất cho ứng viên (jobs/recommendations.py): số việc làm tối đa được cache và thời gian cache (giây)
+RECOMMENDATION_LIMIT = 500
+RECOMMENDATION_CACHE_TIMEOUT = 6 * 60 * 60
+
+# Thời gian (giây) lưu kết quả của request có Idempotency-Key
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+# Việc làm hết hạn quá số ngày này được chuyển sang kho lưu trữ (manage.py archive_jobs)
+JOB_ARCHIVE_AFTER_DAYS = 90
+
+# Đồng bộ delta (jobs/changes): số thay đổi tối đa mỗi lần gọi, thay đổi mới hơn số giây này chưa được trả về
+# (chờ các transaction đồng thời commit xong), số ngày giữ nhật ký thay đổi (manage.py prune_job_changes)
+JOB_CHANGES_PAGE_SIZE = 500
+JOB_CHANGES_SETTLE_SECONDS = 10
+JOB_CHANGES_RETENTION_DAYS = 30
+
+# Số công việc tối đa trong một lần lưu/bỏ lưu hàng loạt (save_job/bulk_save, save_job/bulk_unsave)
+SAVE_JOB_BULK_LIMIT = 200
+
+# Số request con tối đa trong một lần gọi batch API (POST /batch/)
+BATCH_MAX_REQUESTS = 20
+
+# Profile request (khi ENABLE_PROFILING): tỉ lệ request được lấy mẫu, token của header X-Profile để
+# luôn profile một request (để trống thì tắt), thư mục lưu file pstats và chu kỳ ghi file (giây)
+PROFILING_SAMPLE_RATE = float(os.environ.get('EJOBS_PROFILING_SAMPLE_RATE', '0.01'))
+PROFILING_TOKEN = os.environ.get('EJOBS_PROFILING_TOKEN', '')
+PROFILING_DIR = os.environ.get('EJOBS_PROFILING_DIR', str(BASE_DIR / 'profiles'))
+PROFILING_FLUSH_INTERVAL = 60
+
+# Số liệu (khi ENABLE_METRICS): thư mục các worker ghi số liệu để gộp (xóa trống mỗi lần khởi động
+# lại gunicorn), chu kỳ ghi (giây) và token Bearer để đọc /metrics (để trống thì /metrics luôn trả về 403)
+METRICS_DIR = os.environ.get('EJOBS_METRICS_DIR', '/tmp/ejobs-metrics')
+METRICS_FLUSH_INTERVAL = 1
+METRICS_TOKEN = os.environ.get('EJOBS_METRICS_TOKEN', '')
+
+# Truy vấn chạy lâu hơn ngưỡng này (mili giây) được ghi vào log xoay vòng và bảng SlowQuery (khi ENABLE_SLOW_QUERY_LOG)
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('EJOBS_SLOW_QUERY_THRESHOLD_MS', '200'))
+SLOW_QUERY_LOG_FILE = os.environ.get('EJOBS_SLOW_QUERY_LOG_FILE', str(BASE_DIR / 'slow_queries.log'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'encoding': 'utf-8',
+        },
+    },
+    'loggers': {
+        'ejobs.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
 }
 
 ROOT_URLCONF = 'ejobs.urls'
@@ -124,6 +291,13 @@ DATABASES = {
     }
 }
 
+# Read replica: khai báo thêm các database bản sao trong DATABASES và liệt kê tên ở đây,
+# vd: 'replica': {..., 'TEST': {'MIRROR': 'default'}}
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['ejobs.db_router.PrimaryReplicaRouter']
+# Sau khi ghi, người dùng được đọc từ primary trong khoảng thời gian này (giây)
+REPLICA_PIN_SECONDS = 5
+
 AUTH_USER_MODEL = 'jobs.User'
 
 
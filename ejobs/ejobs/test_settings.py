@@ -0,0 +1,34 @@
+# Cấu hình chạy test: python manage.py test --settings=ejobs.test_settings
+# Dùng hai database SQLite (primary và replica) thay cho MySQL, cache trong bộ nhớ
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'test_default.sqlite3'),
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'test_replica.sqlite3'),
+    },
+}
+# Mặc định không đọc từ replica, test định tuyến tự bật bằng override_settings
+DATABASE_REPLICAS = []
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'throttle',
+    },
+}
+
+# Test gọi counters.flush() trực tiếp, không chạy luồng ghi nền
+JOB_COUNTER_BACKGROUND_FLUSH = False
+# Chỉ mục gợi ý được xây dựng lại ngay trong luồng gọi
+TYPEAHEAD_BACKGROUND_REBUILD = False
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+ALLOWED_HOSTS = ['*']
@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import TransactionTestCase, RequestFactory, override_settings
+
+from ejobs.db_router import ReplicaRoutingMiddleware, internal_writes
+from jobs.models import Technology
+
+
+def read_names(request):
+    return HttpResponse(','.join(Technology.objects.order_by('name').values_list('name', flat=True)))
+
+
+def create_technology(request):
+    Technology.objects.create(name='created')
+    return HttpResponse('ok')
+
+
+def internal_write_then_read(request):
+    with internal_writes():
+        Technology.objects.create(name='internal')
+    return read_names(request)
+
+
+def write_then_read(request):
+    Technology.objects.create(name='written')
+    return read_names(request)
+
+
+class PrimaryOnlyView:
+    primary_db_actions = True
+
+
+def primary_view(request):
+    return read_names(request)
+
+
+primary_view.cls = PrimaryOnlyView
+
+
+# Hai database SQLite độc lập: dữ liệu chỉ có trong replica cho biết lần đọc đã đi tới replica
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=60)
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        # TransactionTestCase không flush database được khai báo là replica (allow_migrate trả về False)
+        self.addCleanup(Technology.objects.using('replica').all().delete)
+        Technology.objects.using('default').create(name='primary')
+        Technology.objects.using('replica').create(name='replica')
+        self.factory = RequestFactory()
+
+    def call(self, view, method='get', remote_addr='10.0.0.1'):
+        request = getattr(self.factory, method)('/', REMOTE_ADDR=remote_addr)
+        middleware = ReplicaRoutingMiddleware(lambda request: middleware.process_view(request, view, (), {})
+                                              or view(request))
+        return middleware(request).content.decode()
+
+    def test_safe_read_goes_to_replica(self):
+        self.assertEqual(self.call(read_names), 'replica')
+
+    def test_read_outside_request_uses_primary(self):
+        self.assertEqual(read_names(None).content.decode(), 'primary')
+
+    def test_write_pins_user_to_primary(self):
+        self.call(create_technology, method='post')
+        self.assertEqual(Technology.objects.using('default').filter(name='created').count(), 1)
+        self.assertEqual(self.call(read_names), 'created,primary')
+        # Người dùng khác vẫn đọc từ replica
+        self.assertEqual(self.call(read_names, remote_addr='10.0.0.2'), 'replica')
+
+    def test_reads_after_write_in_same_request_use_primary(self):
+        self.assertEqual(self.call(write_then_read), 'primary,written')
+
+    def test_internal_write_does_not_pin(self):
+        self.assertEqual(self.call(internal_write_then_read), 'replica')
+        self.assertEqual(Technology.objects.using('default').filter(name='internal').count(), 1)
+        self.assertEqual(self.call(read_names), 'replica')
+
+    def test_primary_db_actions_override(self):
+        self.assertEqual(self.call(primary_view), 'primary')
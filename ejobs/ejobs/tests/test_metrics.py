@@ -0,0 +1,95 @@
+import json
+import os
+import subprocess
+import tempfile
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, RequestFactory, override_settings
+
+from ejobs import metrics
+from jobs import featured
+from jobs.featured import NEWEST
+from jobs.recommendations import recommended_job_ids
+from jobs.tests.factories import make_seeker
+from jobs.typeahead import index as typeahead_index
+
+
+def dead_pid():
+    process = subprocess.Popen(['true'])
+    process.wait()
+    return process.pid
+
+
+class MetricsDirMixin:
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        override = override_settings(METRICS_DIR=self.directory, METRICS_TOKEN='secret')
+        override.enable()
+        self.addCleanup(override.disable)
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+
+    def scrape(self, token='secret'):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        return metrics.metrics_view(RequestFactory().get('/metrics', **headers))
+
+    def cache_requests(self, name, result):
+        return metrics.registry.collect()['ejobs_cache_requests_total'].get((name, result), 0)
+
+
+class MetricsViewTests(MetricsDirMixin, SimpleTestCase):
+    def test_requires_token(self):
+        self.assertEqual(self.scrape(token=None).status_code, 403)
+        self.assertEqual(self.scrape(token='wrong').status_code, 403)
+        self.assertEqual(self.scrape().status_code, 200)
+
+    def test_empty_token_denies_all_requests(self):
+        with override_settings(METRICS_TOKEN=''):
+            self.assertEqual(self.scrape(token=None).status_code, 403)
+            self.assertEqual(self.scrape(token='').status_code, 403)
+
+    def test_dead_process_files_are_archived(self):
+        metrics.DB_QUERIES.inc(2, database='default')
+        for pid in (dead_pid(), dead_pid()):
+            with open(os.path.join(self.directory, f'{pid}.json'), 'w') as f:
+                json.dump({'ejobs_db_queries_total': [[['default'], 3]],
+                           'ejobs_queue_depth': [[['job_counters'], 7]]}, f)
+
+        self.assertIn('ejobs_db_queries_total{database="default"} 8', self.scrape().content.decode())
+        # Gauge của process đã dừng không được tính
+        self.assertNotIn(('job_counters',), metrics.registry.collect()['ejobs_queue_depth'])
+        self.assertEqual(sorted(name for name in os.listdir(self.directory) if name.endswith('.json')),
+                         sorted([metrics.ARCHIVE_FILE, f'{os.getpid()}.json']))
+
+        # Tổng không giảm sau khi file của process đã dừng bị xóa và không bị cộng hai lần
+        body = self.scrape().content.decode()
+        self.assertIn('ejobs_db_queries_total{database="default"} 8', body)
+
+
+class CacheHitMetricsTests(MetricsDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_featured_hits_and_misses(self):
+        featured.featured_ids(NEWEST)
+        featured.featured_ids(NEWEST)
+        self.assertEqual(self.cache_requests('featured', 'miss'), 1)
+        self.assertEqual(self.cache_requests('featured', 'hit'), 1)
+
+    @override_settings(JOB_CHANGES_SETTLE_SECONDS=0)
+    def test_recommendation_hits_and_misses(self):
+        seeker = make_seeker()
+        recommended_job_ids(seeker.pk)
+        recommended_job_ids(seeker.pk)
+        self.assertEqual(self.cache_requests('recommendations', 'miss'), 1)
+        self.assertEqual(self.cache_requests('recommendations', 'hit'), 1)
+
+    def test_typeahead_hits_and_misses(self):
+        typeahead_index.rebuild()
+        typeahead_index.suggest('dev')
+        typeahead_index.suggest('dev')
+        self.assertEqual(self.cache_requests('typeahead', 'miss'), 1)
+        self.assertEqual(self.cache_requests('typeahead', 'hit'), 1)
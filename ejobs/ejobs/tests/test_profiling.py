@@ -0,0 +1,99 @@
+import cProfile
+import os
+import pstats
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from django.urls import resolve
+
+from ejobs.profiling import HEADER, ProfilingMiddleware
+
+
+def work():
+    return sum(range(100))
+
+
+def view(request):
+    request.resolver_match = resolve('/statistics/')
+    work()
+    return HttpResponse()
+
+
+def profiled_calls(stats, name):
+    return sum(ncalls for (_, _, function), (_, ncalls, _, _, _) in stats.stats.items() if function == name)
+
+
+class ProfilingDirMixin:
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        override = override_settings(PROFILING_DIR=self.directory, PROFILING_TOKEN='secret',
+                                     PROFILING_SAMPLE_RATE=0, PROFILING_FLUSH_INTERVAL=60)
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class ProfilingMiddlewareTests(ProfilingDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        # Không ghi các mẫu còn lại ra PROFILING_DIR thật khi kết thúc chạy test
+        with mock.patch('ejobs.profiling.atexit.register'):
+            self.middleware = ProfilingMiddleware(view)
+
+    def call(self, **headers):
+        return self.middleware(RequestFactory().get('/statistics/', headers=headers))
+
+    def test_token_header_is_profiled(self):
+        self.assertEqual(self.call(**{HEADER: 'secret'})[HEADER], 'sampled')
+        self.assertNotIn(HEADER, self.call(**{HEADER: 'wrong'}))
+        self.assertNotIn(HEADER, self.call())
+
+    def test_header_is_ignored_without_token(self):
+        with override_settings(PROFILING_TOKEN=''):
+            self.assertNotIn(HEADER, self.call(**{HEADER: ''}))
+            self.assertNotIn(HEADER, self.call(**{HEADER: 'secret'}))
+
+    def test_sampling(self):
+        with override_settings(PROFILING_SAMPLE_RATE=0.5), \
+                mock.patch('ejobs.profiling.random.random', side_effect=[0.4, 0.6]):
+            self.assertIn(HEADER, self.call())
+            self.assertNotIn(HEADER, self.call())
+
+    def test_samples_are_merged_per_view(self):
+        for _ in range(3):
+            self.call(**{HEADER: 'secret'})
+        self.middleware.store.flush()
+        self.assertEqual(os.listdir(self.directory), [f'statistics-list.GET.{os.getpid()}.prof'])
+        stats = pstats.Stats(os.path.join(self.directory, os.listdir(self.directory)[0]))
+        self.assertEqual(profiled_calls(stats, 'work'), 3)
+
+
+class ProfileReportTests(ProfilingDirMixin, SimpleTestCase):
+    def write_profile(self, name, calls):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for _ in range(calls):
+            work()
+        profiler.disable()
+        profiler.dump_stats(os.path.join(self.directory, name))
+
+    def test_merges_files_of_each_view(self):
+        self.write_profile('statistics-list.GET.100.prof', 2)
+        self.write_profile('statistics-list.GET.200.prof', 3)
+        self.write_profile('job-list.GET.100.prof', 1)
+        output = tempfile.TemporaryDirectory()
+        self.addCleanup(output.cleanup)
+
+        stdout = StringIO()
+        call_command('profile_report', view='statistics', output=output.name, stdout=stdout)
+        self.assertIn('statistics-list.GET:', stdout.getvalue())
+        self.assertIn('2 file', stdout.getvalue())
+        self.assertNotIn('job-list', stdout.getvalue())
+        self.assertEqual(os.listdir(output.name), ['statistics-list.GET.prof'])
+        merged = pstats.Stats(os.path.join(output.name, 'statistics-list.GET.prof'))
+        self.assertEqual(profiled_calls(merged, 'work'), 5)
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, When, Value
+from django.utils import timezone
+
+from .models import Job, JobApplication, SaveJob, JobCounter, ArchivedJob, ArchivedJobApplication, ArchivedSaveJob
+
+# Các cột được chép giữa bảng chính và bảng lưu trữ
+JOB_FIELDS = ['id', 'employer_id', 'title', 'description', 'requirements', 'location', 'location_detail', 'salary',
+              'expiration_date', 'experience', 'quantity', 'latitude', 'longitude', 'is_active', 'created_date',
+              'updated_date']
+APPLICATION_FIELDS = ['id', 'job_id', 'seeker_id', 'cover_letter', 'status', 'cv', 'email', 'phone', 'name',
+                      'is_active', 'created_date', 'updated_date']
+SAVE_FIELDS = ['id', 'job_id', 'seeker_id', 'created_date']
+
+
+def _copy(model, obj, fields):
+    return model(**{name: getattr(obj, name) for name in fields})
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = settings.JOB_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable_jobs(cutoff):
+    return Job.objects.filter(expiration_date__lt=cutoff)
+
+
+def archive_expired_jobs(days=None, batch_size=500):
+    # Chuyển việc làm đã hết hạn quá `days` ngày sang kho lưu trữ, mỗi lô một transaction
+    cutoff = archive_cutoff(days)
+    total = 0
+    while True:
+        archived = archive_batch(cutoff, batch_size)
+        if not archived:
+            return total
+        total += archived
+
+
+def archive_batch(cutoff, batch_size):
+    with transaction.atomic():
+        # Bỏ qua việc làm đang bị request khác khóa, lần chạy sau sẽ lưu trữ
+        jobs = list(archivable_jobs(cutoff).select_for_update(skip_locked=True).order_by('id')[:batch_size])
+        if not jobs:
+            return 0
+        job_ids = [job.id for job in jobs]
+
+        counters = dict((job_id, (views, impressions)) for job_id, views, impressions in
+                        JobCounter.objects.filter(job_id__in=job_ids).values_list('job_id', 'views', 'impressions'))
+        archived_jobs = []
+        for job in jobs:
+            archived_job = _copy(ArchivedJob, job, JOB_FIELDS)
+            archived_job.views, archived_job.impressions = counters.get(job.id, (0, 0))
+            archived_jobs.append(archived_job)
+        ArchivedJob.objects.bulk_create(archived_jobs)
+
+        through = ArchivedJob.technologies.through
+        through.objects.bulk_create([
+            through(archivedjob_id=job_id, technology_id=technology_id)
+            for job_id, technology_id in
+            Job.technologies.through.objects.filter(job_id__in=job_ids).values_list('job_id', 'technology_id')
+        ])
+        ArchivedJobApplication.objects.bulk_create([
+            _copy(ArchivedJobApplication, application, APPLICATION_FIELDS)
+            for application in JobApplication.objects.filter(job_id__in=job_ids).iterator()
+        ], batch_size=1000)
+        ArchivedSaveJob.objects.bulk_create([
+            _copy(ArchivedSaveJob, save, SAVE_FIELDS)
+            for save in SaveJob.objects.filter(job_id__in=job_ids).iterator()
+        ], batch_size=1000)
+
+        # Xóa việc làm, đơn ứng tuyển/lượt lưu/bộ đếm bị xóa theo (CASCADE)
+        Job.objects.filter(id__in=job_ids).delete()
+    return len(job_ids)
+
+
+def _keep_dates(model, objects, fields):
+    # save()/bulk_create() ghi đè các trường auto_now/auto_now_add, đặt lại giá trị gốc bằng một UPDATE
+    for start in range(0, len(objects), 500):
+        chunk = objects[start:start + 500]
+        model.objects.filter(pk__in=[obj.pk for obj in chunk]).update(**{
+            name: Case(*[When(pk=obj.pk, then=Value(getattr(obj, name))) for obj in chunk],
+                       output_field=model._meta.get_field(name))
+            for name in fields
+        })
+
+
+def restore_job(job_id, expiration_date):
+    # Đưa việc làm cùng đơn ứng tuyển và lượt lưu trở lại bảng chính, giữ nguyên id.
+    # Việc làm trong kho đã hết hạn nên phải có hạn nộp mới, nếu không lần lưu trữ sau sẽ chuyển lại ngay
+    if expiration_date <= timezone.now():
+        raise ValueError('Ngày hết hạn mới phải sau thời điểm hiện tại')
+    with transaction.atomic():
+        archived_job = ArchivedJob.objects.select_for_update().get(pk=job_id)
+        applications = list(archived_job.applications.all())
+        saves = list(archived_job.saves.all())
+
+        job = _copy(Job, archived_job, JOB_FIELDS)
+        job.expiration_date = expiration_date
+        job.save(force_insert=True)
+        job.technologies.set(archived_job.technologies.values_list('id', flat=True))
+        _keep_dates(Job, [archived_job], ['created_date', 'updated_date'])
+
+        if archived_job.views or archived_job.impressions:
+            JobCounter.objects.create(job=job, views=archived_job.views, impressions=archived_job.impressions)
+
+        JobApplication.objects.bulk_create([_copy(JobApplication, a, APPLICATION_FIELDS) for a in applications],
+                                           batch_size=1000)
+        _keep_dates(JobApplication, applications, ['created_date', 'updated_date'])
+        SaveJob.objects.bulk_create([_copy(SaveJob, s, SAVE_FIELDS) for s in saves], batch_size=1000)
+        _keep_dates(SaveJob, saves, ['created_date'])
+
+        archived_job.delete()
+    job.refresh_from_db()
+    return job
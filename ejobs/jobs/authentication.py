@@ -0,0 +1,83 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from oauth2_provider.contrib.rest_framework import OAuth2Authentication
+from oauth2_provider.models import AccessToken
+
+from ejobs.metrics import record_cache
+from .models import User
+
+# Các trường của User được lưu trong cache, các trường khác sẽ được tải khi cần
+PRINCIPAL_FIELDS = ['id', 'username', 'email', 'avatar', 'role', 'is_active', 'is_staff', 'is_superuser']
+
+
+def token_cache_key(token):
+    return 'oauth_token:' + hashlib.sha256(token.encode()).hexdigest()
+
+
+def invalidate_token(token):
+    cache.delete(token_cache_key(token))
+
+
+def invalidate_user_tokens(user_id):
+    tokens = AccessToken.objects.filter(user_id=user_id).values_list('token', flat=True)
+    cache.delete_many([token_cache_key(token) for token in tokens])
+
+
+class CachedOAuth2Authentication(OAuth2Authentication):
+    # Lưu kết quả xác thực token vào cache, request đã xác thực không cần truy vấn DB
+    def authenticate(self, request):
+        token = self._get_bearer_token(request)
+        if token:
+            principal = cache.get(token_cache_key(token))
+            hit = bool(principal) and timezone.now() < principal['expires']
+            record_cache('oauth_token', hit)
+            if hit:
+                return self._from_principal(token, principal)
+
+        result = super().authenticate(request)
+        if result and token:
+            self._store_principal(token, *result)
+        return result
+
+    def _get_bearer_token(self, request):
+        auth = request.META.get('HTTP_AUTHORIZATION', '').split()
+        if len(auth) == 2 and auth[0].lower() == 'bearer':
+            return auth[1]
+        return None
+
+    def _store_principal(self, token, user, access_token):
+        if user is None or not access_token.expires:
+            return
+        # Thời gian cache không vượt quá thời điểm token hết hạn
+        timeout = min(settings.OAUTH2_TOKEN_CACHE_TIMEOUT,
+                      int((access_token.expires - timezone.now()).total_seconds()))
+        if timeout <= 0:
+            return
+
+        principal = {
+            'token_id': access_token.pk,
+            'application_id': access_token.application_id,
+            'scope': access_token.scope,
+            'expires': access_token.expires,
+            'user': {name: getattr(user, name) for name in PRINCIPAL_FIELDS},
+        }
+        cache.set(token_cache_key(token), principal, timeout)
+
+    def _from_principal(self, token, principal):
+        # from_db cần giá trị theo thứ tự các cột của model
+        names = [f.attname for f in User._meta.concrete_fields if f.attname in principal['user']]
+        user = User.from_db(DEFAULT_DB_ALIAS, names, [principal['user'][name] for name in names])
+        access_token = AccessToken(
+            id=principal['token_id'],
+            token=token,
+            user=user,
+            application_id=principal['application_id'],
+            scope=principal['scope'],
+            expires=principal['expires'],
+        )
+        access_token._state.adding = False
+        return user, access_token
@@ -0,0 +1,111 @@
+import json
+import logging
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import resolve, Resolver404
+from rest_framework import status
+from rest_framework.views import APIView
+
+from ejobs.db_router import subrequest_routing
+from .request_cache import request_cache
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+# Thông tin của request gốc không chép sang request con
+SKIPPED_META = ('REQUEST_METHOD', 'PATH_INFO', 'QUERY_STRING', 'CONTENT_TYPE', 'CONTENT_LENGTH', 'wsgi.input',
+                'HTTP_IDEMPOTENCY_KEY')
+
+
+def parse_operations(data, limit):
+    # Trả về (danh sách request con, thông báo lỗi)
+    operations = data.get('requests') if hasattr(data, 'get') else None
+    if not isinstance(operations, list) or not operations:
+        return None, 'requests phải là danh sách request con.'
+    if len(operations) > limit:
+        return None, f'Mỗi batch tối đa {limit} request.'
+
+    parsed = []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            return None, f'requests[{index}] không hợp lệ.'
+        method = str(operation.get('method', 'GET')).upper()
+        path = operation.get('path')
+        headers = operation.get('headers') or {}
+        if method not in METHODS:
+            return None, f'requests[{index}]: method không được hỗ trợ.'
+        if not isinstance(path, str) or not path.startswith('/'):
+            return None, f'requests[{index}]: path phải bắt đầu bằng "/".'
+        if not isinstance(headers, dict):
+            return None, f'requests[{index}]: headers không hợp lệ.'
+        parsed.append({'method': method, 'path': path, 'body': operation.get('body'), 'headers': headers})
+    return parsed, None
+
+
+def build_request(request, operation, url):
+    # Request con dùng chung thông tin xác thực của request gốc, body gửi dạng JSON
+    body = b'' if operation['body'] is None else json.dumps(operation['body']).encode()
+    environ = {name: value for name, value in request.META.items() if name not in SKIPPED_META}
+    environ.update({
+        'REQUEST_METHOD': operation['method'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+    })
+    for name, value in operation['headers'].items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = str(value)
+
+    sub_request = WSGIRequest(environ)
+    sub_request.user = request.user
+    # DRF dùng người dùng đã xác thực này thay vì xác thực lại token
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def resolve_view(path):
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None or not issubclass(view_class, APIView) or not getattr(view_class, 'allow_in_batch', True):
+        return None
+    return match
+
+
+def accepts_json(match):
+    # Body của request con luôn là JSON: view chỉ nhận multipart/form (vd: UserViewSet) không đọc được
+    parser_classes = match.func.initkwargs.get('parser_classes', match.func.cls.parser_classes)
+    return any(parser.media_type in ('application/json', '*/*') for parser in parser_classes)
+
+
+def run_operation(request, operation):
+    url = urlsplit(operation['path'])
+    match = resolve_view(url.path)
+    if match is None:
+        return {'status': status.HTTP_404_NOT_FOUND, 'body': {'detail': 'Không tìm thấy đường dẫn.'}}
+    if operation['body'] is not None and not accepts_json(match):
+        return {'status': status.HTTP_400_BAD_REQUEST,
+                'body': {'detail': 'Đường dẫn này chỉ nhận multipart/form-data, không gọi qua batch với body được.'}}
+
+    sub_request = build_request(request, operation, url)
+    with subrequest_routing(sub_request, match.func):
+        try:
+            response = match.func(sub_request, *match.args, **match.kwargs)
+        except Exception:
+            # Lỗi của một request con không làm hỏng cả batch
+            logger.exception('Batch request %s %s failed', operation['method'], operation['path'])
+            return {'status': status.HTTP_500_INTERNAL_SERVER_ERROR, 'body': {'detail': 'Lỗi máy chủ.'}}
+    return {'status': response.status_code, 'body': getattr(response, 'data', None)}
+
+
+def run_batch(request, operations):
+    # Chạy tuần tự trong cùng process, các request con dùng chung bộ nhớ đệm của request gốc
+    with request_cache():
+        return [run_operation(request, operation) for operation in operations]
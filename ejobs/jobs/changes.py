@@ -0,0 +1,112 @@
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Job, JobChange, ChangeKind
+
+
+# Thời điểm ghi nhật ký gần nhất: cache dựng từ việc làm biết đã có thay đổi mà không cần truy vấn nhật ký
+CHANGED_AT_KEY = 'job_changes_at'
+
+
+def record(job_ids, kind):
+    changes = [JobChange(job_id=job_id, kind=kind) for job_id in job_ids]
+    if changes:
+        JobChange.objects.bulk_create(changes, batch_size=1000)
+        cache.set(CHANGED_AT_KEY, time.time(), None)
+
+
+def last_changed_at():
+    changed_at = cache.get(CHANGED_AT_KEY)
+    if changed_at is None:
+        # Khóa bị mất khỏi cache: coi như vừa có thay đổi
+        changed_at = time.time()
+        cache.add(CHANGED_AT_KEY, changed_at, None)
+    return changed_at
+
+
+def _settled():
+    # Bỏ qua thay đổi quá mới: transaction ghi đồng thời có thể commit id nhỏ hơn sau id lớn hơn
+    return timezone.now() - timedelta(seconds=settings.JOB_CHANGES_SETTLE_SECONDS)
+
+
+def current_token():
+    # Id lớn nhất trong các thay đổi đã ổn định: thay đổi mới hơn sẽ được changes_since trả về sau
+    return JobChange.objects.filter(created_date__lte=_settled()).order_by('-id') \
+        .values_list('id', flat=True).first() or 0
+
+
+def parse_token(value):
+    token = int(value)
+    if token < 0:
+        raise ValueError(value)
+    return token
+
+
+def sync_until():
+    # Mốc thời gian đã xét việc làm hết hạn, làm tròn theo giây để khớp với token gửi cho client
+    return _settled().replace(microsecond=0)
+
+
+def sync_token(token, until):
+    # Token gửi cho client: "<id nhật ký>:<mốc thời gian>". Việc làm hết hạn không ghi vào nhật ký,
+    # client nhận chúng như việc làm đã xóa theo khoảng thời gian giữa hai lần đồng bộ
+    return f'{token}:{int(until.timestamp())}'
+
+
+def parse_sync_token(value):
+    # Trả về (id nhật ký, mốc thời gian). Token cũ chỉ có id: lấy thời điểm ghi của thay đổi tương ứng
+    token, _, until = value.partition(':')
+    token = parse_token(token)
+    if until:
+        try:
+            return token, datetime.fromtimestamp(int(until), tz=dt_timezone.utc)
+        except (OverflowError, OSError):
+            raise ValueError(value)
+    return token, JobChange.objects.filter(id__lte=token).order_by('-id') \
+        .values_list('created_date', flat=True).first()
+
+
+def expired_between(since, until):
+    # Id việc làm có hạn nộp trong (since, until]: đã hết hạn kể từ lần đồng bộ trước
+    return list(Job.objects.filter(expiration_date__gt=since, expiration_date__lte=until)
+                .values_list('id', flat=True))
+
+
+def is_expired(token):
+    # Nhật ký cũ hơn token đã bị xóa (prune): client phải tải lại toàn bộ danh sách
+    oldest = JobChange.objects.aggregate(oldest=Min('id'))['oldest']
+    return oldest is not None and token < oldest - 1
+
+
+def changes_since(token, limit=None):
+    # Gộp các thay đổi sau token theo việc làm. Trả về (token mới, còn thay đổi chưa trả về, id việc làm mới tạo,
+    # id việc làm có thể còn hiển thị, id việc làm đã xóa)
+    limit = limit or settings.JOB_CHANGES_PAGE_SIZE
+    rows = list(JobChange.objects.filter(id__gt=token, created_date__lte=_settled()).order_by('id')
+                .values_list('id', 'job_id', 'kind')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    created = set()
+    latest = {}
+    for _, job_id, kind in rows:
+        if kind == ChangeKind.CREATED:
+            created.add(job_id)
+        latest[job_id] = kind
+    removed = [job_id for job_id, kind in latest.items() if kind == ChangeKind.REMOVED]
+    changed = [job_id for job_id, kind in latest.items() if kind != ChangeKind.REMOVED]
+    return (rows[-1][0] if rows else token), has_more, created, changed, removed
+
+
+def prune(days=None):
+    # Xóa nhật ký cũ, luôn giữ bản ghi mới nhất để token hiện tại vẫn hợp lệ
+    if days is None:
+        days = settings.JOB_CHANGES_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = JobChange.objects.filter(created_date__lt=cutoff, id__lt=current_token()).delete()
+    return deleted
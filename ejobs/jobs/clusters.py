@@ -0,0 +1,162 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Min
+from django.db.models.functions import Substr
+from django.utils import timezone
+
+from .geo import geohash_bounds, geohash_cover
+from .models import Job
+
+# (zoom lớn nhất, độ dài tiền tố geohash): ô khoảng vài chục pixel trên bản đồ
+ZOOM_PRECISION = [(2, 1), (4, 2), (7, 3), (9, 4), (12, 5), (14, 6), (16, 7)]
+MAX_PRECISION = 8
+TOP_TECHNOLOGIES = 3
+
+# Số đếm theo ô được tính sẵn cho từng độ dài tiền tố và lưu trong cache theo khối: các ô có chung tiền tố
+# ngắn hơn CHUNK_DEPTH ký tự nằm trong một khối. Khung nhìn chỉ đọc các khối phủ nó (tối đa MAX_CHUNKS)
+CHUNK_DEPTH = 2
+MAX_CHUNKS = 16
+
+# Phiên bản dùng chung giữa các worker, tăng khi việc làm thay đổi
+VERSION_KEY = 'clusters_version'
+
+
+def precision_for_zoom(zoom):
+    for max_zoom, precision in ZOOM_PRECISION:
+        if zoom <= max_zoom:
+            return precision
+    return MAX_PRECISION
+
+
+def chunk_length(precision):
+    return max(precision - CHUNK_DEPTH, 0)
+
+
+def index_key(precision):
+    return f'clusters:{precision}'
+
+
+def chunk_key(precision, build, chunk):
+    return f'clusters:{precision}:{build}:{chunk}'
+
+
+def invalidate():
+    cache.add(VERSION_KEY, 0, None)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        pass
+
+
+def build_cells(precision):
+    # {khối: [(ô, số việc làm, vĩ độ tâm, kinh độ tâm, id việc làm nhỏ nhất, công nghệ phổ biến)]}
+    # Hai truy vấn GROUP BY trên toàn bộ việc làm còn hiển thị
+    jobs = Job.objects.filter(is_active=True, expiration_date__gte=timezone.now())
+    cells = jobs.annotate(cell=Substr('geohash', 1, precision)).values('cell').annotate(
+        count=Count('id'),
+        latitude=Avg('latitude'),
+        longitude=Avg('longitude'),
+        job_id=Min('id'),
+    ).order_by()
+
+    technologies = {}
+    through = Job.technologies.through.objects.filter(job__in=jobs) \
+        .annotate(cell=Substr('job__geohash', 1, precision)) \
+        .values('cell', 'technology_id', 'technology__name') \
+        .annotate(count=Count('job_id')).order_by()
+    for row in through:
+        technologies.setdefault(row['cell'], []).append((row['technology_id'], row['technology__name'], row['count']))
+
+    chunks = {}
+    for row in cells:
+        top = sorted(technologies.get(row['cell'], []), key=lambda t: (-t[2], t[1]))[:TOP_TECHNOLOGIES]
+        chunks.setdefault(row['cell'][:chunk_length(precision)], []).append(
+            (row['cell'], row['count'], row['latitude'], row['longitude'], row['job_id'], top))
+    return chunks
+
+
+def refresh(precision):
+    # Ghi các khối dưới mã lần tính mới rồi mới trỏ chỉ mục sang, request đang đọc vẫn thấy bản cũ
+    build = uuid.uuid4().hex[:12]
+    version = cache.get(VERSION_KEY)
+    chunks = build_cells(precision)
+    timeout = settings.CLUSTER_REFRESH_INTERVAL * 2
+    # Khối sống lâu hơn chỉ mục để chỉ mục còn hạn luôn trỏ tới khối còn trong cache
+    cache.set_many({chunk_key(precision, build, chunk): cells for chunk, cells in chunks.items()}, timeout + 60)
+    entry = {'build': build, 'built_at': time.time(), 'version': version}
+    cache.set(index_key(precision), entry, timeout)
+    return entry
+
+
+def _is_stale(entry):
+    age = time.time() - entry['built_at']
+    if age >= settings.CLUSTER_REFRESH_INTERVAL:
+        return True
+    # Việc làm vừa thay đổi: tính lại nhưng không quá một lần mỗi CLUSTER_MIN_REBUILD_INTERVAL
+    return entry['version'] != cache.get(VERSION_KEY) and age >= settings.CLUSTER_MIN_REBUILD_INTERVAL
+
+
+def current_build(precision):
+    # Giống featured_ids: khi dữ liệu cũ chỉ một worker tính lại, các worker khác dùng bản cũ
+    entry = cache.get(index_key(precision))
+    if entry is not None and not _is_stale(entry):
+        return entry['build']
+    if entry is not None and not cache.add(index_key(precision) + ':lock', 1, 60):
+        return entry['build']
+    try:
+        return refresh(precision)['build']
+    finally:
+        cache.delete(index_key(precision) + ':lock')
+
+
+def _boxes(south, west, north, east):
+    if west <= east:
+        return [(south, west, north, east)]
+    # Khung nhìn cắt qua kinh tuyến 180
+    return [(south, west, north, 180.0), (south, -180.0, north, east)]
+
+
+def _intersects(bounds, boxes):
+    cell_south, cell_west, cell_north, cell_east = bounds
+    return any(cell_south <= north and cell_north >= south and cell_west <= east and cell_east >= west
+               for south, west, north, east in boxes)
+
+
+def job_clusters(south, west, north, east, zoom):
+    # Cụm việc làm (các ô geohash giao với khung nhìn) đọc từ số đếm tính sẵn, không truy vấn DB
+    boxes = _boxes(south, west, north, east)
+    precision = precision_for_zoom(zoom)
+    while True:
+        # Khung nhìn quá rộng so với zoom: giảm độ dài tiền tố để số khối cần đọc có giới hạn
+        covers = [geohash_cover(*box, chunk_length(precision), MAX_CHUNKS) for box in boxes]
+        if all(cover is not None for cover in covers) or precision == 1:
+            break
+        precision -= 1
+    chunks = {chunk for cover in covers for chunk in cover}
+
+    build = current_build(precision)
+    cached = cache.get_many([chunk_key(precision, build, chunk) for chunk in sorted(chunks)])
+
+    clusters = []
+    for cells in cached.values():
+        for cell, count, latitude, longitude, job_id, top in cells:
+            bounds = geohash_bounds(cell)
+            if not _intersects(bounds, boxes):
+                continue
+            cell_south, cell_west, cell_north, cell_east = bounds
+            clusters.append({
+                'cell': cell,
+                'count': count,
+                'latitude': latitude,
+                'longitude': longitude,
+                'bounds': {'south': cell_south, 'west': cell_west, 'north': cell_north, 'east': cell_east},
+                'top_technologies': [{'id': technology_id, 'name': name, 'count': technology_count}
+                                     for technology_id, name, technology_count in top],
+                # Cụm chỉ có một việc làm thì client mở thẳng chi tiết
+                'job_id': job_id if count == 1 else None,
+            })
+    clusters.sort(key=lambda cluster: cluster['cell'])
+    return {'precision': precision, 'clusters': clusters}
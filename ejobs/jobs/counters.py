@@ -0,0 +1,139 @@
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction, close_old_connections
+from django.db.models import Case, F, When, Value
+
+from ejobs.db_router import internal_writes
+from ejobs.metrics import QUEUE_DEPTH
+from .models import Job, JobCounter
+
+logger = logging.getLogger('ejobs.counters')
+
+# Bộ đệm trong process: {job_id: [views, impressions]}, ghi xuống DB theo lô bởi luồng nền,
+# request chỉ cộng vào bộ đệm và không bao giờ chờ ghi DB
+_buffer = defaultdict(lambda: [0, 0])
+_lock = threading.Lock()
+_flush_requested = threading.Event()
+_flusher = None
+
+
+def record_view(job_id):
+    _record({job_id: (1, 0)})
+
+
+def record_impressions(job_ids):
+    _record({job_id: (0, 1) for job_id in job_ids})
+
+
+def _record(increments):
+    with _lock:
+        _add(increments)
+        full = len(_buffer) >= settings.JOB_COUNTER_MAX_BUFFER
+    if settings.JOB_COUNTER_BACKGROUND_FLUSH:
+        _ensure_flusher()
+        if full:
+            # Đánh thức luồng nền ghi sớm, không ghi trong request
+            _flush_requested.set()
+
+
+def _add(increments):
+    # Gọi khi đang giữ _lock
+    for job_id, (views, impressions) in increments.items():
+        counter = _buffer[job_id]
+        counter[0] += views
+        counter[1] += impressions
+    QUEUE_DEPTH.set(len(_buffer), queue='job_counters')
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_run_flusher, name='job-counter-flusher', daemon=True)
+            _flusher.start()
+
+
+def _run_flusher():
+    while True:
+        _flush_requested.wait(settings.JOB_COUNTER_FLUSH_INTERVAL)
+        _flush_requested.clear()
+        close_old_connections()
+        try:
+            flush()
+        except Exception:
+            logger.exception('Không ghi được bộ đếm việc làm, sẽ thử lại ở lần ghi sau')
+        finally:
+            close_old_connections()
+
+
+def _reset_after_fork():
+    # Process con (gunicorn fork) không mang theo bộ đệm và luồng nền của process cha
+    global _lock, _flusher
+    _lock = threading.Lock()
+    _buffer.clear()
+    _flush_requested.clear()
+    _flusher = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def flush():
+    with _lock:
+        pending = {job_id: tuple(counter) for job_id, counter in _buffer.items()}
+        _buffer.clear()
+        QUEUE_DEPTH.set(0, queue='job_counters')
+    if not pending:
+        return 0
+    try:
+        return _write(pending)
+    except Exception:
+        # Ghi lỗi (DB mất kết nối...): trả lại bộ đệm để lần ghi sau cộng tiếp, không mất lượt đếm
+        with _lock:
+            _add(pending)
+        raise
+
+
+def _write(pending):
+    # Bỏ qua việc làm đã bị xóa trong lúc chờ ghi
+    job_ids = list(Job.objects.filter(id__in=list(pending)).values_list('id', flat=True))
+    pending = {job_id: pending[job_id] for job_id in job_ids}
+    if not pending:
+        return 0
+
+    # Một INSERT (bỏ qua dòng đã có) và một UPDATE cộng dồn cho cả lô
+    views_case = Case(*[When(job_id=job_id, then=Value(v)) for job_id, (v, _) in pending.items() if v],
+                      default=Value(0))
+    impressions_case = Case(*[When(job_id=job_id, then=Value(i)) for job_id, (_, i) in pending.items() if i],
+                            default=Value(0))
+    with internal_writes(), transaction.atomic():
+        JobCounter.objects.bulk_create([JobCounter(job_id=job_id) for job_id in job_ids], ignore_conflicts=True)
+        JobCounter.objects.filter(job_id__in=job_ids).update(
+            views=F('views') + views_case,
+            impressions=F('impressions') + impressions_case,
+        )
+    return len(job_ids)
+
+
+def click_through_rate(views, impressions):
+    if not impressions:
+        return 0
+    return round(views / impressions, 4)
+
+
+@atexit.register
+def _flush_on_exit():
+    # Khi tắt luồng nền (test), bên gọi tự flush(), process đã đóng database không ghi nữa
+    if not settings.JOB_COUNTER_BACKGROUND_FLUSH:
+        return
+    try:
+        flush()
+    except Exception:
+        logger.exception('Không ghi được bộ đếm việc làm khi dừng process')
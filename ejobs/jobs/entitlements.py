@@ -0,0 +1,79 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from ejobs.metrics import record_cache
+from .models import EmployerService
+from .request_cache import memoize, forget
+
+# Mã dịch vụ (Service.code)
+STATISTICS = 'statistics'
+CANDIDATE_MATCHING = 'candidate_matching'
+
+
+def entitlement_cache_key(user_id):
+    return f'entitlements:{user_id}'
+
+
+def load_entitlements(user_id):
+    # {mã dịch vụ: ngày hết hạn xa nhất} của các dịch vụ còn hiệu lực
+    entitlements = {}
+    services = EmployerService.objects.filter(
+        user_id=user_id,
+        is_active=True,
+        end_date__gt=timezone.now(),
+        service__is_active=True,
+        service__code__isnull=False,
+    ).values_list('service__code', 'end_date')
+    for code, end_date in services:
+        if code not in entitlements or end_date > entitlements[code]:
+            entitlements[code] = end_date
+    return entitlements
+
+
+def get_entitlements(user_id):
+    key = entitlement_cache_key(user_id)
+    return memoize(key, lambda: _cached_entitlements(key, user_id))
+
+
+def _cached_entitlements(key, user_id):
+    entitlements = cache.get(key)
+    record_cache('entitlements', entitlements is not None)
+    if entitlements is None:
+        entitlements = load_entitlements(user_id)
+        # Cache hết hạn cùng lúc với dịch vụ hết hạn sớm nhất
+        timeout = settings.ENTITLEMENT_CACHE_TIMEOUT
+        if entitlements:
+            seconds_left = (min(entitlements.values()) - timezone.now()).total_seconds()
+            timeout = max(1, min(timeout, int(seconds_left)))
+        cache.set(key, entitlements, timeout)
+    return entitlements
+
+
+def has_entitlement(user, code):
+    if not user or not user.is_authenticated:
+        return False
+    end_date = get_entitlements(user.pk).get(code)
+    return end_date is not None and timezone.now() < end_date
+
+
+def invalidate_entitlements(user_id):
+    key = entitlement_cache_key(user_id)
+    cache.delete(key)
+    forget(key)
+
+
+def require_entitlement(code, message='Bạn chưa mua dịch vụ hoặc dịch vụ đã hết hạn.'):
+    # Dùng cho các method của view: @require_entitlement(STATISTICS)
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, request, *args, **kwargs):
+            if not has_entitlement(request.user, code):
+                return Response({'detail': message}, status=status.HTTP_403_FORBIDDEN)
+            return func(self, request, *args, **kwargs)
+        return wrapper
+    return decorator
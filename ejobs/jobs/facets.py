@@ -0,0 +1,53 @@
+from collections import Counter
+
+from django.db.models import Case, Count, IntegerField, Max, Q, When
+
+# Các bộ lọc dạng chip trên ứng dụng
+FACET_FIELDS = ('location', 'experience', 'salary')
+
+
+def _filter(name, value):
+    # Tương đương điều kiện của truy vấn tìm kiếm
+    if name == 'technologies':
+        return Q(technologies__id__in=value)
+    return Q(**{f'{name}__icontains': value})
+
+
+def _matches(condition):
+    # Điều kiện chỉ phụ thuộc các cột được GROUP BY nên có cùng giá trị trong cả nhóm
+    return Max(Case(When(condition, then=1), default=0, output_field=IntegerField()))
+
+
+def facet_counts(base_queryset, filters):
+    # Đếm số việc làm cho từng giá trị của mỗi bộ lọc.
+    # base_queryset: việc làm khớp các điều kiện không phải bộ lọc (còn hạn, tiêu đề...)
+    # filters: {'location': str, 'experience': str, 'salary': str, 'technologies': set id}
+    # Số đếm của một bộ lọc bỏ qua chính bộ lọc đó, để client thấy các lựa chọn khác
+    active = {name: _filter(name, value) for name, value in filters.items() if value}
+    scalar = [name for name in FACET_FIELDS if name in active]
+
+    # Các bộ lọc location/experience/salary: một truy vấn GROUP BY theo cả ba cột, mỗi nhóm kèm cờ khớp từng
+    # bộ lọc, rồi cộng dồn trong Python cho từng bộ lọc với điều kiện của các bộ lọc còn lại
+    annotations = {f'{name}_match': _matches(active[name]) for name in scalar}
+    annotations['count'] = Count('id', filter=active.get('technologies'), distinct=True)
+    counts = {name: Counter() for name in FACET_FIELDS}
+    for row in base_queryset.values(*FACET_FIELDS).annotate(**annotations).order_by():
+        if not row['count']:
+            continue
+        for name in FACET_FIELDS:
+            if row[name] and all(row[f'{other}_match'] for other in scalar if other != name):
+                counts[name][row[name]] += row['count']
+    facets = {name: [{'value': value, 'count': count}
+                     for value, count in sorted(counts[name].items(), key=lambda item: (-item[1], item[0]))]
+              for name in FACET_FIELDS}
+
+    # Công nghệ: GROUP BY theo bảng trung gian, áp dụng mọi bộ lọc trừ technologies
+    queryset = base_queryset
+    for name in scalar:
+        queryset = queryset.filter(active[name])
+    rows = (queryset.filter(technologies__isnull=False)
+            .values('technologies__id', 'technologies__name')
+            .annotate(count=Count('id', distinct=True)).order_by('-count', 'technologies__id'))
+    facets['technologies'] = [{'id': row['technologies__id'], 'name': row['technologies__name'], 'count': row['count']}
+                              for row in rows]
+    return facets
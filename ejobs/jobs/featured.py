@@ -0,0 +1,97 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, IntegerField, Value, When
+from django.utils import timezone
+
+from ejobs.metrics import record_cache
+from .models import Job
+
+HIGH_SALARY = 'high_salary'
+NEWEST = 'newest'
+MOST_APPLIED = 'most_applied'
+TRENDING = 'trending'
+
+# Mức lương từ 20 triệu trở lên, cao nhất trước
+HIGH_SALARIES = ['Trên 50 triệu', '30 - 50 triệu', '25 - 30 triệu', '20 - 25 triệu']
+
+# Phiên bản dùng chung giữa các worker, tăng khi việc làm thay đổi
+VERSION_KEY = 'featured_version'
+
+
+def _active_jobs():
+    return Job.objects.filter(is_active=True, expiration_date__gte=timezone.now())
+
+
+def high_salary_ids(limit):
+    rank = Case(*[When(salary=salary, then=Value(index)) for index, salary in enumerate(HIGH_SALARIES)],
+                output_field=IntegerField())
+    return _active_jobs().filter(salary__in=HIGH_SALARIES).annotate(salary_rank=rank) \
+        .order_by('salary_rank', '-created_date', '-id').values_list('id', flat=True)[:limit]
+
+
+def newest_ids(limit):
+    return _active_jobs().order_by('-created_date', '-id').values_list('id', flat=True)[:limit]
+
+
+def most_applied_ids(limit):
+    return _active_jobs().annotate(application_count=Count('jobapplication')).filter(application_count__gt=0) \
+        .order_by('-application_count', '-id').values_list('id', flat=True)[:limit]
+
+
+def trending_ids(limit):
+    # Nhiều lượt xem nhất trong số việc làm đăng gần đây
+    since = timezone.now() - timedelta(days=settings.FEATURED_TRENDING_DAYS)
+    return _active_jobs().filter(created_date__gte=since, counter__views__gt=0) \
+        .order_by('-counter__views', '-id').values_list('id', flat=True)[:limit]
+
+
+BUILDERS = {
+    HIGH_SALARY: high_salary_ids,
+    NEWEST: newest_ids,
+    MOST_APPLIED: most_applied_ids,
+    TRENDING: trending_ids,
+}
+
+
+def list_key(name):
+    return f'featured:{name}'
+
+
+def invalidate():
+    # Đánh dấu các danh sách cần tính lại, lần đọc kế tiếp sẽ xây dựng lại (không xóa để vẫn có dữ liệu trả về)
+    cache.add(VERSION_KEY, 0, None)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        pass
+
+
+def refresh(name):
+    ids = list(BUILDERS[name](settings.FEATURED_LIST_SIZE))
+    entry = {'ids': ids, 'built_at': time.time(), 'version': cache.get(VERSION_KEY)}
+    cache.set(list_key(name), entry, None)
+    return ids
+
+
+def _is_stale(entry):
+    age = time.time() - entry['built_at']
+    if age >= settings.FEATURED_LIST_REFRESH_INTERVAL:
+        return True
+    # Việc làm vừa thay đổi: tính lại nhưng không quá một lần mỗi FEATURED_LIST_MIN_REBUILD_INTERVAL
+    return entry['version'] != cache.get(VERSION_KEY) and age >= settings.FEATURED_LIST_MIN_REBUILD_INTERVAL
+
+
+def featured_ids(name):
+    # Danh sách id đã sắp xếp. Khi danh sách cũ, chỉ một worker tính lại, các worker khác dùng bản cũ
+    entry = cache.get(list_key(name))
+    if entry is not None and (not _is_stale(entry) or not cache.add(list_key(name) + ':lock', 1, 60)):
+        record_cache('featured', True)
+        return entry['ids']
+    record_cache('featured', False)
+    try:
+        return refresh(name)
+    finally:
+        cache.delete(list_key(name) + ':lock')
@@ -0,0 +1,72 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def _split_param(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def parse_sparse_fields(request):
+    # Đọc tham số ?fields=id,title,salary&expand=employer từ request
+    # Chỉ áp dụng cho các request đọc dữ liệu, không ảnh hưởng tới create/update
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None, set()
+
+    fields = request.query_params.get('fields')
+    expand = request.query_params.get('expand')
+    return (_split_param(fields) if fields else None), (_split_param(expand) if expand else set())
+
+
+def sparse_queryset(queryset, serializer_class, fields, expand):
+    # Giới hạn các cột được truy vấn theo các trường mà serializer thực sự trả về
+    if fields is None:
+        return queryset
+
+    model = queryset.model
+    serializer = serializer_class(fields=fields, expand=expand)
+    method_sources = getattr(serializer_class.Meta, 'method_sources', {})
+
+    only = {model._meta.pk.name}
+    select_related = set()
+    prefetch_related = set()
+
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.SerializerMethodField):
+            # Trường tính toán có khai báo quan hệ mà nó sử dụng
+            source = method_sources.get(name)
+            if source:
+                only.add(source)
+                select_related.add(source)
+            continue
+        if field.source == '*':
+            continue
+
+        source = field.source.split('.')[0]
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            # Thuộc tính bí danh của field (vd: created_at = BaseModel.created_date)
+            model_field = getattr(getattr(model, source, None), 'field', None)
+            if model_field is None:
+                continue
+            source = model_field.name
+
+        nested = isinstance(field, serializers.BaseSerializer)
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch_related.add(source)
+        elif model_field.concrete:
+            only.add(source)
+            if model_field.is_relation and nested:
+                select_related.add(source)
+        elif model_field.one_to_one:
+            # Quan hệ one-to-one ngược (user.employer, user.seeker): kể cả khi chỉ trả về id
+            # cũng phải đọc bản ghi liên quan, lấy cùng truy vấn chính thay vì một truy vấn mỗi dòng
+            only.add(source if nested else f'{source}__{model_field.related_model._meta.pk.name}')
+            select_related.add(source)
+
+    queryset = queryset.only(*only)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
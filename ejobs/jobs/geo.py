@@ -0,0 +1,73 @@
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_LENGTH = 12
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_LENGTH):
+    # Mã geohash: các ô lưới lồng nhau, ô có chung tiền tố thì nằm trong cùng ô lớn hơn
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def geohash_bounds(geohash):
+    # (south, west, north, east) của ô geohash
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lon_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            target[1 - bit] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def is_geohash(value):
+    return bool(value) and len(value) <= GEOHASH_LENGTH and all(char in BASE32 for char in value)
+
+
+def cell_size(precision):
+    # (độ cao, độ rộng) theo độ của ô geohash: kinh độ chiếm các bit chẵn, vĩ độ các bit lẻ
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** (bits - bits // 2)
+
+
+def geohash_cover(south, west, north, east, precision, limit):
+    # Các ô geohash độ dài `precision` phủ khung (south, west, north, east) không cắt kinh tuyến 180,
+    # None nếu cần nhiều hơn `limit` ô
+    if precision == 0:
+        return ['']
+    height, width = cell_size(precision)
+    rows = range(int((max(south, -90.0) + 90) // height), int((min(north, 90.0) + 90) // height) + 1)
+    cols = range(int((max(west, -180.0) + 180) // width), int((min(east, 180.0) + 180) // width) + 1)
+    if len(rows) * len(cols) > limit:
+        return None
+    max_row, max_col = int(180 / height) - 1, int(360 / width) - 1
+    return sorted({encode_geohash(-90 + (min(row, max_row) + 0.5) * height,
+                                  -180 + (min(col, max_col) + 0.5) * width, precision)
+                   for row in rows for col in cols})
@@ -0,0 +1,56 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+
+
+def get_idempotency_key(request):
+    return request.headers.get(HEADER) or None
+
+
+def request_fingerprint(request, *parts):
+    # Cùng một key phải đi kèm cùng một nội dung request
+    data = request.data
+    fields = sorted((name, getattr(data.get(name), 'name', data.get(name))) for name in data.keys())
+    raw = '|'.join([request.path] + [str(part) for part in parts] + [f'{name}={value}' for name, value in fields])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def get_stored_response(request, key, fingerprint):
+    # Trả về response đã lưu nếu request này đã được xử lý, None nếu chưa
+    expires = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    record = IdempotencyKey.objects.filter(user=request.user, key=key, created_date__gte=expires).first()
+    if record is None:
+        return None
+    if record.fingerprint != fingerprint:
+        return Response({"detail": "Idempotency-Key đã được dùng cho một request khác."},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    return Response(record.response_body, status=record.status_code)
+
+
+def store_response(request, key, fingerprint, response):
+    # Xóa bản ghi cũ đã hết hạn cùng key rồi lưu kết quả mới
+    IdempotencyKey.objects.filter(user=request.user, key=key).delete()
+    try:
+        IdempotencyKey.objects.create(user=request.user, key=key, fingerprint=fingerprint,
+                                      status_code=response.status_code, response_body=response.data)
+    except IntegrityError:
+        # Request song song cùng key đã lưu trước
+        pass
+    return response
+
+
+def prune(seconds=None):
+    # Xóa key đã hết hạn, không còn được dùng để trả lại response
+    if seconds is None:
+        seconds = settings.IDEMPOTENCY_KEY_TTL
+    deleted, _ = IdempotencyKey.objects.filter(created_date__lt=timezone.now() - timedelta(seconds=seconds)).delete()
+    return deleted
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from jobs.archive import archive_cutoff, archivable_jobs, archive_expired_jobs
+
+
+class Command(BaseCommand):
+    help = 'Chuyển việc làm hết hạn lâu ngày cùng đơn ứng tuyển và lượt lưu sang kho lưu trữ'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Số ngày sau khi hết hạn, mặc định JOB_ARCHIVE_AFTER_DAYS')
+        parser.add_argument('--batch-size', type=int, default=500, help='Số việc làm mỗi transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Chỉ đếm, không chuyển dữ liệu')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable_jobs(archive_cutoff(options['days'])).count()
+            self.stdout.write(f'Có {count} việc làm sẽ được lưu trữ.')
+            return
+
+        count = archive_expired_jobs(options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Đã lưu trữ {count} việc làm.'))
@@ -0,0 +1,54 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from jobs.models import Job, User
+from jobs.projections import job_values, project_jobs
+from jobs.renderers import FastJSONRenderer
+from jobs.serializer import JobSerializer
+
+
+class Command(BaseCommand):
+    help = 'So sánh tốc độ JobSerializer + JSONRenderer với values() + FastJSONRenderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[8, 50, 100])
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--user', type=int, default=None, help='id người dùng dùng để tính is_saved/is_applied')
+
+    def handle(self, *args, **options):
+        request = Request(APIRequestFactory().get('/jobs/'))
+        request.user = User.objects.get(pk=options['user']) if options['user'] else AnonymousUser()
+
+        jobs = Job.objects.filter(is_active=True).order_by('id')
+        total = jobs.count()
+        if not total:
+            raise CommandError('Không có việc làm nào để đo, hãy tạo dữ liệu trước.')
+
+        self.stdout.write(f"{'size':>6} {'drf (ms)':>10} {'fast (ms)':>10} {'speedup':>8}")
+        for size in options['sizes']:
+            page = jobs[:size]
+
+            def drf():
+                data = JobSerializer(list(page), many=True, context={'request': request}).data
+                return JSONRenderer().render(data)
+
+            def fast():
+                return FastJSONRenderer().render(project_jobs(job_values(page), request))
+
+            if drf() != fast():
+                raise CommandError(f'Kết quả không khớp với JobSerializer ở page size {size}')
+
+            drf_ms = self._measure(drf, options['repeat'])
+            fast_ms = self._measure(fast, options['repeat'])
+            self.stdout.write(f'{min(size, total):>6} {drf_ms:>10.2f} {fast_ms:>10.2f} {drf_ms / fast_ms:>7.1f}x')
+
+    def _measure(self, func, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
@@ -0,0 +1,281 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from jobs import featured
+from jobs.changes import record as record_job_changes
+from jobs.entitlements import STATISTICS
+from jobs.geo import encode_geohash
+from jobs.matching import matrix as seeker_matrix
+from jobs.models import User, UserRole, Employer, Seeker, Technology, Job, JobApplication, SaveJob, Follow, \
+    Service, EmployerService, CVStatus, ChangeKind
+from jobs.typeahead import index as typeahead_index
+
+TECHNOLOGIES = [
+    'Python', 'Django', 'Flask', 'FastAPI', 'Java', 'Spring Boot', 'Kotlin', 'Android', 'Swift', 'iOS',
+    'JavaScript', 'TypeScript', 'ReactJS', 'React Native', 'VueJS', 'Angular', 'NodeJS', 'NestJS', 'PHP',
+    'Laravel', 'C#', '.NET', 'C++', 'Go', 'Rust', 'Ruby on Rails', 'Flutter', 'MySQL', 'PostgreSQL',
+    'MongoDB', 'Redis', 'Docker', 'Kubernetes', 'AWS', 'Azure', 'Linux', 'DevOps', 'Tester', 'Data Analyst',
+    'Machine Learning', 'UI/UX', 'Business Analyst', 'Project Manager', 'SQL', 'HTML/CSS',
+]
+
+# (tỉnh/thành, vĩ độ, kinh độ, trọng số)
+CITIES = [
+    ('Hồ Chí Minh', 10.7769, 106.7009, 40),
+    ('Hà Nội', 21.0285, 105.8542, 35),
+    ('Đà Nẵng', 16.0544, 108.2022, 10),
+    ('Cần Thơ', 10.0452, 105.7469, 4),
+    ('Hải Phòng', 20.8449, 106.6881, 4),
+    ('Bình Dương', 10.9804, 106.6519, 4),
+    ('Đồng Nai', 10.9574, 106.8427, 3),
+]
+
+DISTRICTS = ['Quận 1', 'Quận 3', 'Quận 7', 'Quận Bình Thạnh', 'Quận Tân Bình', 'Quận Cầu Giấy', 'Quận Ba Đình',
+             'Quận Hải Châu', 'Quận Ninh Kiều', 'TP Thủ Đức']
+
+SALARIES = ['Dưới 10 triệu', '10 - 15 triệu', '15 - 20 triệu', '20 - 25 triệu', '25 - 30 triệu', '30 - 50 triệu',
+            'Trên 50 triệu', 'Thỏa thuận']
+SALARY_WEIGHTS = [10, 20, 22, 16, 10, 8, 4, 10]
+
+EXPERIENCES = ['Không yêu cầu', 'Dưới 1 năm', '1 năm', '2 năm', '3 năm', '4 năm', '5 năm', 'Trên 5 năm']
+
+LEVELS = ['Intern', 'Fresher', 'Junior', 'Middle', 'Senior', 'Lead']
+ROLES = ['Developer', 'Engineer', 'Backend Developer', 'Frontend Developer', 'Fullstack Developer',
+         'Mobile Developer', 'Tester', 'Data Engineer']
+
+LAST_NAMES = ['Nguyễn', 'Trần', 'Lê', 'Phạm', 'Hoàng', 'Huỳnh', 'Phan', 'Vũ', 'Võ', 'Đặng', 'Bùi', 'Đỗ']
+FIRST_NAMES = ['An', 'Bình', 'Châu', 'Dũng', 'Giang', 'Hà', 'Hải', 'Hạnh', 'Hiếu', 'Hoa', 'Huy', 'Khoa', 'Lan',
+               'Linh', 'Long', 'Mai', 'Minh', 'Nam', 'Ngọc', 'Phong', 'Phúc', 'Quân', 'Sơn', 'Tâm', 'Thảo',
+               'Trang', 'Trung', 'Tú', 'Tuấn', 'Vy']
+COMPANY_WORDS = ['Tech', 'Soft', 'Digital', 'Solutions', 'Data', 'Cloud', 'Labs', 'Global', 'Việt', 'Sài Gòn']
+
+SERVICES = [
+    {'name': 'Thống kê tuyển dụng', 'code': STATISTICS, 'price': Decimal('199000'), 'duration': 1},
+    {'name': 'Tin tuyển dụng nổi bật', 'code': None, 'price': Decimal('299000'), 'duration': 1},
+]
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = 'Sinh dữ liệu giả lập (người dùng, việc làm, đơn ứng tuyển...) với số lượng lớn để kiểm thử tải'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employers', type=int, default=100)
+        parser.add_argument('--seekers', type=int, default=1000)
+        parser.add_argument('--jobs-per-employer', type=int, default=10, help='Số việc làm trung bình mỗi nhà tuyển dụng')
+        parser.add_argument('--applications-per-seeker', type=int, default=5)
+        parser.add_argument('--saves-per-seeker', type=int, default=5)
+        parser.add_argument('--follows-per-seeker', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0, help='Cùng seed và cùng dữ liệu ban đầu sẽ sinh ra cùng kết quả')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--prefix', default='gen', help='Tiền tố username/email của người dùng được sinh ra')
+        parser.add_argument('--password', default='123456')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.now = timezone.now()
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f'Đã có người dùng với tiền tố "{prefix}", hãy dùng --prefix khác.')
+
+        started = time.monotonic()
+        technology_ids = self.create_technologies()
+        services = self.create_services()
+        password = make_password(options['password'])  # Băm một lần, dùng chung cho mọi người dùng
+
+        employer_ids = self.create_users(prefix, 'employer', UserRole.EMPLOYER, options['employers'], password)
+        seeker_ids = self.create_users(prefix, 'seeker', UserRole.JOB_SEEKER, options['seekers'], password)
+        self.create_employers(prefix, employer_ids)
+        self.create_seekers(prefix, seeker_ids, technology_ids)
+        job_ids = self.create_jobs(prefix, employer_ids, technology_ids, options['jobs_per_employer'])
+
+        self.create_applications(seeker_ids, job_ids, options['applications_per_seeker'])
+        self.create_saved_jobs(seeker_ids, job_ids, options['saves_per_seeker'])
+        self.create_follows(seeker_ids, employer_ids, options['follows_per_seeker'])
+        self.create_employer_services(employer_ids, services)
+
+        # bulk_create không gửi signal: làm những việc signal của Job/Seeker làm khi lưu từng bản ghi
+        self.refresh_derived_data(job_ids)
+        self.stdout.write(self.style.SUCCESS(f'Hoàn tất sau {time.monotonic() - started:.1f}s'))
+
+    def refresh_derived_data(self, job_ids):
+        record_job_changes(job_ids, ChangeKind.CREATED)  # Client đồng bộ delta nhận các việc làm mới
+        typeahead_index.invalidate()
+        seeker_matrix.invalidate()
+        for name in featured.BUILDERS:
+            featured.refresh(name)
+        self.stdout.write('  Đã làm mới nhật ký thay đổi, chỉ mục gợi ý, ma trận ứng viên và danh sách nổi bật')
+
+    def insert(self, model, objects, **kwargs):
+        # Ghi theo lô, mỗi lô một transaction
+        total = 0
+        for chunk in chunked(objects, self.chunk_size):
+            with transaction.atomic():
+                model.objects.bulk_create(chunk, batch_size=self.chunk_size, **kwargs)
+            total += len(chunk)
+        self.stdout.write(f'  {model._meta.object_name}: {total}')
+        return total
+
+    def sample(self, population, k):
+        return self.rng.sample(population, min(k, len(population)))
+
+    def create_technologies(self):
+        Technology.objects.bulk_create([Technology(name=name) for name in TECHNOLOGIES], ignore_conflicts=True)
+        return list(Technology.objects.order_by('id').values_list('id', flat=True))
+
+    def create_services(self):
+        if not Service.objects.exists():
+            Service.objects.bulk_create([Service(**service) for service in SERVICES])
+        return list(Service.objects.filter(is_active=True).order_by('id'))
+
+    def create_users(self, prefix, kind, role, count, password):
+        def users():
+            for i in range(count):
+                username = f'{prefix}_{kind}_{i}'
+                yield User(
+                    username=username,
+                    email=f'{username}@example.com',
+                    password=password,
+                    avatar='sample_avatar',  # Serializer của User luôn trả về avatar.url
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                    role=role,
+                    date_joined=self.now,
+                )
+
+        self.insert(User, users())
+        # MySQL không trả về id sau bulk_create, lấy lại theo username
+        return list(User.objects.filter(username__startswith=f'{prefix}_{kind}_').order_by('id')
+                    .values_list('id', flat=True))
+
+    def create_employers(self, prefix, employer_ids):
+        def employers():
+            for i, user_id in enumerate(employer_ids):
+                city = self.rng.choices(CITIES, weights=[c[3] for c in CITIES])[0]
+                yield Employer(
+                    user_id=user_id,
+                    company_name=f'{self.rng.choice(COMPANY_WORDS)} {self.rng.choice(COMPANY_WORDS)} {i}',
+                    website=f'https://{prefix}-company-{i}.example.com',
+                    size=self.rng.choice([10, 50, 100, 300, 500, 1000, 5000]),
+                    address=f'{self.rng.choice(DISTRICTS)}, {city[0]}',
+                    description='Công ty công nghệ đang mở rộng đội ngũ.',
+                    approval_status=self.rng.random() < 0.9,
+                )
+
+        self.insert(Employer, employers())
+
+    def create_seekers(self, prefix, seeker_ids, technology_ids):
+        def seekers():
+            for user_id in seeker_ids:
+                yield Seeker(
+                    user_id=user_id,
+                    experience=self.rng.choice(EXPERIENCES),
+                    location=self.rng.choices(CITIES, weights=[c[3] for c in CITIES])[0][0],
+                )
+
+        self.insert(Seeker, seekers())
+        # Lọc theo tiền tố thay vì id__in để không vượt giới hạn số tham số của SQLite
+        profile_ids = list(Seeker.objects.filter(user__username__startswith=f'{prefix}_seeker_').order_by('id')
+                           .values_list('id', flat=True))
+        through = Seeker.technologies.through
+        self.insert(through, (through(seeker_id=profile_id, technology_id=technology_id)
+                              for profile_id in profile_ids
+                              for technology_id in self.sample(technology_ids, self.rng.randint(1, 5))))
+
+    def create_jobs(self, prefix, employer_ids, technology_ids, jobs_per_employer):
+        def jobs():
+            for employer_id in employer_ids:
+                for _ in range(self.rng.randint(0, jobs_per_employer * 2)):
+                    city, latitude, longitude, _ = self.rng.choices(CITIES, weights=[c[3] for c in CITIES])[0]
+                    # Tọa độ rải quanh trung tâm thành phố (~10km)
+                    latitude = round(latitude + self.rng.uniform(-0.09, 0.09), 6)
+                    longitude = round(longitude + self.rng.uniform(-0.09, 0.09), 6)
+                    # Khoảng 20% việc làm đã hết hạn
+                    if self.rng.random() < 0.2:
+                        expiration_date = self.now - timedelta(days=self.rng.randint(1, 365))
+                    else:
+                        expiration_date = self.now + timedelta(days=self.rng.randint(1, 90))
+                    yield Job(
+                        employer_id=employer_id,
+                        title=f'{self.rng.choice(LEVELS)} {self.rng.choice(TECHNOLOGIES)} {self.rng.choice(ROLES)}',
+                        description='Tham gia phát triển sản phẩm cùng đội ngũ kỹ thuật.',
+                        requirements='Có kinh nghiệm làm việc nhóm, chủ động trong công việc.',
+                        location=city,
+                        location_detail=f'{self.rng.choice(DISTRICTS)}, {city}',
+                        salary=self.rng.choices(SALARIES, weights=SALARY_WEIGHTS)[0],
+                        expiration_date=expiration_date,
+                        experience=self.rng.choice(EXPERIENCES),
+                        quantity=self.rng.randint(1, 10),
+                        latitude=latitude,
+                        longitude=longitude,
+                        geohash=encode_geohash(latitude, longitude),  # bulk_create không gọi Job.save()
+                        is_active=self.rng.random() < 0.95,
+                    )
+
+        self.insert(Job, jobs())
+        job_ids = list(Job.objects.filter(employer__username__startswith=f'{prefix}_employer_').order_by('id')
+                       .values_list('id', flat=True))
+        through = Job.technologies.through
+        self.insert(through, (through(job_id=job_id, technology_id=technology_id)
+                              for job_id in job_ids
+                              for technology_id in self.sample(technology_ids, self.rng.randint(1, 4))))
+        return job_ids
+
+    def create_applications(self, seeker_ids, job_ids, per_seeker):
+        statuses = list(CVStatus)
+
+        def applications():
+            for seeker_id in seeker_ids:
+                for job_id in self.sample(job_ids, self.rng.randint(0, per_seeker * 2)):
+                    yield JobApplication(
+                        job_id=job_id,
+                        seeker_id=seeker_id,
+                        cover_letter='Tôi mong muốn được ứng tuyển vào vị trí này.',
+                        status=self.rng.choice(statuses),
+                        cv='sample_cv',
+                        email=f'seeker{seeker_id}@example.com',
+                        phone=f'09{self.rng.randint(0, 99999999):08d}',
+                        name=f'{self.rng.choice(LAST_NAMES)} {self.rng.choice(FIRST_NAMES)}',
+                    )
+
+        self.insert(JobApplication, applications())
+
+    def create_saved_jobs(self, seeker_ids, job_ids, per_seeker):
+        self.insert(SaveJob, (SaveJob(seeker_id=seeker_id, job_id=job_id)
+                              for seeker_id in seeker_ids
+                              for job_id in self.sample(job_ids, self.rng.randint(0, per_seeker * 2))))
+
+    def create_follows(self, seeker_ids, employer_ids, per_seeker):
+        self.insert(Follow, (Follow(follower_id=seeker_id, following_id=employer_id)
+                             for seeker_id in seeker_ids
+                             for employer_id in self.sample(employer_ids, self.rng.randint(0, per_seeker * 2))))
+
+    def create_employer_services(self, employer_ids, services):
+        def employer_services():
+            for employer_id in employer_ids:
+                if self.rng.random() >= 0.3:
+                    continue
+                service = self.rng.choice(services)
+                # Có cả dịch vụ còn hạn và đã hết hạn
+                yield EmployerService(
+                    user_id=employer_id,
+                    service=service,
+                    end_date=self.now + timedelta(days=self.rng.randint(-60, 30 * service.duration)),
+                    amount=service.price,
+                )
+
+        if services:
+            self.insert(EmployerService, employer_services())
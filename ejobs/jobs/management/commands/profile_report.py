@@ -0,0 +1,46 @@
+import glob
+import io
+import os
+import pstats
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Gộp các file profile do ProfilingMiddleware ghi ra và in các hàm tốn thời gian nhất theo từng view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help='Thư mục chứa file .prof (mặc định PROFILING_DIR)')
+        parser.add_argument('--view', default=None, help='Chỉ xem các view có tên chứa chuỗi này')
+        parser.add_argument('--top', type=int, default=20, help='Số hàm in ra cho mỗi view')
+        parser.add_argument('--sort', default='cumulative', help='Tiêu chí sắp xếp của pstats (cumulative, tottime...)')
+        parser.add_argument('--output', default=None,
+                            help='Ghi profile đã gộp của mỗi view ra thư mục này (mở bằng snakeviz, pstats...)')
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.PROFILING_DIR
+        files = defaultdict(list)
+        for path in glob.glob(os.path.join(directory, '*.prof')):
+            # {view}.{pid}.prof
+            view = os.path.basename(path).rsplit('.', 2)[0]
+            if options['view'] is None or options['view'] in view:
+                files[view].append(path)
+        if not files:
+            raise CommandError(f'Không có file profile nào trong {directory}')
+
+        merged = {view: pstats.Stats(*paths) for view, paths in files.items()}
+        if options['output']:
+            os.makedirs(options['output'], exist_ok=True)
+
+        # View tốn nhiều thời gian nhất (tổng trên mọi request được lấy mẫu) in trước
+        for view, stats in sorted(merged.items(), key=lambda item: -item[1].total_tt):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{view}: {stats.total_tt:.3f}s, {len(files[view])} file'))
+            if options['output']:
+                stats.dump_stats(os.path.join(options['output'], f'{view}.prof'))
+            # OutputWrapper thêm xuống dòng sau mỗi lần write, in qua bộ đệm
+            stats.stream = io.StringIO()
+            stats.strip_dirs().sort_stats(options['sort']).print_stats(options['top'])
+            self.stdout.write(stats.stream.getvalue())
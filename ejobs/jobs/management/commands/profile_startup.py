@@ -0,0 +1,153 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Thư viện nặng chỉ được import khi gọi tới API dùng nó, không được nạp lúc worker khởi động
+# (hồ sơ -> module, '*' áp dụng cho mọi hồ sơ). Kiểm tra bằng --check
+LAZY_MODULES = {
+    '*': ['numpy', 'geopy'],
+    'web': ['drf_yasg', 'debug_toolbar'],
+}
+
+# Chạy trong một process mới để đo đúng thời gian khởi động nguội của worker
+BOOTSTRAP = '''
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import django
+from django.apps import AppConfig
+from django.conf import settings
+
+apps = {}
+original_create = AppConfig.create.__func__
+
+
+def timed(label, phase, func):
+    def wrapper(*args, **kwargs):
+        t = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            apps.setdefault(label, {})[phase] = (time.perf_counter() - t) * 1000
+    return wrapper
+
+
+def create(cls, entry):
+    t = time.perf_counter()
+    config = original_create(cls, entry)
+    apps.setdefault(config.label, {})['import'] = (time.perf_counter() - t) * 1000
+    config.import_models = timed(config.label, 'models', config.import_models)
+    config.ready = timed(config.label, 'ready', config.ready)
+    return config
+
+
+AppConfig.create = classmethod(create)
+
+settings.INSTALLED_APPS
+settings_done = time.perf_counter()
+django.setup()
+setup_done = time.perf_counter()
+
+from django.urls import get_resolver
+get_resolver().url_patterns
+end = time.perf_counter()
+
+print(json.dumps({
+    'settings': (settings_done - start) * 1000,
+    'setup': (setup_done - settings_done) * 1000,
+    'urls': (end - setup_done) * 1000,
+    'total': (end - start) * 1000,
+    'apps': apps,
+    'modules': sorted(name for name in sys.modules if '.' not in name),
+}))
+'''
+
+
+def parse_importtime(output):
+    # Dòng của -X importtime: "import time: self [us] | cumulative | <thụt lề>module"
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def eager_modules(profile, report):
+    lazy = LAZY_MODULES['*'] + LAZY_MODULES.get(profile, [])
+    return [name for name in lazy if name in report['modules']]
+
+
+class Command(BaseCommand):
+    help = 'Đo thời gian import và khởi động (settings, từng app, urls) của một worker mới'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', nargs='+', default=[settings.PROFILE],
+                            help='Hồ sơ cần đo (EJOBS_PROFILE), vd: --profile web dev debug')
+        parser.add_argument('--repeat', type=int, default=3, help='Số lần đo, lấy lần nhanh nhất')
+        parser.add_argument('--top', type=int, default=15, help='Số package/module chậm nhất được liệt kê')
+        parser.add_argument('--check', action='store_true',
+                            help='Báo lỗi nếu worker nạp thư viện trong LAZY_MODULES lúc khởi động')
+
+    def handle(self, *args, **options):
+        results = {}
+        for profile in options['profile']:
+            runs = [self.run_worker(profile) for _ in range(options['repeat'])]
+            report, modules = min(runs, key=lambda run: run[0]['total'])
+            results[profile] = report
+            self.print_report(profile, report, modules, options['top'])
+
+            loaded = eager_modules(profile, report)
+            if loaded:
+                message = f"Hồ sơ {profile} nạp sẵn {', '.join(loaded)} lúc khởi động"
+                if options['check']:
+                    raise CommandError(message)
+                self.stdout.write(self.style.WARNING(f'  {message}'))
+
+        if len(results) > 1:
+            self.stdout.write(self.style.MIGRATE_HEADING('So sánh'))
+            for profile, report in results.items():
+                self.stdout.write(f"  {profile:<10} {report['total']:>9.1f} ms")
+
+    def run_worker(self, profile):
+        env = dict(os.environ, EJOBS_PROFILE=profile,
+                   DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE))
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', BOOTSTRAP],
+                                 capture_output=True, text=True, env=env, cwd=settings.BASE_DIR)
+        if process.returncode != 0:
+            raise CommandError(f'Không khởi động được worker với hồ sơ {profile}:\n{process.stderr[-2000:]}')
+        report = json.loads(process.stdout.strip().splitlines()[-1])
+        return report, parse_importtime(process.stderr)
+
+    def print_report(self, profile, report, modules, top):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Hồ sơ {profile}'))
+        self.stdout.write(f"  Tổng: {report['total']:.1f} ms (settings {report['settings']:.1f}, "
+                          f"apps {report['setup']:.1f}, urls {report['urls']:.1f})")
+
+        self.stdout.write(f"  {'app':<20} {'import':>8} {'models':>8} {'ready':>8} (ms)")
+        for label, phases in sorted(report['apps'].items(), key=lambda item: -sum(item[1].values())):
+            self.stdout.write(f"  {label:<20} {phases.get('import', 0):>8.1f} "
+                              f"{phases.get('models', 0):>8.1f} {phases.get('ready', 0):>8.1f}")
+
+        # Thời gian import tính cho package gốc đã import module đó lần đầu
+        packages = defaultdict(int)
+        for name, _, cumulative_us, depth in modules:
+            if depth == 0:
+                packages[name.split('.')[0]] += cumulative_us
+        self.stdout.write(f"  {'package':<30} {'import (ms)':>12}")
+        for name, cumulative_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f'  {name:<30} {cumulative_us / 1000:>12.1f}')
+
+        self.stdout.write(f"  {'module':<50} {'self (ms)':>10}")
+        for name, self_us, _, _ in sorted(modules, key=lambda item: -item[1])[:top]:
+            self.stdout.write(f'  {name:<50} {self_us / 1000:>10.1f}')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from jobs.idempotency import prune
+
+
+class Command(BaseCommand):
+    help = 'Xóa Idempotency-Key đã hết hạn (jobs/idempotency)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=int, default=None,
+                            help='Thời gian giữ key (giây), mặc định IDEMPOTENCY_KEY_TTL')
+
+    def handle(self, *args, **options):
+        count = prune(options['seconds'])
+        self.stdout.write(self.style.SUCCESS(f'Đã xóa {count} Idempotency-Key.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from jobs.changes import prune
+
+
+class Command(BaseCommand):
+    help = 'Xóa nhật ký thay đổi việc làm cũ dùng cho đồng bộ delta (jobs/changes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Số ngày giữ nhật ký, mặc định JOB_CHANGES_RETENTION_DAYS')
+
+    def handle(self, *args, **options):
+        count = prune(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Đã xóa {count} bản ghi thay đổi.'))
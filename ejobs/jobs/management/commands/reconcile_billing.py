@@ -0,0 +1,91 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from vnpay.models import Billing
+
+from jobs.entitlements import invalidate_entitlements
+from jobs.models import EmployerService, Service, ServicePurchase
+from jobs.payments import extended_end_date
+
+
+class Command(BaseCommand):
+    help = 'Áp dụng các hóa đơn đã thanh toán nhưng chưa được ghi nhận vào dịch vụ của nhà tuyển dụng'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--dry-run', action='store_true', help='Chỉ liệt kê, không ghi vào DB')
+
+    def handle(self, *args, **options):
+        # Hóa đơn không ghi mã dịch vụ, xác định dịch vụ theo số tiền (chỉ khi giá là duy nhất)
+        services_by_price = defaultdict(list)
+        for service in Service.objects.filter(is_active=True):
+            services_by_price[service.price].append(service)
+
+        pending = Billing.objects.filter(is_paid=True, pay_by__isnull=False, service_purchase__isnull=True)
+        applied = skipped = 0
+        last_id = 0
+        while True:
+            ids = list(pending.filter(id__gt=last_id).order_by('id')
+                       .values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            last_id = ids[-1]
+            batch_applied, batch_skipped = self.process_batch(ids, services_by_price, options['dry_run'])
+            applied += batch_applied
+            skipped += batch_skipped
+
+        action = 'Có thể áp dụng' if options['dry_run'] else 'Đã áp dụng'
+        self.stdout.write(self.style.SUCCESS(f'{action} {applied} hóa đơn, bỏ qua {skipped} hóa đơn.'))
+
+    def process_batch(self, ids, services_by_price, dry_run):
+        with transaction.atomic():
+            # Bỏ qua hóa đơn đang bị callback purchase khóa, lần chạy sau sẽ xử lý nếu còn
+            bills = list(Billing.objects.select_for_update(skip_locked=True).filter(id__in=ids).order_by('id'))
+            done = set(ServicePurchase.objects.filter(billing_id__in=ids).values_list('billing_id', flat=True))
+            bills = [bill for bill in bills if bill.id not in done]
+
+            matched, skipped = [], 0
+            for bill in bills:
+                services = services_by_price.get(bill.amount, [])
+                if len(services) != 1:
+                    skipped += 1
+                    self.stderr.write(f'Hóa đơn {bill.reference_number}: không xác định được dịch vụ')
+                    continue
+                matched.append((bill, services[0]))
+            if dry_run or not matched:
+                return len(matched), skipped
+
+            # Khóa một lần các dịch vụ đang hoạt động của những người dùng trong lô
+            user_ids = {bill.pay_by_id for bill, _ in matched}
+            active = {}
+            for employer_service in EmployerService.objects.select_for_update() \
+                    .filter(user_id__in=user_ids, is_active=True).order_by('id'):
+                active.setdefault((employer_service.user_id, employer_service.service_id), employer_service)
+
+            purchases, extended = [], {}
+            for bill, service in matched:
+                key = (bill.pay_by_id, service.id)
+                employer_service = active.get(key)
+                if employer_service is None:
+                    employer_service = EmployerService.objects.create(
+                        user_id=bill.pay_by_id,
+                        service=service,
+                        end_date=extended_end_date(None, service),
+                        amount=service.price,
+                    )
+                    active[key] = employer_service
+                else:
+                    employer_service.end_date = extended_end_date(employer_service.end_date, service)
+                    extended[employer_service.id] = employer_service
+                purchases.append(ServicePurchase(billing=bill, user_id=bill.pay_by_id, service=service,
+                                                 employer_service=employer_service))
+
+            EmployerService.objects.bulk_update(list(extended.values()), ['end_date'])
+            ServicePurchase.objects.bulk_create(purchases)
+
+            def invalidate():
+                for user_id in user_ids:
+                    invalidate_entitlements(user_id)
+            transaction.on_commit(invalidate)
+        return len(purchases), skipped
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.featured import BUILDERS, refresh
+
+
+class Command(BaseCommand):
+    help = 'Tính lại các danh sách việc làm nổi bật (chạy định kỳ bằng cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help=f'Tên danh sách ({", ".join(BUILDERS)}), mặc định tất cả')
+
+    def handle(self, *args, **options):
+        unknown = set(options['names']) - set(BUILDERS)
+        if unknown:
+            raise CommandError(f'Danh sách không tồn tại: {", ".join(sorted(unknown))}')
+        for name in options['names'] or BUILDERS:
+            start = time.perf_counter()
+            ids = refresh(name)
+            self.stdout.write(f'{name}: {len(ids)} việc làm ({(time.perf_counter() - start) * 1000:.0f}ms)')
@@ -0,0 +1,353 @@
+import threading
+import time
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Seeker, JobApplication
+from .typeahead import normalize
+
+# Phiên bản ma trận dùng chung giữa các worker, tăng mỗi khi hồ sơ ứng viên thay đổi.
+# Mỗi phiên bản ghi kèm user_id thay đổi (CHANGE_KEY) để worker khác cập nhật đúng ứng viên đó
+VERSION_KEY = 'seeker_matrix_version'
+CHANGE_KEY = 'seeker_matrix_change:{}'
+# Worker chậm hơn quá nhiều phiên bản thì xây dựng lại thay vì đọc từng thay đổi
+MAX_DELTA = 1000
+
+# Trọng số điểm phù hợp (tổng 100)
+TECHNOLOGY_WEIGHT = 60
+LOCATION_WEIGHT = 25
+EXPERIENCE_WEIGHT = 15
+
+NO_VALUE = 0
+
+
+def _bump_version():
+    cache.add(VERSION_KEY, 0, None)
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        return None
+
+
+def _publish(user_id):
+    version = _bump_version()
+    if version is not None:
+        cache.set(CHANGE_KEY.format(version), user_id, settings.SEEKER_MATRIX_REBUILD_INTERVAL)
+    return version
+
+
+def _load_profiles(user_ids):
+    # {user_id: (location, experience, [technology_id])} của các ứng viên còn hoạt động trong user_ids
+    result = {user_id: (location, experience, []) for user_id, location, experience in
+              Seeker.objects.filter(user_id__in=user_ids, user__is_active=True)
+              .values_list('user_id', 'location', 'experience')}
+    for user_id, technology_id in Seeker.technologies.through.objects.filter(seeker__user_id__in=list(result)) \
+            .values_list('seeker__user_id', 'technology_id'):
+        result[user_id][2].append(technology_id)
+    return result
+
+
+# numpy chỉ được import trong các hàm dùng đến nó: worker không gọi API xếp hạng ứng viên khởi động nhanh hơn.
+# user_id/technology_id lưu dạng uint32 như array('I') trước đây
+def _empty():
+    import numpy as np
+    return np.zeros(0, dtype=np.uint32)
+
+
+def _group(keys, values):
+    # {key: mảng values đã sắp xếp} từ hai mảng song song
+    import numpy as np
+    order = np.lexsort((values, keys))
+    keys, values = keys[order], values[order]
+    unique, starts = np.unique(keys, return_index=True)
+    return {int(key): group for key, group in zip(unique, np.split(values, starts[1:]))}
+
+
+class Postings:
+    # Danh sách user_id dạng mảng numpy đã sắp xếp. Thay đổi lẻ được gom vào added/removed
+    # và chỉ gộp vào mảng khi xếp hạng cần đọc
+    __slots__ = ('base', 'added', 'removed')
+
+    def __init__(self, base=None):
+        self.base = _empty() if base is None else base
+        self.added = set()
+        self.removed = set()
+
+    def add(self, user_id):
+        self.removed.discard(user_id)
+        self.added.add(user_id)
+
+    def discard(self, user_id):
+        self.added.discard(user_id)
+        self.removed.add(user_id)
+
+    def array(self):
+        import numpy as np
+        if self.removed:
+            self.base = self.base[~np.isin(self.base, np.fromiter(self.removed, dtype=np.uint32))]
+            self.removed.clear()
+        if self.added:
+            self.base = np.union1d(self.base, np.fromiter(self.added, dtype=np.uint32))
+            self.added.clear()
+        return self.base
+
+
+class SeekerMatrix:
+    # Ma trận kỹ năng của ứng viên lưu dạng thưa trong bộ nhớ bằng mảng numpy:
+    # - technology_id -> Postings các user_id có kỹ năng đó (đếm số kỹ năng trùng bằng np.unique)
+    # - user_id -> các technology_id dạng CSR (user_offsets, user_technologies), ứng viên sửa hồ sơ sau lần
+    #   xây dựng gần nhất nằm trong changed_technologies. Dùng để cập nhật một ứng viên mà không duyệt mọi kỹ năng
+    # - location/experience được mã hóa thành số nhỏ, lưu trong mảng đánh chỉ số theo user_id
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.built = False
+        self.built_at = 0
+        self.version = None
+        self.technologies = {}
+        self.locations = {}  # mã địa điểm -> Postings
+        self.changed_technologies = {}
+        self.location_codes = {}
+        self.experience_codes = {}
+        # Các mảng numpy được tạo khi xây dựng ma trận lần đầu (rebuild)
+        self.user_offsets = None
+        self.user_technologies = None
+        self.seeker_location = None
+        self.seeker_experience = None
+
+    def _init_arrays(self):
+        import numpy as np
+        self.user_offsets = np.zeros(1, dtype=np.uint32)
+        self.user_technologies = _empty()
+        self.seeker_location = np.zeros(0, dtype=np.uint16)
+        self.seeker_experience = np.zeros(0, dtype=np.uint8)
+
+    def _code(self, codes, value, limit):
+        key = normalize(value)
+        if not key:
+            return NO_VALUE
+        if key not in codes:
+            if len(codes) + 1 >= limit:
+                return NO_VALUE
+            codes[key] = len(codes) + 1
+        return codes[key]
+
+    def _ensure_size(self, user_id):
+        import numpy as np
+        size = len(self.seeker_location)
+        if user_id >= size:
+            missing = max(user_id + 1, size * 2) - size
+            self.seeker_location = np.concatenate([self.seeker_location, np.zeros(missing, dtype=np.uint16)])
+            self.seeker_experience = np.concatenate([self.seeker_experience, np.zeros(missing, dtype=np.uint8)])
+
+    def _technologies_of(self, user_id):
+        if user_id in self.changed_technologies:
+            return self.changed_technologies[user_id]
+        if user_id + 1 < len(self.user_offsets):
+            return self.user_technologies[self.user_offsets[user_id]:self.user_offsets[user_id + 1]].tolist()
+        return ()
+
+    def _add(self, user_id, location, experience, technology_ids):
+        self._ensure_size(user_id)
+        location_code = self._code(self.location_codes, location, 2 ** 16)
+        self.seeker_location[user_id] = location_code
+        self.seeker_experience[user_id] = self._code(self.experience_codes, experience, 2 ** 8)
+        if location_code:
+            self.locations.setdefault(location_code, Postings()).add(user_id)
+        for technology_id in technology_ids:
+            self.technologies.setdefault(technology_id, Postings()).add(user_id)
+        self.changed_technologies[user_id] = tuple(technology_ids)
+
+    def _remove(self, user_id):
+        if user_id >= len(self.seeker_location):
+            return
+        location_code = int(self.seeker_location[user_id])
+        if location_code in self.locations:
+            self.locations[location_code].discard(user_id)
+        self.seeker_location[user_id] = NO_VALUE
+        self.seeker_experience[user_id] = NO_VALUE
+        for technology_id in self._technologies_of(user_id):
+            if technology_id in self.technologies:
+                self.technologies[technology_id].discard(user_id)
+        self.changed_technologies[user_id] = ()
+
+    # Xây dựng lại toàn bộ
+    def rebuild(self):
+        # Dựng ma trận mới rồi mới thay thế, các request đang xếp hạng vẫn dùng ma trận cũ
+        import numpy as np
+        version = cache.get(VERSION_KEY)
+        fresh = SeekerMatrix()
+        fresh._init_arrays()
+        profiles = Seeker.objects.filter(user__is_active=True).order_by('user_id') \
+            .values_list('user_id', 'location', 'experience')
+        for user_id, location, experience in profiles.iterator(chunk_size=10000):
+            fresh._ensure_size(user_id)
+            fresh.seeker_location[user_id] = fresh._code(fresh.location_codes, location, 2 ** 16)
+            fresh.seeker_experience[user_id] = fresh._code(fresh.experience_codes, experience, 2 ** 8)
+
+        user_ids, technology_ids = array('I'), array('I')
+        through = Seeker.technologies.through.objects.filter(seeker__user__is_active=True) \
+            .values_list('seeker__user_id', 'technology_id')
+        for user_id, technology_id in through.iterator(chunk_size=10000):
+            user_ids.append(user_id)
+            technology_ids.append(technology_id)
+        user_ids = np.frombuffer(user_ids, dtype=np.uint32)
+        technology_ids = np.frombuffer(technology_ids, dtype=np.uint32)
+        # Bỏ liên kết của ứng viên vừa tạo sau khi đã đọc hồ sơ
+        known = user_ids < len(fresh.seeker_location)
+        user_ids, technology_ids = user_ids[known], technology_ids[known]
+
+        fresh.technologies = {technology_id: Postings(group)
+                              for technology_id, group in _group(technology_ids, user_ids).items()}
+        seekers = np.nonzero(fresh.seeker_location)[0]
+        fresh.locations = {code: Postings(group)
+                           for code, group in _group(fresh.seeker_location[seekers], seekers.astype(np.uint32)).items()}
+        order = np.lexsort((technology_ids, user_ids))
+        fresh.user_technologies = technology_ids[order]
+        fresh.user_offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(user_ids, minlength=len(fresh.seeker_location)))]).astype(np.uint32)
+
+        with self.lock:
+            self.technologies = fresh.technologies
+            self.locations = fresh.locations
+            self.user_offsets = fresh.user_offsets
+            self.user_technologies = fresh.user_technologies
+            self.changed_technologies = {}
+            self.location_codes = fresh.location_codes
+            self.experience_codes = fresh.experience_codes
+            self.seeker_location = fresh.seeker_location
+            self.seeker_experience = fresh.seeker_experience
+            self.version = version
+            self.built = True
+            self.built_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        if not self.built or time.monotonic() - self.built_at > settings.SEEKER_MATRIX_REBUILD_INTERVAL:
+            self.rebuild()
+            return
+        latest = cache.get(VERSION_KEY)
+        if latest == self.version:
+            return
+        if latest is None or self.version is None or not 0 < latest - self.version <= MAX_DELTA:
+            self.rebuild()
+            return
+        # Áp dụng các thay đổi từ worker khác thay vì xây dựng lại toàn bộ
+        keys = [CHANGE_KEY.format(version) for version in range(self.version + 1, latest + 1)]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            # Thiếu thay đổi (invalidate() hoặc cache đã xóa): không biết ứng viên nào bị ảnh hưởng
+            self.rebuild()
+            return
+        self._reload(set(changes.values()), latest)
+
+    def _reload(self, user_ids, version=None):
+        profiles = _load_profiles(user_ids)
+        with self.lock:
+            for user_id in user_ids:
+                self._remove(user_id)
+                if user_id in profiles:
+                    self._add(user_id, *profiles[user_id])
+            if version is not None:
+                self.version = max(self.version or 0, version)
+
+    # Cập nhật tăng dần khi ứng viên sửa hồ sơ, worker khác nhận thay đổi qua CHANGE_KEY
+    def update_seeker(self, user_id):
+        _publish(user_id)
+        if self.built:
+            self._reload({user_id})
+
+    def remove_seeker(self, user_id):
+        _publish(user_id)
+        if self.built:
+            with self.lock:
+                self._remove(user_id)
+
+    def invalidate(self):
+        # Hồ sơ thay đổi hàng loạt (bulk_create không gửi signal): mọi worker xây dựng lại ở lần xếp hạng sau
+        _bump_version()
+        self.built = False
+
+    # Xếp hạng
+    def rank(self, technology_ids, location, experience, limit=20):
+        # Trả về [(điểm, user_id)] của `limit` ứng viên phù hợp nhất, tính điểm trên mảng numpy
+        import numpy as np
+        self._ensure_fresh()
+        technology_ids = set(technology_ids)
+        location_key, experience_key = normalize(location), normalize(experience)
+
+        with self.lock:
+            location_code = self.location_codes.get(location_key, NO_VALUE) if location_key else NO_VALUE
+            experience_code = self.experience_codes.get(experience_key, NO_VALUE) if experience_key else NO_VALUE
+
+            postings = [self.technologies[technology_id].array()
+                        for technology_id in technology_ids if technology_id in self.technologies]
+            if technology_ids:
+                # Số kỹ năng trùng của mỗi ứng viên
+                user_ids, overlap = np.unique(np.concatenate(postings or [_empty()]), return_counts=True)
+            elif location_code in self.locations:
+                # Việc làm không yêu cầu công nghệ: xét các ứng viên cùng địa điểm
+                user_ids = self.locations[location_code].array()
+                overlap = np.zeros(len(user_ids), dtype=np.int64)
+            else:
+                return []
+
+            technology_points = TECHNOLOGY_WEIGHT / len(technology_ids) if technology_ids else 0
+            location_points = LOCATION_WEIGHT if location_code else 0
+            experience_points = EXPERIENCE_WEIGHT if experience_code else 0
+            scores = (overlap * technology_points +
+                      (self.seeker_location[user_ids] == location_code) * location_points +
+                      (self.seeker_experience[user_ids] == experience_code) * experience_points)
+
+        if len(scores) > limit:
+            # Giữ các ứng viên có điểm từ ngưỡng thứ `limit` trở lên (kể cả bằng điểm) rồi mới sắp xếp
+            threshold = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            selected = np.nonzero(scores >= threshold)[0]
+            user_ids, scores = user_ids[selected], scores[selected]
+        order = np.lexsort((user_ids, -scores))[:limit]
+        return [(round(float(scores[i]), 2), int(user_ids[i])) for i in order]
+
+
+def rank_candidates(job, limit=20):
+    # Ứng viên phù hợp nhất với việc làm, kèm kỹ năng trùng và trạng thái đã ứng tuyển
+    technology_ids = set(job.technologies.values_list('id', flat=True))
+    # Lấy dư để bù các tài khoản bị khóa sau lần xây dựng ma trận gần nhất
+    ranked = matrix.rank(technology_ids, job.location, job.experience, limit * 2)
+    user_ids = [user_id for _, user_id in ranked]
+
+    profiles = {profile.user_id: profile for profile in
+                Seeker.objects.filter(user_id__in=user_ids, user__is_active=True).select_related('user')}
+    skills = {}
+    for user_id, technology_id, name in Seeker.technologies.through.objects \
+            .filter(seeker__user_id__in=user_ids, technology_id__in=technology_ids) \
+            .values_list('seeker__user_id', 'technology_id', 'technology__name'):
+        skills.setdefault(user_id, []).append({'id': technology_id, 'name': name})
+    applied = set(JobApplication.objects.filter(job=job, seeker_id__in=user_ids).values_list('seeker_id', flat=True))
+
+    candidates = []
+    for points, user_id in ranked:
+        profile = profiles.get(user_id)
+        if profile is None:
+            continue
+        user = profile.user
+        candidates.append({
+            'id': user.id,
+            'username': user.username,
+            'email': user.email,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'avatar': user.avatar.url if user.avatar else None,
+            'location': profile.location,
+            'experience': profile.experience,
+            'score': points,
+            'matched_technologies': skills.get(user_id, []),
+            'location_match': bool(profile.location) and normalize(profile.location) == normalize(job.location),
+            'experience_match': bool(profile.experience) and normalize(profile.experience) == normalize(job.experience),
+            'applied': user_id in applied,
+        })
+        if len(candidates) == limit:
+            break
+    return candidates
+
+
+matrix = SeekerMatrix()
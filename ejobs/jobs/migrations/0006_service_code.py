@@ -0,0 +1,25 @@
+# Generated by Django 5.1 on 2026-10-19 12:03
+
+from django.db import migrations, models
+
+
+def set_statistics_code(apps, schema_editor):
+    # Dịch vụ "Thống kê" trước đây được kiểm tra bằng id=2
+    Service = apps.get_model('jobs', 'Service')
+    Service.objects.filter(pk=2, code__isnull=True).update(code='statistics')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_alter_user_avatar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='code',
+            field=models.SlugField(blank=True, null=True, unique=True),
+        ),
+        migrations.RunPython(set_statistics_code, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1 on 2026-10-19 12:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_service_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobCounter',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counter', serialize=False, to='jobs.job')),
+                ('views', models.PositiveBigIntegerField(default=0)),
+                ('impressions', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
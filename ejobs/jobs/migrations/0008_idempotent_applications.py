@@ -0,0 +1,51 @@
+# Generated by Django 5.1 on 2026-10-19 12:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def remove_duplicate_applications(apps, schema_editor):
+    # Giữ lại đơn ứng tuyển đầu tiên của mỗi cặp (job, seeker) trước khi thêm ràng buộc unique.
+    # Chỉ đọc các cặp bị trùng (GROUP BY trong DB), không duyệt toàn bộ bảng
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    duplicated = (JobApplication.objects.values('job_id', 'seeker_id')
+                  .annotate(count=models.Count('id'), first_id=models.Min('id')).filter(count__gt=1))
+    for row in duplicated:
+        JobApplication.objects.filter(job_id=row['job_id'], seeker_id=row['seeker_id']) \
+            .exclude(id=row['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_jobcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('response_body', models.JSONField(null=True)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(remove_duplicate_applications, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='jobapplication',
+            constraint=models.UniqueConstraint(fields=('job', 'seeker'), name='unique_job_application'),
+        ),
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencykey',
+            constraint=models.UniqueConstraint(fields=('user', 'key'), name='unique_idempotency_key'),
+        ),
+    ]
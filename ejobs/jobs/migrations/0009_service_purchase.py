@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-19 12:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_paid_bills(apps, schema_editor):
+    # Hóa đơn đã thanh toán trước khi có bảng này coi như đã được áp dụng, tránh đối soát gia hạn lại
+    Billing = apps.get_model('vnpay', 'Billing')
+    ServicePurchase = apps.get_model('jobs', 'ServicePurchase')
+    ServicePurchase.objects.bulk_create([
+        ServicePurchase(billing_id=pk, user_id=user_id)
+        for pk, user_id in Billing.objects.filter(is_paid=True).values_list('id', 'pay_by_id')
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_idempotent_applications'),
+        ('vnpay', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServicePurchase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('billing', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='service_purchase', to='vnpay.billing')),
+                ('employer_service', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='jobs.employerservice')),
+                ('service', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='jobs.service')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(mark_paid_bills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1 on 2026-10-19 12:16
+
+import cloudinary.models
+import django.db.models.deletion
+import enumchoicefield.fields
+import jobs.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_service_purchase'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJob',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('requirements', models.TextField()),
+                ('location', models.CharField(max_length=255)),
+                ('location_detail', models.CharField(max_length=255)),
+                ('salary', models.CharField(max_length=255)),
+                ('expiration_date', models.DateTimeField()),
+                ('experience', models.CharField(max_length=20)),
+                ('quantity', models.IntegerField(blank=True, null=True)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('views', models.PositiveBigIntegerField(default=0)),
+                ('impressions', models.PositiveBigIntegerField(default=0)),
+                ('created_date', models.DateTimeField()),
+                ('updated_date', models.DateField()),
+                ('archived_date', models.DateTimeField(auto_now_add=True)),
+                ('employer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_jobs', to=settings.AUTH_USER_MODEL)),
+                ('technologies', models.ManyToManyField(blank=True, related_name='+', to='jobs.technology')),
+            ],
+            options={
+                'ordering': ['-expiration_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedJobApplication',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('cover_letter', models.TextField()),
+                ('status', enumchoicefield.fields.EnumChoiceField(default=jobs.models.CVStatus['PENDING'], enum_class=jobs.models.CVStatus, max_length=7)),
+                ('cv', cloudinary.models.CloudinaryField(max_length=255)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(max_length=11)),
+                ('name', models.CharField(max_length=255)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_date', models.DateTimeField()),
+                ('updated_date', models.DateField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.archivedjob')),
+                ('seeker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_applications', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedSaveJob',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_date', models.DateTimeField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saves', to='jobs.archivedjob')),
+                ('seeker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-19 12:17
+
+from django.db import migrations, models
+
+from jobs.geo import encode_geohash
+
+
+def fill_geohash(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    last_id = 0
+    while True:
+        jobs = list(Job.objects.filter(id__gt=last_id).order_by('id').only('id', 'latitude', 'longitude')[:2000])
+        if not jobs:
+            break
+        for job in jobs:
+            job.geohash = encode_geohash(job.latitude, job.longitude)
+        Job.objects.bulk_update(jobs, ['geohash'])
+        last_id = jobs[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=12),
+        ),
+        migrations.RunPython(fill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-19 12:31
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_saves(apps, schema_editor):
+    # Giữ lại lượt lưu đầu tiên của mỗi cặp (seeker, job) trước khi thêm ràng buộc unique, chỉ duyệt các cặp bị trùng
+    SaveJob = apps.get_model('jobs', 'SaveJob')
+    duplicates = SaveJob.objects.values('seeker_id', 'job_id').annotate(keep=Min('id'), count=Count('id')) \
+        .filter(count__gt=1).order_by()
+    for row in duplicates.iterator():
+        SaveJob.objects.filter(seeker_id=row['seeker_id'], job_id=row['job_id']).exclude(id=row['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_job_geohash'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_saves, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='savejob',
+            constraint=models.UniqueConstraint(fields=('seeker', 'job'), name='unique_save_job'),
+        ),
+    ]
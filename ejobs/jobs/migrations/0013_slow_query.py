@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-19 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_savejob_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(db_index=True, max_length=40)),
+                ('sql', models.TextField()),
+                ('params_fingerprint', models.CharField(max_length=16)),
+                ('duration', models.FloatField()),
+                ('database', models.CharField(max_length=50)),
+                ('view', models.CharField(max_length=255)),
+                ('method', models.CharField(max_length=10)),
+                ('stack', models.TextField()),
+                ('created_date', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['-created_date'],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1 on 2026-10-19 12:40
+
+import enumchoicefield.fields
+import jobs.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_slow_query'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.BigIntegerField()),
+                ('kind', enumchoicefield.fields.EnumChoiceField(enum_class=jobs.models.ChangeKind, max_length=7)),
+                ('created_date', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-19 12:53
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_job_change'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='technology',
+            options={'ordering': ['id']},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-19 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_technology_ordering'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='idempotencykey',
+            name='created_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-19 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_idempotency_key_created_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='expiration_date',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -1,12 +1,13 @@
-from datetime import timezone
-
 from dateutil.relativedelta import relativedelta
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from enum import Enum
 from enumchoicefield import EnumChoiceField
 from cloudinary.models import CloudinaryField
 
+from .geo import encode_geohash
+
 
 class BaseModel(models.Model):
     created_date = models.DateTimeField(auto_now_add=True)
@@ -20,6 +21,10 @@ class BaseModel(models.Model):
 class Technology(models.Model):
     name = models.CharField(max_length=255, unique=True)
 
+    class Meta:
+        # Thứ tự cố định cho job.technologies.all() và danh sách dựng từ values() (jobs/projections.py)
+        ordering = ['id']
+
     def __str__(self):
         return self.name
 
@@ -83,18 +88,46 @@ class Job(BaseModel):
     location = models.CharField(max_length=255)
     location_detail = models.CharField(max_length=255)
     salary = models.CharField(max_length=255)
-    expiration_date = models.DateTimeField()
+    expiration_date = models.DateTimeField(db_index=True)  # Lọc việc làm còn hạn, việc làm hết hạn khi đồng bộ delta
     experience = models.CharField(max_length=20)
     technologies = models.ManyToManyField(Technology)
     created_at = BaseModel.created_date
     quantity = models.IntegerField(null=True, blank=True)
     latitude = models.FloatField()
     longitude = models.FloatField()
+    geohash = models.CharField(max_length=12, db_index=True, blank=True, default='')  # Ô lưới để gom cụm trên bản đồ
     is_active = models.BooleanField(default=True)
+
+    def save(self, *args, **kwargs):
+        # Tính lại geohash theo tọa độ mỗi khi lưu
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
 
 
+# Bộ đếm lượt xem/lượt hiển thị của việc làm, được ghi theo lô (jobs/counters.py)
+class JobCounter(models.Model):
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='counter')
+    views = models.PositiveBigIntegerField(default=0)  # Lượt xem chi tiết
+    impressions = models.PositiveBigIntegerField(default=0)  # Lượt xuất hiện trong danh sách
+
+
+class ChangeKind(Enum):
+    CREATED = 'created'
+    UPDATED = 'updated'
+    REMOVED = 'removed'  # Việc làm bị xóa hoặc chuyển sang kho lưu trữ
+
+
+# Nhật ký thay đổi việc làm cho đồng bộ delta (jobs/changes.py), id tăng dần được dùng làm sync token.
+# Không dùng khóa ngoại để giữ lại bản ghi sau khi việc làm bị xóa
+class JobChange(models.Model):
+    job_id = models.BigIntegerField()
+    kind = EnumChoiceField(ChangeKind)
+    created_date = models.DateTimeField(auto_now_add=True, db_index=True)
+
+
 class CVStatus(Enum):
     OPEN = 'open' #Chấp nhận cv, chờ phỏng vấn
     CLOSED = 'closed'
@@ -113,6 +146,27 @@ class JobApplication(BaseModel):
     phone = models.CharField(max_length=11)
     name = models.CharField(max_length=255)
 
+    class Meta:
+        constraints = [
+            # Mỗi ứng viên chỉ ứng tuyển một lần cho mỗi công việc
+            models.UniqueConstraint(fields=['job', 'seeker'], name='unique_job_application'),
+        ]
+
+
+# Lưu kết quả của request có header Idempotency-Key để trả lại khi client gửi lại
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)  # Hash nội dung request
+    status_code = models.PositiveSmallIntegerField()
+    response_body = models.JSONField(null=True)
+    created_date = models.DateTimeField(auto_now_add=True, db_index=True)  # Xóa key hết hạn theo cột này
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key'),
+        ]
+
 
 class SaveJob(models.Model):
     created_date = models.DateTimeField(auto_now_add=True)
@@ -121,10 +175,15 @@ class SaveJob(models.Model):
 
     class Meta:
         ordering = ['-created_date']
+        constraints = [
+            # Mỗi ứng viên chỉ lưu một công việc một lần, lưu hàng loạt dựa vào ràng buộc này để bỏ qua bản trùng
+            models.UniqueConstraint(fields=['seeker', 'job'], name='unique_save_job'),
+        ]
 
 
 class Service(models.Model):
     name = models.CharField(max_length=100)  # Tên dịch vụ
+    code = models.SlugField(max_length=50, unique=True, null=True, blank=True)  # Mã dịch vụ dùng để phân quyền, vd: statistics
     description = models.TextField(null=True, blank=True)  # Mô tả dịch vụ
     description_detail = models.TextField(null=True, blank=True)  # Mô tả dịch vụ
     price = models.DecimalField(max_digits=10, decimal_places=2)  # Giá của dịch vụ
@@ -154,3 +213,81 @@ class EmployerService(models.Model):
         # Kiểm tra xem dịch vụ còn hoạt động không
         return self.is_active and timezone.now() < self.end_date
 
+
+
+class ServicePurchase(models.Model):
+    # Mỗi hóa đơn VNPay chỉ được dùng để mua/gia hạn dịch vụ một lần
+    billing = models.OneToOneField('vnpay.Billing', on_delete=models.CASCADE, related_name='service_purchase')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
+    service = models.ForeignKey(Service, on_delete=models.SET_NULL, null=True)
+    employer_service = models.ForeignKey(EmployerService, on_delete=models.SET_NULL, null=True)
+    created_date = models.DateTimeField(auto_now_add=True)
+
+
+# Kho lưu trữ: việc làm hết hạn lâu ngày cùng đơn ứng tuyển và lượt lưu được chuyển sang các bảng dưới
+# (jobs/archive.py). Giữ nguyên id của bản ghi gốc để có thể khôi phục
+class ArchivedJob(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    employer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_jobs')
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    requirements = models.TextField()
+    location = models.CharField(max_length=255)
+    location_detail = models.CharField(max_length=255)
+    salary = models.CharField(max_length=255)
+    expiration_date = models.DateTimeField()
+    experience = models.CharField(max_length=20)
+    technologies = models.ManyToManyField(Technology, blank=True, related_name='+')
+    quantity = models.IntegerField(null=True, blank=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    is_active = models.BooleanField(default=True)
+    views = models.PositiveBigIntegerField(default=0)
+    impressions = models.PositiveBigIntegerField(default=0)
+    created_date = models.DateTimeField()
+    updated_date = models.DateField()
+    archived_date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-expiration_date']
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedJobApplication(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    job = models.ForeignKey(ArchivedJob, on_delete=models.CASCADE, related_name='applications')
+    seeker = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_applications')
+    cover_letter = models.TextField()
+    status = EnumChoiceField(CVStatus, default=CVStatus.PENDING)
+    cv = CloudinaryField()
+    email = models.EmailField()
+    phone = models.CharField(max_length=11)
+    name = models.CharField(max_length=255)
+    is_active = models.BooleanField(default=True)
+    created_date = models.DateTimeField()
+    updated_date = models.DateField()
+
+
+class ArchivedSaveJob(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    job = models.ForeignKey(ArchivedJob, on_delete=models.CASCADE, related_name='saves')
+    seeker = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    created_date = models.DateTimeField()
+
+
+# Truy vấn chậm hơn SLOW_QUERY_THRESHOLD_MS, ghi bởi jobs/slow_queries.py
+class SlowQuery(models.Model):
+    fingerprint = models.CharField(max_length=40, db_index=True)  # Hash của câu SQL đã chuẩn hóa
+    sql = models.TextField()  # Câu SQL đã chuẩn hóa
+    params_fingerprint = models.CharField(max_length=16)
+    duration = models.FloatField()  # Mili giây
+    database = models.CharField(max_length=50)
+    view = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    stack = models.TextField()
+    created_date = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_date']
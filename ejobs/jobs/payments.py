@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .entitlements import invalidate_entitlements
+from .models import EmployerService, ServicePurchase
+
+# Kết quả xác nhận hóa đơn
+CREATED = 'created'
+EXTENDED = 'extended'
+ALREADY_PROCESSED = 'already_processed'
+
+
+def extended_end_date(end_date, service, now=None):
+    # Gia hạn tiếp từ ngày hết hạn hiện tại, dịch vụ đã hết hạn thì tính từ bây giờ
+    now = now or timezone.now()
+    start = end_date if end_date and end_date > now else now
+    return start + timedelta(days=30 * service.duration)
+
+
+def apply_bill(bill, user_id, service):
+    # Áp dụng hóa đơn đã thanh toán cho dịch vụ của nhà tuyển dụng.
+    # Phải gọi trong transaction.atomic() và bill đã được khóa bằng select_for_update()
+    purchase = ServicePurchase.objects.filter(billing=bill).first()
+    if purchase:
+        return ALREADY_PROCESSED, purchase.employer_service
+
+    employer_service = EmployerService.objects.select_for_update() \
+        .filter(user_id=user_id, service=service, is_active=True).order_by('id').first()
+    if employer_service:
+        employer_service.end_date = extended_end_date(employer_service.end_date, service)
+        employer_service.save(update_fields=['end_date'])
+        result = EXTENDED
+    else:
+        employer_service = EmployerService.objects.create(
+            user_id=user_id,
+            service=service,
+            end_date=extended_end_date(None, service),
+            amount=service.price,
+        )
+        result = CREATED
+
+    ServicePurchase.objects.create(billing=bill, user_id=user_id, service=service,
+                                   employer_service=employer_service)
+    # Xóa cache quyền sau khi commit để request khác không đọc lại dữ liệu cũ
+    transaction.on_commit(lambda: invalidate_entitlements(user_id))
+    return result, employer_service
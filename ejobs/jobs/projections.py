@@ -0,0 +1,60 @@
+from .models import Job, User
+from .serializer import JobSerializer, UserStats, JobUserFlags
+
+# Các cột cần cho danh sách việc làm, lấy bằng values() thay vì tạo đối tượng Job
+JOB_VALUE_FIELDS = ['id', 'employer_id', 'title', 'location', 'location_detail', 'salary', 'experience',
+                    'expiration_date', 'description', 'requirements', 'quantity', 'is_active', 'latitude',
+                    'longitude']
+
+
+def job_values(queryset):
+    return queryset.values(*JOB_VALUE_FIELDS)
+
+
+def project_jobs(rows, request):
+    # Dựng danh sách dict cho việc làm từ values(), kết quả giống hệt JobSerializer(many=True).data
+    # rows: danh sách dict lấy từ job_values()
+    rows = list(rows)
+    if not rows:
+        return []
+
+    job_ids = [row['id'] for row in rows]
+    employer_ids = {row['employer_id'] for row in rows}
+    # Trường tính toán của nhà tuyển dụng và is_saved/is_applied: mỗi loại một truy vấn cho cả trang
+    flags = JobUserFlags(job_ids, request)
+    serializer = JobSerializer(context={'request': request, 'user_stats': UserStats(employer_ids, request)})
+    fields = serializer.fields
+
+    # Nhà tuyển dụng: mỗi người chỉ serialize một lần cho cả trang
+    employer_field = fields['employer']
+    employers = User.objects.select_related('employer', 'seeker').prefetch_related('seeker__technologies') \
+        .in_bulk(employer_ids)
+    employer_data = {
+        pk: employer_field.to_representation(user) for pk, user in employers.items()
+    }
+
+    # Công nghệ: một truy vấn cho toàn bộ trang, cùng thứ tự với Technology.Meta.ordering
+    technologies = {job_id: [] for job_id in job_ids}
+    through_rows = Job.technologies.through.objects.filter(job_id__in=job_ids) \
+        .order_by('technology_id').values_list('job_id', 'technology_id', 'technology__name')
+    for job_id, technology_id, name in through_rows:
+        technologies[job_id].append({'id': technology_id, 'name': name})
+
+    data = []
+    for row in rows:
+        job_id = row['id']
+        item = {}
+        for name, field in fields.items():
+            if name == 'employer':
+                item[name] = employer_data.get(row['employer_id'])
+            elif name == 'technologies':
+                item[name] = technologies[job_id]
+            elif name == 'is_saved':
+                item[name] = job_id in flags.saved
+            elif name == 'is_applied':
+                item[name] = job_id in flags.applied
+            else:
+                value = row[name]
+                item[name] = None if value is None else field.to_representation(value)
+        data.append(item)
+    return data
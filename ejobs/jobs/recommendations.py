@@ -0,0 +1,112 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from ejobs.metrics import record_cache
+from . import changes
+from .models import Job, JobApplication, Seeker
+
+
+def profile_version_key(user_id):
+    return f'recommend_profile:{user_id}'
+
+
+def result_key(user_id, profile_version):
+    return f'recommend:{user_id}:{profile_version}'
+
+
+def _incr(key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def invalidate_seeker(user_id):
+    # Ứng viên sửa kỹ năng/kinh nghiệm/địa điểm: kết quả cũ không còn được đọc tới
+    _incr(profile_version_key(user_id))
+
+
+def matching_jobs(seeker):
+    # Cùng điều kiện với cách tính đề xuất trước đây, việc làm mới nhất trước
+    query = Q(is_active=True, expiration_date__gte=timezone.now())
+    if seeker.experience:
+        query &= Q(experience__icontains=seeker.experience)
+    if seeker.location:
+        query &= Q(location__icontains=seeker.location)
+    technologies = list(seeker.technologies.values_list('id', flat=True))
+    if technologies:
+        query &= Q(technologies__id__in=technologies)
+    return Job.objects.filter(query).distinct().order_by('-id')
+
+
+def _entries(jobs):
+    # (id, hạn nộp dạng timestamp) để lọc việc làm hết hạn khi đọc mà không cần truy vấn
+    return [(job_id, expiration_date.timestamp()) for job_id, expiration_date in
+            jobs.values_list('id', 'expiration_date')[:settings.RECOMMENDATION_LIMIT]]
+
+
+def _build(seeker):
+    # Lấy token trước khi truy vấn: thay đổi xen giữa được áp dụng lại ở lần đồng bộ sau
+    token = changes.current_token()
+    return {'jobs': _entries(matching_jobs(seeker)), 'token': token}
+
+
+def _apply_changes(result, seeker):
+    # Áp dụng các thay đổi việc làm (tạo, sửa, ẩn/hiện lại, gia hạn, xóa) từ nhật ký JobChange.
+    # Trả về None khi cần tính lại toàn bộ
+    if changes.is_expired(result['token']):
+        return None
+    token, has_more, _, changed, removed = changes.changes_since(result['token'])
+    if has_more:
+        return None
+    if token == result['token']:
+        return result
+
+    touched = set(changed) | set(removed)
+    jobs = [entry for entry in result['jobs'] if entry[0] not in touched]
+    if changed:
+        jobs += _entries(matching_jobs(seeker).filter(id__in=changed))
+    jobs.sort(key=lambda entry: -entry[0])
+    if len(result['jobs']) >= settings.RECOMMENDATION_LIMIT and len(jobs) < settings.RECOMMENDATION_LIMIT:
+        # Danh sách đã bị cắt ở RECOMMENDATION_LIMIT: việc làm ngoài danh sách có thể lấp chỗ trống
+        return None
+    return {'jobs': jobs[:settings.RECOMMENDATION_LIMIT], 'token': token}
+
+
+def _cached_result(user_id):
+    key = result_key(user_id, cache.get(profile_version_key(user_id), 0))
+    result = cache.get(key)
+    if result is not None and 'token' not in result:
+        result = None  # Định dạng cũ, chưa có token nhật ký thay đổi
+    # Kết quả đã áp dụng mọi thay đổi khi được đồng bộ sau thay đổi cuối ít nhất JOB_CHANGES_SETTLE_SECONDS:
+    # thay đổi mới hơn có thể chưa được changes_since trả về
+    changed_at = changes.last_changed_at()
+    hit = result is not None and result['synced_at'] - settings.JOB_CHANGES_SETTLE_SECONDS >= changed_at
+    record_cache('recommendations', hit)
+    if hit:
+        return result
+
+    synced_at = time.time()
+    seeker = Seeker.objects.filter(user_id=user_id).first()
+    if seeker is None:
+        return {'jobs': []}
+    if result is not None:
+        result = _apply_changes(result, seeker)
+    if result is None:
+        result = _build(seeker)
+    result['synced_at'] = synced_at
+    cache.set(key, result, settings.RECOMMENDATION_CACHE_TIMEOUT)
+    return result
+
+
+def recommended_job_ids(user_id):
+    # Danh sách id việc làm đề xuất, bỏ việc làm đã hết hạn và đã ứng tuyển
+    result = _cached_result(user_id)
+    now = timezone.now().timestamp()
+    applied = set(JobApplication.objects.filter(seeker_id=user_id).values_list('job_id', flat=True))
+    return [job_id for job_id, expires in result['jobs'] if expires >= now and job_id not in applied]
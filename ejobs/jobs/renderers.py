@@ -0,0 +1,37 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson không bắt buộc, dùng json chuẩn của DRF
+    orjson = None
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    # Dùng orjson khi có thể, kết quả giống hệt JSONRenderer mặc định (compact, utf-8), trừ:
+    # - số thực dạng mũ viết ngắn hơn (1e-7, 1e16 thay cho 1e-07, 1e+16), giá trị khi đọc lại không đổi
+    # - NaN/Infinity thành null, trong khi JSONRenderer (STRICT_JSON) báo lỗi 500
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Giữ nguyên định dạng thụt lề khi client yêu cầu (vd: ?indent=4)
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # Ngày giờ được định dạng bởi JSONEncoder của DRF để kết quả không đổi
+            ret = orjson.dumps(data, default=JSONEncoder().default,
+                               option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+        except TypeError:
+            # Kiểu dữ liệu orjson không hỗ trợ (vd: số nguyên quá lớn)
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Như JSONRenderer: escape U+2028/U+2029 để kết quả nhúng được vào JavaScript
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
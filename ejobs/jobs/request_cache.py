@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Bộ nhớ đệm trong phạm vi một request, vd: dùng chung giữa các request con của batch API
+_store = ContextVar('request_cache', default=None)
+
+
+@contextmanager
+def request_cache():
+    token = _store.set({})
+    try:
+        yield
+    finally:
+        _store.reset(token)
+
+
+def memoize(key, loader):
+    # Ngoài phạm vi request_cache() thì luôn gọi loader
+    store = _store.get()
+    if store is None:
+        return loader()
+    if key not in store:
+        store[key] = loader()
+    return store[key]
+
+
+def forget(key):
+    store = _store.get()
+    if store is not None:
+        store.pop(key, None)
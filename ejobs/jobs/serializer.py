@@ -1,7 +1,73 @@
+from django.db.models import Count, Q, prefetch_related_objects
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 from .models import Job, Employer, User, Seeker, UserRole, SaveJob, JobApplication, Technology, CVStatus, Follow, \
-    Service, EmployerService
+    Service, EmployerService, ArchivedJob, ArchivedJobApplication
+
+
+class SparseFieldsMixin:
+    # Cho phép chọn trường trả về: fields=id,title,salary&expand=employer
+    # Quan hệ lồng nhau được chọn nhưng không có trong expand sẽ chỉ trả về id
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        expand = kwargs.pop('expand', None) or set()
+        super().__init__(*args, **kwargs)
+
+        if fields is None:
+            return
+
+        for name in list(self.fields):
+            field = self.fields[name]
+            if name not in fields:
+                self.fields.pop(name)
+            elif name not in expand and isinstance(field, serializers.BaseSerializer):
+                many = isinstance(field, serializers.ListSerializer)
+                source = field.source if field.source != name else None
+                self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=many, source=source)
+
+
+def _count_by(queryset, field):
+    return dict(queryset.order_by().values(field).annotate(count=Count('id')).values_list(field, 'count'))
+
+
+class UserStats:
+    # Các trường tính toán của EmployerSerializer/UserSerializer cho nhiều người dùng, mỗi loại một truy vấn.
+    # Đặt vào context['user_stats'], người dùng không có trong danh sách vẫn được tính riêng như trước
+    def __init__(self, user_ids, request=None):
+        self.user_ids = set(user_ids)
+        self.pending_cv_count = {}
+        self.accepted_cv_count = {}
+        cv_counts = JobApplication.objects.filter(job__employer_id__in=self.user_ids).order_by() \
+            .values('job__employer_id') \
+            .annotate(pending=Count('id', filter=Q(status=CVStatus.PENDING)),
+                      accepted=Count('id', filter=Q(status=CVStatus.OPEN)))
+        for row in cv_counts:
+            self.pending_cv_count[row['job__employer_id']] = row['pending']
+            self.accepted_cv_count[row['job__employer_id']] = row['accepted']
+        self.followers_count = _count_by(Follow.objects.filter(following_id__in=self.user_ids), 'following_id')
+        self.followed = set()
+        if request and request.user.is_authenticated:
+            self.followed = set(Follow.objects.filter(follower_id=request.user.pk, following_id__in=self.user_ids)
+                                .values_list('following_id', flat=True))
+
+    def __contains__(self, user_id):
+        return user_id in self.user_ids
+
+
+class JobUserFlags:
+    # is_saved/is_applied của người dùng hiện tại cho nhiều việc làm, đặt vào context['job_flags']
+    def __init__(self, job_ids, request=None):
+        self.job_ids = set(job_ids)
+        self.saved = set()
+        self.applied = set()
+        if request and request.user.is_authenticated:
+            self.saved = set(SaveJob.objects.filter(seeker_id=request.user.pk, job_id__in=self.job_ids)
+                             .values_list('job_id', flat=True))
+            self.applied = set(JobApplication.objects.filter(seeker_id=request.user.pk, job_id__in=self.job_ids)
+                               .values_list('job_id', flat=True))
+
+    def __contains__(self, job_id):
+        return job_id in self.job_ids
 
 
 class TechnologySerializer(ModelSerializer):
@@ -20,12 +86,21 @@ class EmployerSerializer(ModelSerializer):
         fields = ['user', 'company_name', 'website', 'size', 'address', 'description', 'approval_status', 'pending_cv_count', 'accepted_cv_count', 'followers_count', 'business_document']
 
     def get_pending_cv_count(self, obj):
+        stats = self.context.get('user_stats')
+        if stats is not None and obj.user_id in stats:
+            return stats.pending_cv_count.get(obj.user_id, 0)
         return JobApplication.objects.filter(job__employer=obj.user, status=CVStatus.PENDING).count()
 
     def get_accepted_cv_count(self, obj):
+        stats = self.context.get('user_stats')
+        if stats is not None and obj.user_id in stats:
+            return stats.accepted_cv_count.get(obj.user_id, 0)
         return JobApplication.objects.filter(job__employer=obj.user, status=CVStatus.OPEN).count()
 
     def get_followers_count(self, obj):
+        stats = self.context.get('user_stats')
+        if stats is not None and obj.user_id in stats:
+            return stats.followers_count.get(obj.user_id, 0)
         return Follow.objects.filter(following=obj.user).count()
 
 
@@ -37,14 +112,15 @@ class SeekerSerializer(serializers.ModelSerializer):
 
 
 
-class UserSerializer(ModelSerializer):
+class UserSerializer(SparseFieldsMixin, ModelSerializer):
     employer = EmployerSerializer(read_only=True)
     seeker = SeekerSerializer(read_only=True)
     role = serializers.ChoiceField(choices=[(role.value, role.name) for role in UserRole])
     followed = serializers.SerializerMethodField()
     def to_representation(self, instance):
         rep = super().to_representation(instance)
-        rep['avatar'] = instance.avatar.url
+        if 'avatar' in rep:
+            rep['avatar'] = instance.avatar.url
         return rep
 
     class Meta:
@@ -52,6 +128,9 @@ class UserSerializer(ModelSerializer):
         fields = ["id", "username", "email", "password", "avatar", "role",  "employer", "seeker", "followed"]
 
     def get_followed(self, obj):
+        stats = self.context.get('user_stats')
+        if stats is not None and obj.pk in stats:
+            return obj.pk in stats.followed
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return Follow.objects.filter(follower=request.user, following=obj).exists()
@@ -72,6 +151,35 @@ class UserSerializer(ModelSerializer):
         return user
 
 
+class EmployerCardSerializer(ModelSerializer):
+    class Meta:
+        model = Employer
+        fields = ['company_name', 'address', 'approval_status']
+
+
+class FollowUserSerializer(SparseFieldsMixin, ModelSerializer):
+    # Thẻ người dùng gọn cho danh sách theo dõi: followers_count được annotate sẵn,
+    # followed lấy từ context['followed_ids'] (một truy vấn cho cả trang)
+    employer = EmployerCardSerializer(read_only=True)
+    role = serializers.ChoiceField(choices=[(role.value, role.name) for role in UserRole], read_only=True)
+    followers_count = serializers.IntegerField(read_only=True)
+    followed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name', 'avatar', 'role', 'employer', 'followers_count',
+                  'followed']
+
+    def to_representation(self, instance):
+        rep = super().to_representation(instance)
+        if 'avatar' in rep:
+            rep['avatar'] = instance.avatar.url if instance.avatar else None
+        return rep
+
+    def get_followed(self, obj):
+        return obj.pk in self.context.get('followed_ids', ())
+
+
 class JobCreateSerializer(serializers.ModelSerializer):
     # Chọn các công nghệ bằng cách sử dụng id
     technologies = serializers.PrimaryKeyRelatedField(
@@ -85,7 +193,30 @@ class JobCreateSerializer(serializers.ModelSerializer):
         fields = ['title', 'description', 'requirements', 'location', 'location_detail', 'salary', 'expiration_date', 'experience', 'technologies', 'is_active', 'quantity', 'latitude', 'longitude']
 
 
-class JobSerializer(serializers.ModelSerializer):
+class JobListSerializer(serializers.ListSerializer):
+    # Chuẩn bị dữ liệu dùng chung cho cả danh sách (quan hệ, thống kê nhà tuyển dụng, is_saved/is_applied)
+    # để số truy vấn không tăng theo số việc làm
+    def to_representation(self, data):
+        jobs = list(data.all() if hasattr(data, 'all') else data)
+        fields = self.child.fields
+        request = self.context.get('request')
+        expand_employer = isinstance(fields.get('employer'), UserSerializer)
+
+        lookups = []
+        if expand_employer:
+            lookups += ['employer__employer', 'employer__seeker__technologies']
+        if 'technologies' in fields:
+            lookups.append('technologies')
+        prefetch_related_objects(jobs, *lookups)
+
+        if expand_employer:
+            self.context['user_stats'] = UserStats({job.employer_id for job in jobs}, request)
+        if 'is_saved' in fields or 'is_applied' in fields:
+            self.context['job_flags'] = JobUserFlags([job.pk for job in jobs], request)
+        return super().to_representation(jobs)
+
+
+class JobSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     employer = UserSerializer(read_only=True)
     technologies = TechnologySerializer(many=True)
     is_saved = serializers.SerializerMethodField()
@@ -95,8 +226,12 @@ class JobSerializer(serializers.ModelSerializer):
         model = Job
         fields = ['id', 'employer', 'title', 'location', 'location_detail', 'salary', 'experience', 'technologies', 'expiration_date', 'description', 'requirements', 'is_saved', 'is_applied', 'quantity', 'is_active', 'latitude', 'longitude']
         read_only_fields = ['created_at', 'id']
+        list_serializer_class = JobListSerializer
 
     def get_is_saved(self, obj):
+        flags = self.context.get('job_flags')
+        if flags is not None and obj.pk in flags:
+            return obj.pk in flags.saved
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             user = request.user
@@ -104,6 +239,9 @@ class JobSerializer(serializers.ModelSerializer):
         return False
 
     def get_is_applied(self, obj):
+        flags = self.context.get('job_flags')
+        if flags is not None and obj.pk in flags:
+            return obj.pk in flags.applied
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             user = request.user
@@ -129,13 +267,14 @@ class JobApplicationCreateSerializer(serializers.ModelSerializer):
         fields = ['cover_letter', 'cv', "name", "phone", "email"]
 
 
-class JobApplicationSerializer(ModelSerializer):
+class JobApplicationSerializer(SparseFieldsMixin, ModelSerializer):
     job = JobSerializer()
     seeker = UserSerializer()
 
     def to_representation(self, instance):
         rep = super().to_representation(instance)
-        rep['cv'] = instance.cv.url
+        if 'cv' in rep:
+            rep['cv'] = instance.cv.url
         return rep
 
     class Meta:
@@ -143,17 +282,20 @@ class JobApplicationSerializer(ModelSerializer):
         fields = ["job", "seeker", "cover_letter", "status", "created_at", "cv", "name", "phone", "email"]
 
 
-class FilterCVJobApplicationSerializer(serializers.ModelSerializer):
+class FilterCVJobApplicationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     job = serializers.SerializerMethodField()
     seeker_info = serializers.SerializerMethodField()
 
     def to_representation(self, instance):
         rep = super().to_representation(instance)
-        rep['cv'] = instance.cv.url
+        if 'cv' in rep:
+            rep['cv'] = instance.cv.url
         return rep
     class Meta:
         model = JobApplication
         fields = ['id', 'job', 'seeker_info', 'status', 'created_at', "cover_letter", "cv", "status", "name", "phone", "email"]
+        # Quan hệ được dùng bởi các SerializerMethodField, để chọn cột khi dùng fields=
+        method_sources = {'job': 'job', 'seeker_info': 'seeker'}
 
     def get_job(self, obj):
         job = obj.job
@@ -195,3 +337,34 @@ class EmployerServiceSerializer(serializers.ModelSerializer):
         model = EmployerService
         fields = '__all__'
 
+
+class ArchivedJobSerializer(ModelSerializer):
+    technologies = TechnologySerializer(many=True)
+    applications_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = ArchivedJob
+        fields = ['id', 'title', 'location', 'location_detail', 'salary', 'experience', 'technologies',
+                  'expiration_date', 'description', 'requirements', 'quantity', 'latitude', 'longitude',
+                  'views', 'impressions', 'applications_count', 'created_date', 'archived_date']
+
+
+class ArchivedJobApplicationSerializer(ModelSerializer):
+    seeker_info = serializers.SerializerMethodField()
+
+    def to_representation(self, instance):
+        rep = super().to_representation(instance)
+        rep['cv'] = instance.cv.url
+        return rep
+
+    class Meta:
+        model = ArchivedJobApplication
+        fields = ['id', 'seeker_info', 'status', 'created_date', 'cover_letter', 'cv', 'name', 'phone', 'email']
+
+    def get_seeker_info(self, obj):
+        seeker = obj.seeker
+        return {
+            'id': seeker.id,
+            'email': seeker.email,
+            'username': seeker.username,
+        }
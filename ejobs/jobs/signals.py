@@ -0,0 +1,103 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from oauth2_provider.models import AccessToken
+
+from .authentication import invalidate_token, invalidate_user_tokens
+from .changes import record as record_job_changes
+from .clusters import invalidate as invalidate_clusters
+from .entitlements import invalidate_entitlements
+from .featured import invalidate as invalidate_featured
+from .matching import matrix as seeker_matrix
+from .models import User, EmployerService, Job, Technology, Seeker, ChangeKind
+from .recommendations import invalidate_seeker as invalidate_recommendations
+from .typeahead import index as typeahead_index
+
+
+@receiver([post_save, post_delete], sender=AccessToken)
+def access_token_changed(sender, instance, **kwargs):
+    # Token bị thu hồi/cập nhật thì xóa khỏi cache xác thực
+    invalidate_token(instance.token)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, **kwargs):
+    # Thông tin người dùng thay đổi (vai trò, khóa tài khoản...) thì các token cũ phải xác thực lại
+    if not created:
+        invalidate_user_tokens(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=EmployerService)
+def employer_service_changed(sender, instance, **kwargs):
+    # Mua/gia hạn/hủy dịch vụ thì tải lại quyền sử dụng dịch vụ
+    invalidate_entitlements(instance.user_id)
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, created, **kwargs):
+    typeahead_index.update_job(instance)
+    invalidate_featured()
+    invalidate_clusters()
+    record_job_changes([instance.pk], ChangeKind.CREATED if created else ChangeKind.UPDATED)
+
+
+@receiver(post_delete, sender=Job)
+def job_deleted(sender, instance, **kwargs):
+    typeahead_index.remove_job(instance.pk)
+    invalidate_featured()
+    invalidate_clusters()
+    record_job_changes([instance.pk], ChangeKind.REMOVED)
+
+
+@receiver(m2m_changed, sender=Job.technologies.through)
+def job_technologies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # Sau khi xóa hết liên kết từ phía Technology không còn biết việc làm nào bị ảnh hưởng
+        record_job_changes(instance.job_set.values_list('id', flat=True), ChangeKind.UPDATED)
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    invalidate_clusters()  # Công nghệ phổ biến của cụm
+    if reverse:
+        typeahead_index.invalidate()
+        record_job_changes(pk_set or (), ChangeKind.UPDATED)
+    else:
+        typeahead_index.update_job(instance)
+        record_job_changes([instance.pk], ChangeKind.UPDATED)
+
+
+@receiver([post_save, post_delete], sender=Technology)
+def technology_changed(sender, instance, **kwargs):
+    typeahead_index.invalidate()
+    invalidate_clusters()
+
+
+@receiver([post_save, pre_delete], sender=Technology)
+def technology_jobs_changed(sender, instance, created=False, **kwargs):
+    # Tên công nghệ nằm trong dữ liệu việc làm gửi cho client
+    if not created:
+        record_job_changes(instance.job_set.values_list('id', flat=True), ChangeKind.UPDATED)
+
+
+@receiver(post_save, sender=Seeker)
+def seeker_saved(sender, instance, **kwargs):
+    seeker_matrix.update_seeker(instance.user_id)
+    invalidate_recommendations(instance.user_id)
+
+
+@receiver(post_delete, sender=Seeker)
+def seeker_deleted(sender, instance, **kwargs):
+    seeker_matrix.remove_seeker(instance.user_id)
+    invalidate_recommendations(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Seeker.technologies.through)
+def seeker_technologies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # Thay đổi từ phía Technology: cập nhật từng ứng viên bị ảnh hưởng
+        for user_id in Seeker.objects.filter(pk__in=pk_set or ()).values_list('user_id', flat=True):
+            seeker_matrix.update_seeker(user_id)
+            invalidate_recommendations(user_id)
+    else:
+        seeker_matrix.update_seeker(instance.user_id)
+        invalidate_recommendations(instance.user_id)
@@ -0,0 +1,120 @@
+import hashlib
+import logging
+import os
+import re
+import time
+import traceback
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections, DatabaseError
+
+from ejobs.db_router import internal_writes
+from .models import SlowQuery
+
+logger = logging.getLogger('ejobs.slow_queries')
+
+STACK_DEPTH = 8
+_strings = re.compile(r"'(?:[^']|'')*'")
+_numbers = re.compile(r'\b\d+(?:\.\d+)?\b')
+_lists = re.compile(r'\((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)')
+_rows = re.compile(r'\(\.\.\.\)(?:, \(\.\.\.\))+')
+_spaces = re.compile(r'\s+')
+_savepoints = re.compile(r'\bSAVEPOINT \S+')
+_when_chains = re.compile(r'(WHEN \([^()]*\) THEN \? )(?:WHEN \([^()]*\) THEN \? )*')
+
+
+def normalize_sql(sql):
+    # Bỏ giá trị cụ thể để các lần chạy cùng một câu truy vấn có chung fingerprint
+    # Tên savepoint do Django sinh theo thread và số thứ tự
+    sql = _savepoints.sub('SAVEPOINT ?', sql)
+    sql = _strings.sub('?', sql)
+    sql = _numbers.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _lists.sub('(...)', sql)
+    sql = _spaces.sub(' ', sql).strip()
+    # INSERT nhiều dòng: VALUES (...), (...)
+    sql = _rows.sub('(...)', sql)
+    # CASE WHEN sinh theo lô (vd: jobs/counters.py) có số nhánh thay đổi
+    return _when_chains.sub(r'\1... ', sql)
+
+
+def fingerprint(sql):
+    return hashlib.sha1(sql.encode()).hexdigest()
+
+
+def params_fingerprint(params):
+    return hashlib.sha256(repr(params).encode()).hexdigest()[:16]
+
+
+def project_stack():
+    # Các frame trong mã nguồn của dự án (bỏ thư viện và chính module này), gần nơi truy vấn nhất ở cuối
+    base_dir = str(settings.BASE_DIR)
+    frames = [frame for frame in traceback.extract_stack()[:-2]
+              if frame.filename.startswith(base_dir) and 'site-packages' not in frame.filename
+              and frame.filename != __file__]
+    return '\n'.join(f'{os.path.relpath(frame.filename, base_dir)}:{frame.lineno} in {frame.name}'
+                     for frame in frames[-STACK_DEPTH:])
+
+
+class SlowQueryMiddleware:
+    # Ghi lại truy vấn chạy lâu hơn SLOW_QUERY_THRESHOLD_MS cùng view/action đã gọi nó.
+    # Chỉ được thêm vào MIDDLEWARE khi ENABLE_SLOW_QUERY_LOG
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        records = []
+        request.slow_query_view = 'unresolved'
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+
+        def record_slow(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                duration = (time.perf_counter() - start) * 1000
+                if duration >= threshold:
+                    normalized = normalize_sql(sql)
+                    records.append(SlowQuery(
+                        fingerprint=fingerprint(normalized),
+                        sql=normalized,
+                        params_fingerprint=params_fingerprint(params),
+                        duration=round(duration, 2),
+                        database=context['connection'].alias,
+                        view=request.slow_query_view,
+                        method=request.method,
+                        stack=project_stack(),
+                    ))
+
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(record_slow))
+            response = self.get_response(request)
+
+        if records:
+            self.save(records)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Tên view kèm action của viewset, vd: job-search (JobViewSet.search)
+        match = request.resolver_match
+        actions = getattr(view_func, 'actions', None) or {}
+        action = actions.get(request.method.lower())
+        view_class = getattr(view_func, 'cls', None)
+        name = match.view_name or match._func_path
+        if view_class is not None and action:
+            name = f'{name} ({view_class.__name__}.{action})'
+        request.slow_query_view = name[:255]
+        return None
+
+    def save(self, records):
+        for record in records:
+            logger.warning('%.1fms [%s] %s %s fingerprint=%s params=%s\n%s\n%s', record.duration, record.database,
+                           record.method, record.view, record.fingerprint, record.params_fingerprint, record.sql,
+                           record.stack)
+        try:
+            with internal_writes():
+                SlowQuery.objects.bulk_create(records)
+        except DatabaseError:
+            logger.exception('Không lưu được truy vấn chậm vào DB')
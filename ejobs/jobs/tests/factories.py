@@ -0,0 +1,55 @@
+from datetime import timedelta
+from itertools import count
+
+from django.utils import timezone
+
+from jobs.models import User, UserRole, Employer, Seeker, Job, Technology
+
+_sequence = count(1)
+
+
+def make_user(role, **kwargs):
+    number = next(_sequence)
+    kwargs.setdefault('username', f'user_{number}')
+    kwargs.setdefault('email', f'user_{number}@example.com')
+    kwargs.setdefault('avatar', 'sample_avatar')
+    return User.objects.create(role=role, **kwargs)
+
+
+def make_employer(**kwargs):
+    user = make_user(UserRole.EMPLOYER, **kwargs)
+    Employer.objects.create(user=user, company_name=f'Company {user.pk}', approval_status=True)
+    return user
+
+
+def make_seeker(technologies=(), **kwargs):
+    seeker_fields = {name: kwargs.pop(name) for name in ('experience', 'location') if name in kwargs}
+    user = make_user(UserRole.JOB_SEEKER, **kwargs)
+    seeker = Seeker.objects.create(user=user, **seeker_fields)
+    if technologies:
+        seeker.technologies.set(technologies)
+    return user
+
+
+def make_technology(name=None):
+    return Technology.objects.create(name=name or f'Tech {next(_sequence)}')
+
+
+def make_job(employer, technologies=(), **kwargs):
+    fields = {
+        'title': f'Job {next(_sequence)}',
+        'description': 'Mô tả',
+        'requirements': 'Yêu cầu',
+        'location': 'Hồ Chí Minh',
+        'location_detail': 'Quận 1',
+        'salary': '20 - 25 triệu',
+        'expiration_date': timezone.now() + timedelta(days=30),
+        'experience': '1 năm',
+        'latitude': 10.77,
+        'longitude': 106.70,
+    }
+    fields.update(kwargs)
+    job = Job.objects.create(employer=employer, **fields)
+    if technologies:
+        job.technologies.set(technologies)
+    return job
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jobs.archive import archive_expired_jobs
+from jobs.models import ArchivedJob, Job
+from .factories import make_employer, make_job
+
+
+class RestoreJobTests(TestCase):
+    def setUp(self):
+        self.employer = make_employer()
+        self.job = make_job(self.employer, expiration_date=timezone.now() - timedelta(days=400))
+        archive_expired_jobs(days=365)
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+        self.url = f'/archived_jobs/{self.job.pk}/restore/'
+
+    def test_requires_future_expiration_date(self):
+        past = (timezone.now() - timedelta(days=1)).isoformat()
+        for data in ({}, {'expiration_date': 'ngày mai'}, {'expiration_date': past}):
+            self.assertEqual(self.client.post(self.url, data).status_code, 400)
+        self.assertTrue(ArchivedJob.objects.filter(pk=self.job.pk).exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_restores_with_new_expiration_date(self):
+        expiration_date = timezone.now() + timedelta(days=30)
+        response = self.client.post(self.url, {'expiration_date': expiration_date.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        job = Job.objects.get(pk=self.job.pk)
+        self.assertEqual(job.expiration_date, expiration_date)
+        self.assertEqual(job.created_date, self.job.created_date)
+        self.assertEqual(archive_expired_jobs(days=365), 0)
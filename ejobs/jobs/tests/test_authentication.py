@@ -0,0 +1,58 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from oauth2_provider.models import AccessToken, Application
+from rest_framework.test import APIClient
+
+from jobs.authentication import token_cache_key
+from .factories import make_seeker
+
+URL = '/users/current_user/?fields=id,username'
+
+
+class CachedOAuth2AuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_seeker()
+        self.application = Application.objects.create(
+            name='mobile', user=self.user, client_type=Application.CLIENT_CONFIDENTIAL,
+            authorization_grant_type=Application.GRANT_PASSWORD)
+        self.token = self.make_token('token-1', timedelta(hours=1))
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer token-1')
+
+    def make_token(self, value, expires_in):
+        return AccessToken.objects.create(user=self.user, application=self.application, token=value,
+                                          expires=timezone.now() + expires_in, scope='read write')
+
+    def test_cached_token_needs_no_queries(self):
+        self.assertEqual(self.client.get(URL).status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(URL)
+        self.assertEqual(response.json(), {'id': self.user.pk, 'username': self.user.username})
+        self.assertEqual(len(queries), 0)
+
+    def test_revoked_token_is_rejected_immediately(self):
+        self.assertEqual(self.client.get(URL).status_code, 200)
+        self.token.revoke()
+        self.assertIsNone(cache.get(token_cache_key('token-1')))
+        self.assertEqual(self.client.get(URL).status_code, 401)
+
+    def test_user_change_invalidates_tokens(self):
+        self.assertEqual(self.client.get(URL).status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(cache.get(token_cache_key('token-1')))
+
+    def test_cache_timeout_bounded_by_token_expiry(self):
+        self.make_token('token-2', timedelta(seconds=20))
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer token-2')
+        with mock.patch('jobs.authentication.cache.set') as cache_set:
+            self.assertEqual(self.client.get(URL).status_code, 200)
+        timeout = cache_set.call_args.args[2]
+        self.assertLessEqual(timeout, 20)
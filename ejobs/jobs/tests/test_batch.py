@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from jobs import batch
+from jobs.views import UserViewSet
+from .factories import make_employer, make_seeker
+
+URL = '/batch/'
+
+
+class BatchTests(TestCase):
+    def setUp(self):
+        self.seeker = make_seeker()
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def run_batch(self, *operations, **extra):
+        response = self.client.post(URL, {'requests': list(operations)}, format='json', **extra)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_sub_requests_use_caller_auth(self):
+        results = self.run_batch({'path': '/users/current_user/?fields=id'},
+                                 {'method': 'POST', 'path': '/jobs/', 'body': {'title': 'x'}})
+        self.assertEqual(results[0], {'status': 200, 'body': {'id': self.seeker.pk}})
+        # Seeker không được tạo việc làm: quyền của view con vẫn được kiểm tra
+        self.assertEqual(results[1]['status'], 403)
+
+    def test_anonymous_caller_is_rejected(self):
+        response = APIClient().post(URL, {'requests': [{'path': '/users/current_user/'}]}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_batch_cannot_be_nested(self):
+        results = self.run_batch({'method': 'POST', 'path': URL, 'body': {'requests': [{'path': '/jobs/'}]}})
+        self.assertEqual(results[0]['status'], 404)
+
+    def test_failing_sub_request_does_not_break_batch(self):
+        with mock.patch.object(UserViewSet, 'current_user', side_effect=RuntimeError), \
+                self.assertLogs('jobs.batch', level='ERROR'):
+            results = self.run_batch({'path': '/users/current_user/'},
+                                     {'path': f'/users/{make_employer().pk}/?fields=id'})
+        self.assertEqual(results[0]['status'], 500)
+        self.assertEqual(results[1]['status'], 200)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_request_limit(self):
+        response = self.client.post(URL, {'requests': [{'path': '/jobs/'}] * 3}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_idempotency_key_is_not_copied(self):
+        sub_requests = []
+
+        def capture(*args):
+            sub_request = build_request(*args)
+            sub_requests.append(sub_request)
+            return sub_request
+
+        build_request = batch.build_request
+        with mock.patch('jobs.batch.build_request', side_effect=capture):
+            results = self.run_batch({'path': '/users/current_user/?fields=id'},
+                                     {'path': '/users/current_user/?fields=id', 'headers': {'Idempotency-Key': 'own-key'}},
+                                     HTTP_IDEMPOTENCY_KEY='batch-key')
+        self.assertEqual([result['status'] for result in results], [200, 200])
+        self.assertNotIn('HTTP_IDEMPOTENCY_KEY', sub_requests[0].META)
+        self.assertEqual(sub_requests[1].META['HTTP_IDEMPOTENCY_KEY'], 'own-key')
+
+    def test_multipart_only_view_with_body_is_rejected(self):
+        results = self.run_batch({'method': 'PATCH', 'path': '/users/update_seeker/', 'body': {'location': 'Huế'}},
+                                 {'path': '/users/current_user/?fields=id'})
+        self.assertEqual(results[0]['status'], 400)
+        self.assertIn('multipart', results[0]['body']['detail'])
+        self.assertEqual(results[1]['status'], 200)
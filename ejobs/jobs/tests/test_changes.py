@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jobs import changes
+from jobs.models import Job, JobChange, ChangeKind
+from .factories import make_employer, make_seeker, make_job
+
+URL = '/jobs/changes/'
+
+
+@override_settings(JOB_CHANGES_SETTLE_SECONDS=0)
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.employer = make_employer()
+        self.jobs = [make_job(self.employer) for _ in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(make_seeker())
+
+    def sync(self, since=None):
+        response = self.client.get(URL, {'since': since} if since is not None else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_created_updated_and_removed(self):
+        token = self.sync()['token']
+        created = make_job(self.employer)
+        self.jobs[0].title = 'Đã sửa'
+        self.jobs[0].save()
+        self.jobs[1].is_active = False
+        self.jobs[1].save()
+        deleted = self.jobs[2].pk
+        self.jobs[2].delete()
+
+        data = self.sync(token)
+        self.assertEqual([job['id'] for job in data['created']], [created.pk])
+        self.assertEqual([(job['id'], job['title']) for job in data['updated']], [(self.jobs[0].pk, 'Đã sửa')])
+        self.assertEqual(data['removed'], sorted([self.jobs[1].pk, deleted]))
+        self.assertFalse(data['has_more'])
+
+        # Đồng bộ lại từ token mới: không còn thay đổi
+        data = self.sync(data['token'])
+        self.assertEqual((data['created'], data['updated'], data['removed']), ([], [], []))
+
+    def test_edited_to_expired_is_removed(self):
+        token = self.sync()['token']
+        self.jobs[0].expiration_date = timezone.now() - timedelta(minutes=1)
+        self.jobs[0].save()
+        data = self.sync(token)
+        self.assertEqual(data['updated'], [])
+        self.assertEqual(data['removed'], [self.jobs[0].pk])
+
+    def test_expired_without_change_is_removed_once(self):
+        token = changes.sync_token(changes.current_token(), timezone.now() - timedelta(hours=1))
+        # Hết hạn tự nhiên: không có bản ghi trong nhật ký thay đổi
+        Job.objects.filter(pk=self.jobs[1].pk).update(expiration_date=timezone.now() - timedelta(minutes=30))
+        Job.objects.filter(pk=self.jobs[2].pk).update(expiration_date=timezone.now() - timedelta(days=1))
+
+        data = self.sync(token)
+        self.assertEqual(data['removed'], [self.jobs[1].pk])
+        self.assertEqual(self.sync(data['token'])['removed'], [])
+
+    def test_legacy_numeric_token(self):
+        token = changes.current_token()
+        JobChange.objects.filter(id=token).update(created_date=timezone.now() - timedelta(hours=1))
+        Job.objects.filter(pk=self.jobs[0].pk).update(expiration_date=timezone.now() - timedelta(minutes=30))
+        created = make_job(self.employer)
+        data = self.sync(str(token))
+        self.assertEqual([job['id'] for job in data['created']], [created.pk])
+        self.assertEqual(data['removed'], [self.jobs[0].pk])
+
+    def test_invalid_and_expired_tokens(self):
+        for token in ('abc', '-1', '1:abc', '1:99999999999999999'):
+            self.assertEqual(self.client.get(URL, {'since': token}).status_code, 400)
+        JobChange.objects.filter(id__lt=changes.current_token()).delete()
+        self.assertEqual(self.client.get(URL, {'since': '0:0'}).status_code, 410)
+
+    @override_settings(JOB_CHANGES_PAGE_SIZE=2)
+    def test_paging_through_changes(self):
+        token = self.sync()['token']
+        for job in self.jobs:
+            job.title = 'Đã sửa'
+            job.save()
+        first = self.sync(token)
+        self.assertTrue(first['has_more'])
+        second = self.sync(first['token'])
+        self.assertFalse(second['has_more'])
+        self.assertEqual(sorted(job['id'] for job in first['updated'] + second['updated']),
+                         [job.pk for job in self.jobs])
+
+
+class CurrentTokenTests(TestCase):
+    def test_ignores_unsettled_changes(self):
+        changes.record([1], ChangeKind.CREATED)
+        settled = JobChange.objects.get()
+        JobChange.objects.filter(pk=settled.pk).update(created_date=timezone.now() - timedelta(minutes=1))
+        changes.record([2], ChangeKind.CREATED)
+        with self.settings(JOB_CHANGES_SETTLE_SECONDS=10):
+            self.assertEqual(changes.current_token(), settled.pk)
+            # Thay đổi chưa ổn định vẫn được trả về từ token hiện tại khi đã ổn định
+            token, _, created, _, _ = changes.changes_since(changes.current_token())
+            self.assertEqual((token, created), (settled.pk, set()))
+        with self.settings(JOB_CHANGES_SETTLE_SECONDS=0):
+            _, _, created, _, _ = changes.changes_since(settled.pk)
+            self.assertEqual(created, {2})
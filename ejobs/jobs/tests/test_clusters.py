@@ -0,0 +1,67 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from jobs.geo import encode_geohash, geohash_bounds, geohash_cover
+from .factories import make_employer, make_seeker, make_job, make_technology
+
+SAIGON = {'south': 10.70, 'west': 106.60, 'north': 10.85, 'east': 106.80}
+
+
+class GeohashCoverTests(TestCase):
+    def test_cover_contains_every_point_of_box(self):
+        cover = geohash_cover(10.0, 105.0, 21.5, 109.0, 3, limit=100)
+        for latitude in (10.0, 15.7, 21.5):
+            for longitude in (105.0, 107.3, 109.0):
+                self.assertIn(encode_geohash(latitude, longitude, 3), cover)
+        for cell in cover:
+            south, west, north, east = geohash_bounds(cell)
+            self.assertTrue(south <= 21.5 and north >= 10.0 and west <= 109.0 and east >= 105.0)
+
+    def test_cover_over_limit(self):
+        self.assertIsNone(geohash_cover(-80, -170, 80, 170, 4, limit=16))
+        self.assertEqual(geohash_cover(-90, -180, 90, 180, 0, limit=1), [''])
+
+
+@override_settings(CLUSTER_MIN_REBUILD_INTERVAL=0)
+class JobClustersTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(make_seeker())
+        self.employer = make_employer()
+        self.python = make_technology('Python')
+        make_job(self.employer, latitude=10.776, longitude=106.700, technologies=[self.python])
+        make_job(self.employer, latitude=10.777, longitude=106.701, technologies=[self.python])
+        make_job(self.employer, latitude=21.028, longitude=105.854)
+
+    def clusters(self, zoom=10, **bounds):
+        response = self.client.get('/jobs/clusters/', {**SAIGON, **bounds, 'zoom': zoom})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_groups_jobs_in_viewport(self):
+        data = self.clusters()
+        self.assertEqual(data['precision'], 5)
+        self.assertEqual([(cluster['count'], cluster['job_id']) for cluster in data['clusters']], [(2, None)])
+        self.assertEqual(data['clusters'][0]['top_technologies'], [{'id': self.python.pk, 'name': 'Python',
+                                                                    'count': 2}])
+
+    def test_precomputed_counts_are_reused_until_jobs_change(self):
+        self.clusters()
+        with self.assertNumQueries(0):
+            self.clusters()
+        job = make_job(self.employer, latitude=10.80, longitude=106.75)
+        counts = sorted(cluster['count'] for cluster in self.clusters()['clusters'])
+        self.assertEqual(counts, [1, 2])
+        job.delete()
+        self.assertEqual([cluster['count'] for cluster in self.clusters()['clusters']], [2])
+
+    def test_wide_viewport_lowers_precision(self):
+        data = self.clusters(zoom=16, south=8, west=102, north=23, east=110)
+        self.assertLess(data['precision'], 7)
+        self.assertEqual(sum(cluster['count'] for cluster in data['clusters']), 3)
+
+    def test_viewport_across_antimeridian(self):
+        data = self.clusters(zoom=2, south=-60, west=170, north=60, east=-170)
+        self.assertEqual(data['clusters'], [])
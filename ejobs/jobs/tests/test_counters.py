@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+
+from jobs import counters
+from jobs.models import JobCounter
+from .factories import make_employer, make_job
+
+
+class JobCounterTests(TestCase):
+    def setUp(self):
+        counters._buffer.clear()
+        self.addCleanup(counters._buffer.clear)
+        employer = make_employer()
+        self.first, self.second = make_job(employer), make_job(employer)
+
+    def totals(self):
+        return {row.job_id: (row.views, row.impressions) for row in JobCounter.objects.all()}
+
+    def test_flush_adds_buffered_counts(self):
+        counters.record_view(self.first.pk)
+        counters.record_impressions([self.first.pk, self.second.pk])
+        self.assertEqual(counters.flush(), 2)
+        counters.record_view(self.first.pk)
+        counters.flush()
+        self.assertEqual(self.totals(), {self.first.pk: (2, 1), self.second.pk: (0, 1)})
+        self.assertEqual(counters.flush(), 0)
+
+    def test_failed_flush_keeps_counts(self):
+        counters.record_view(self.first.pk)
+        with mock.patch('jobs.counters._write', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                counters.flush()
+        # Lượt đếm mới trong lúc DB lỗi được cộng dồn với lượt đếm chưa ghi được
+        counters.record_view(self.first.pk)
+        counters.flush()
+        self.assertEqual(self.totals(), {self.first.pk: (2, 0)})
+
+    def test_skips_deleted_jobs(self):
+        counters.record_view(self.second.pk)
+        self.second.delete()
+        self.assertEqual(counters.flush(), 0)
+        self.assertFalse(JobCounter.objects.exists())
+
+    @override_settings(JOB_COUNTER_BACKGROUND_FLUSH=True, JOB_COUNTER_MAX_BUFFER=2)
+    def test_full_buffer_wakes_flusher_without_writing(self):
+        with mock.patch('jobs.counters._ensure_flusher'), \
+                mock.patch.object(counters, '_flush_requested') as flush_requested:
+            counters.record_view(self.first.pk)
+            flush_requested.set.assert_not_called()
+            with self.assertNumQueries(0):
+                counters.record_impressions([self.second.pk])
+            flush_requested.set.assert_called_once()
+        self.assertEqual(len(counters._buffer), 2)
@@ -0,0 +1,72 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jobs import entitlements
+from jobs.entitlements import CANDIDATE_MATCHING, STATISTICS, get_entitlements, has_entitlement
+from jobs.models import EmployerService, Service
+from jobs.request_cache import request_cache
+from .factories import make_employer, make_job
+
+
+class EntitlementTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = make_employer()
+        self.statistics = Service.objects.create(name='Thống kê', code=STATISTICS, price=Decimal('1'))
+        self.matching = Service.objects.create(name='Ghép ứng viên', code=CANDIDATE_MATCHING, price=Decimal('1'))
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def purchase(self, service, **duration):
+        return EmployerService.objects.create(user=self.employer, service=service,
+                                              end_date=timezone.now() + timedelta(**duration))
+
+    def test_cache_expires_with_earliest_service(self):
+        self.purchase(self.statistics, seconds=30)
+        self.purchase(self.matching, days=30)
+        with mock.patch.object(entitlements.cache, 'set', wraps=entitlements.cache.set) as cache_set:
+            get_entitlements(self.employer.pk)
+        self.assertLessEqual(cache_set.call_args.args[2], 30)
+
+    def test_expired_service_is_denied_without_invalidation(self):
+        service = self.purchase(self.statistics, seconds=30)
+        self.assertTrue(has_entitlement(self.employer, STATISTICS))
+        later = service.end_date + timedelta(seconds=1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertFalse(has_entitlement(self.employer, STATISTICS))
+        # Kết quả vẫn lấy từ cache, không cần xóa cache khi dịch vụ hết hạn
+        self.assertIn(STATISTICS, cache.get(entitlements.entitlement_cache_key(self.employer.pk)))
+
+    def test_purchase_takes_effect_immediately(self):
+        self.assertEqual(get_entitlements(self.employer.pk), {})
+        with request_cache():
+            self.assertFalse(has_entitlement(self.employer, STATISTICS))
+            self.purchase(self.statistics, days=30)
+            self.assertTrue(has_entitlement(self.employer, STATISTICS))
+
+    def test_cancelled_service_is_denied_immediately(self):
+        service = self.purchase(self.statistics, days=30)
+        self.assertTrue(has_entitlement(self.employer, STATISTICS))
+        service.delete()
+        self.assertFalse(has_entitlement(self.employer, STATISTICS))
+
+    def test_views_require_entitlement(self):
+        job = make_job(self.employer)
+        urls = {
+            CANDIDATE_MATCHING: [f'/jobs/{job.pk}/candidates/'],
+            STATISTICS: ['/statistics/', '/statistics/applications_per_month/'],
+        }
+        for service, code in ((self.matching, CANDIDATE_MATCHING), (self.statistics, STATISTICS)):
+            for url in urls[code]:
+                with self.subTest(url=url):
+                    self.assertEqual(self.client.get(url).status_code, 403)
+            self.purchase(service, days=30)
+            for url in urls[code]:
+                with self.subTest(url=url):
+                    self.assertEqual(self.client.get(url).status_code, 200)
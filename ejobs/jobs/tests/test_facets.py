@@ -0,0 +1,47 @@
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .factories import make_employer, make_seeker, make_job, make_technology
+
+
+class SearchFacetsTests(TestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(make_seeker())
+        employer = make_employer()
+        self.python, self.java = make_technology('Python'), make_technology('Java')
+        make_job(employer, title='Dev 1', location='Hà Nội', experience='1 năm', technologies=[self.python])
+        make_job(employer, title='Dev 2', location='Hà Nội', experience='2 năm', technologies=[self.python, self.java])
+        make_job(employer, title='Dev 3', location='Đà Nẵng', experience='1 năm', technologies=[self.java])
+        make_job(employer, title='Tester', location='Hà Nội', experience='1 năm')
+
+    def facets(self, query):
+        response = self.client.get(f'/jobs/search/?facets=1&title=dev{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_each_facet_ignores_its_own_filter(self):
+        data = self.facets(f'&location=Hà&technologies={self.java.pk}')
+        self.assertEqual(data['count'], 1)
+        facets = data['facets']
+        # location bỏ qua điều kiện location, chỉ áp dụng technologies
+        self.assertEqual(facets['location'], [{'value': 'Hà Nội', 'count': 1}, {'value': 'Đà Nẵng', 'count': 1}])
+        self.assertEqual(facets['experience'], [{'value': '2 năm', 'count': 1}])
+        self.assertEqual(facets['technologies'], [{'id': self.python.pk, 'name': 'Python', 'count': 2},
+                                                  {'id': self.java.pk, 'name': 'Java', 'count': 1}])
+
+    def test_query_count_does_not_grow_with_jobs(self):
+        with CaptureQueriesContext(connection) as few:
+            self.facets('')
+        employer = make_employer()
+        for _ in range(5):
+            make_job(make_employer(), title='Dev', technologies=[self.java])
+            make_job(employer, title='Dev', technologies=[self.python])
+        with CaptureQueriesContext(connection) as many:
+            data = self.facets('')
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(data['facets']['technologies'][0], {'id': self.python.pk, 'name': 'Python', 'count': 7})
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jobs import featured
+from jobs.featured import NEWEST
+from jobs.models import Job
+from .factories import make_employer, make_seeker, make_job, make_technology
+
+URL = '/jobs/featured/newest/'
+
+
+class FeaturedPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(make_seeker())
+        self.jobs = [make_job(make_employer(), technologies=[make_technology()]) for _ in range(6)]
+        featured.refresh(NEWEST)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_hidden_jobs_are_dropped_before_paginating(self):
+        # Cập nhật không qua signal: danh sách tính sẵn vẫn còn các việc làm này
+        Job.objects.filter(pk=self.jobs[5].pk).update(is_active=False)
+        Job.objects.filter(pk=self.jobs[3].pk).update(expiration_date=timezone.now() - timedelta(days=1))
+
+        _, first = self.get(URL + '?page_size=2')
+        _, second = self.get(URL + '?page_size=2&page=2')
+        self.assertEqual(first['count'], 4)
+        self.assertEqual([job['id'] for job in first['results'] + second['results']],
+                         [self.jobs[4].pk, self.jobs[2].pk, self.jobs[1].pk, self.jobs[0].pk])
+        self.assertIsNone(second['next'])
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        few, data = self.get(URL + '?page_size=2')
+        self.assertEqual(len(data['results']), 2)
+        many, data = self.get(URL + '?page_size=6')
+        self.assertEqual(len(data['results']), 6)
+        self.assertEqual(few, many)
+
+    def test_sparse_fields_follow_list_order(self):
+        _, data = self.get(URL + '?fields=id,title')
+        self.assertEqual([job['id'] for job in data['results']], [job.pk for job in reversed(self.jobs)])
+        self.assertEqual(set(data['results'][0]), {'id', 'title'})
@@ -0,0 +1,66 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from jobs.models import Follow
+from jobs.serializer import UserSerializer
+from .factories import make_employer, make_seeker
+
+
+class FollowListTests(TestCase):
+    def setUp(self):
+        self.seeker = make_seeker()
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def follow(self, employer, follower=None):
+        Follow.objects.create(follower=follower or self.seeker, following=employer)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_following_without_page_keeps_legacy_list(self):
+        employers = [make_employer(), make_employer()]
+        for employer in employers:
+            self.follow(employer)
+        self.follow(employers[0], follower=make_seeker())
+        _, data = self.get('/users/following/')
+        self.assertIsInstance(data, list)
+        self.assertEqual([item['id'] for item in data], [employer.pk for employer in employers])
+        self.assertEqual(set(data[0]), set(UserSerializer.Meta.fields))
+        self.assertEqual(data[0]['employer']['followers_count'], 2)
+        self.assertTrue(all(item['followed'] for item in data))
+
+    def test_legacy_query_count_does_not_grow_with_rows(self):
+        self.follow(make_employer())
+        few, _ = self.get('/users/following/')
+        for _ in range(4):
+            self.follow(make_employer())
+        many, data = self.get('/users/following/')
+        self.assertEqual(len(data), 5)
+        self.assertEqual(few, many)
+
+    def test_following_with_page_is_paginated(self):
+        employers = [make_employer() for _ in range(3)]
+        for employer in employers:
+            self.follow(employer)
+        queries, data = self.get('/users/following/?page=1&page_size=2')
+        self.assertEqual(data['count'], 3)
+        self.assertEqual([item['id'] for item in data['results']], [employers[2].pk, employers[1].pk])
+        self.assertTrue(all(item['followed'] for item in data['results']))
+        self.assertLessEqual(queries, 3)
+
+    def test_followers_are_paginated(self):
+        employer = make_employer()
+        self.client.force_authenticate(employer)
+        follower = make_seeker()
+        self.follow(employer, follower=follower)
+        Follow.objects.create(follower=employer, following=follower)
+        _, data = self.get('/users/followers/')
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['results'][0]['id'], follower.pk)
+        self.assertTrue(data['results'][0]['followed'])
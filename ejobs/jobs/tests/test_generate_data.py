@@ -0,0 +1,31 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from jobs import featured
+from jobs.changes import changes_since
+from jobs.matching import matrix
+from jobs.models import Job, Seeker
+
+
+class GenerateDataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_refreshes_data_normally_kept_up_to_date_by_signals(self):
+        matrix.rebuild()
+        call_command('generate_data', employers=3, seekers=5, seed=1, stdout=mock.Mock())
+        job_ids = set(Job.objects.values_list('id', flat=True))
+        self.assertTrue(job_ids)
+
+        with self.settings(JOB_CHANGES_SETTLE_SECONDS=0):
+            _, _, created, _, _ = changes_since(0)
+        self.assertEqual(created, job_ids)
+        for name in featured.BUILDERS:
+            self.assertIsNotNone(cache.get(featured.list_key(name)))
+        # Ma trận đã dựng trước khi sinh dữ liệu phải được xây dựng lại để thấy ứng viên mới
+        seeker = Seeker.objects.prefetch_related('technologies').first()
+        ranked = matrix.rank([technology.id for technology in seeker.technologies.all()], '', '', limit=10)
+        self.assertIn(seeker.user_id, [user_id for _, user_id in ranked])
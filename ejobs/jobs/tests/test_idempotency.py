@@ -0,0 +1,122 @@
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
+
+from cloudinary import CloudinaryResource
+from django.apps import apps
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jobs import throttling
+from jobs.models import JobApplication, IdempotencyKey
+from .factories import make_employer, make_seeker, make_job
+
+BODY = {'cover_letter': 'Xin chào', 'cv': 'sample_cv', 'name': 'Ứng viên', 'email': 'a@example.com',
+        'phone': '0900000000'}
+
+
+def upload_resource(file, **options):
+    return CloudinaryResource('sample_cv', type='upload', resource_type='raw')
+
+
+class ApplyJobIdempotencyTests(TestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        throttling._local_buckets.clear()
+        self.seeker = make_seeker()
+        self.job = make_job(make_employer())
+        self.url = f'/apply/{self.job.pk}/apply_job/'
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+        # Không tải CV lên Cloudinary thật, đếm số lần tải lên
+        patcher = mock.patch('cloudinary.uploader.upload_resource', side_effect=upload_resource)
+        self.upload = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def apply(self, key=None, **changes):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        cv = SimpleUploadedFile('cv.pdf', b'%PDF-1.4', content_type='application/pdf')
+        return self.client.post(self.url, {**BODY, 'cv': cv, **changes}, **headers)
+
+    def test_retry_with_same_key_replays_response(self):
+        first = self.apply('key-1')
+        self.assertEqual(first.status_code, 201)
+        with self.assertNumQueries(1):
+            retry = self.apply('key-1')
+        self.assertEqual((retry.status_code, retry.json()), (201, first.json()))
+        self.assertEqual(JobApplication.objects.count(), 1)
+        self.assertEqual(self.upload.call_count, 1)
+
+    def test_same_key_with_different_body_is_rejected(self):
+        self.apply('key-1')
+        self.assertEqual(self.apply('key-1', cover_letter='Khác').status_code, 422)
+
+    def test_duplicate_without_key_returns_existing_application(self):
+        self.apply()
+        second = self.apply()
+        self.assertEqual(second.status_code, 409)
+        self.assertEqual(JobApplication.objects.count(), 1)
+        self.assertEqual(self.upload.call_count, 1)
+
+    def after_other_request(self, other_request):
+        # Request song song ghi đơn ứng tuyển ngay trước lần INSERT của request này
+        atomic = transaction.atomic
+        pending = [other_request]
+
+        def atomic_after_other_request(*args, **kwargs):
+            if pending:
+                pending.pop()()
+            return atomic(*args, **kwargs)
+        return mock.patch('django.db.transaction.atomic', side_effect=atomic_after_other_request)
+
+    def test_concurrent_submission_with_same_key(self):
+        with self.after_other_request(lambda: self.assertEqual(self.apply('key-1').status_code, 201)):
+            response = self.apply('key-1')
+        stored = IdempotencyKey.objects.get(user=self.seeker, key='key-1')
+        self.assertEqual((response.status_code, response.json()), (201, stored.response_body))
+        self.assertEqual(JobApplication.objects.count(), 1)
+
+    def test_concurrent_submission_without_key(self):
+        other_request = lambda: JobApplication.objects.create(job=self.job, seeker=self.seeker, **BODY)
+        with self.after_other_request(other_request):
+            response = self.apply()
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(JobApplication.objects.count(), 1)
+
+    def test_prune_removes_expired_keys(self):
+        for key in ('old', 'new'):
+            IdempotencyKey.objects.create(user=self.seeker, key=key, fingerprint='x', status_code=201)
+        IdempotencyKey.objects.filter(key='old').update(created_date=timezone.now() - timedelta(days=2))
+        call_command('prune_idempotency_keys', stdout=mock.Mock())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['new'])
+
+
+class RemoveDuplicateApplicationsTests(TransactionTestCase):
+    def setUp(self):
+        # Bỏ tạm ràng buộc unique để tạo dữ liệu trùng như trước migration 0008
+        constraint = JobApplication._meta.constraints[0]
+        # SQLite tạo lại bảng theo _meta.constraints
+        with connection.schema_editor() as editor, mock.patch.object(JobApplication._meta, 'constraints', []):
+            editor.remove_constraint(JobApplication, constraint)
+        self.addCleanup(self.restore_constraint, constraint)
+
+    def restore_constraint(self, constraint):
+        JobApplication.objects.all().delete()
+        with connection.schema_editor() as editor:
+            editor.add_constraint(JobApplication, constraint)
+
+    def test_keeps_first_application_of_each_pair(self):
+        migration = import_module('jobs.migrations.0008_idempotent_applications')
+        seeker, other = make_seeker(), make_seeker()
+        job = make_job(make_employer())
+        first = JobApplication.objects.create(job=job, seeker=seeker, **BODY)
+        JobApplication.objects.create(job=job, seeker=seeker, **BODY)
+        kept = JobApplication.objects.create(job=job, seeker=other, **BODY)
+        JobApplication.objects.create(job=job, seeker=seeker, **BODY)
+        migration.remove_duplicate_applications(apps, None)
+        self.assertEqual(set(JobApplication.objects.values_list('id', flat=True)), {first.pk, kept.pk})
@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from jobs.matching import SeekerMatrix
+from jobs.models import Seeker
+from .factories import make_seeker, make_technology
+
+
+class SeekerMatrixTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.python, self.django, self.java = make_technology('Python'), make_technology('Django'), make_technology('Java')
+        self.both = make_seeker(technologies=[self.python, self.django], location='Hà Nội', experience='2 năm')
+        self.python_only = make_seeker(technologies=[self.python], location='Hồ Chí Minh', experience='2 năm')
+        self.java_only = make_seeker(technologies=[self.java], location='Hà Nội')
+        self.matrix = SeekerMatrix()
+        self.matrix.rebuild()
+
+    def rank(self, technologies, location='', experience='', matrix=None):
+        return (matrix or self.matrix).rank([technology.pk for technology in technologies], location, experience)
+
+    def test_scores_overlap_location_and_experience(self):
+        self.assertEqual(self.rank([self.python, self.django], 'Ha Noi', '2 năm'),
+                         [(100.0, self.both.pk), (45.0, self.python_only.pk)])
+        # Việc làm không yêu cầu công nghệ: ứng viên cùng địa điểm
+        self.assertEqual(self.rank([], 'Hà Nội'), [(25.0, self.both.pk), (25.0, self.java_only.pk)])
+
+    def test_limit_keeps_best_scores(self):
+        for _ in range(5):
+            make_seeker(technologies=[self.python])
+        best = make_seeker(technologies=[self.python], location='Hà Nội')
+        matrix = SeekerMatrix()
+        matrix.rebuild()
+        ranked = matrix.rank([self.python.pk], 'Hà Nội', '', limit=2)
+        self.assertEqual(ranked, [(85.0, self.both.pk), (85.0, best.pk)])
+
+    def test_profile_change_updates_only_that_seeker(self):
+        # Signal cập nhật ma trận của process này và ghi thay đổi cho worker khác
+        seeker = Seeker.objects.get(user=self.python_only)
+        seeker.technologies.set([self.java])
+        self.assertEqual(self.rank([self.python]), [(60.0, self.both.pk)])
+        self.assertEqual([user_id for _, user_id in self.rank([self.java])],
+                         [self.python_only.pk, self.java_only.pk])
+
+    def test_other_worker_applies_changes_without_rebuild(self):
+        other = SeekerMatrix()
+        other.rebuild()
+        seeker = Seeker.objects.get(user=self.java_only)
+        seeker.technologies.add(self.python)
+        self.both.delete()
+        with mock.patch.object(SeekerMatrix, 'rebuild') as rebuild:
+            ranked = self.rank([self.python], matrix=other)
+        rebuild.assert_not_called()
+        self.assertEqual(sorted(user_id for _, user_id in ranked), sorted([self.python_only.pk, self.java_only.pk]))
+
+    def test_missing_change_falls_back_to_rebuild(self):
+        other = SeekerMatrix()
+        other.rebuild()
+        self.matrix.invalidate()
+        with mock.patch.object(SeekerMatrix, 'rebuild') as rebuild:
+            self.rank([self.python], matrix=other)
+        rebuild.assert_called_once()
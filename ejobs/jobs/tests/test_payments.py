@@ -0,0 +1,94 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from vnpay.models import Billing
+
+from jobs.models import EmployerService, Service, ServicePurchase
+from .factories import make_employer
+
+
+class PurchaseServiceTests(TestCase):
+    def setUp(self):
+        self.employer = make_employer()
+        self.service = Service.objects.create(name='Thống kê', code='statistics', price=Decimal('100000'), duration=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def bill(self, number, **fields):
+        fields.setdefault('pay_by', self.employer)
+        fields.setdefault('amount', self.service.price)
+        return Billing.objects.create(reference_number=number, **fields)
+
+    def purchase(self, number, transaction_status='00'):
+        return self.client.post(f'/services/{self.service.pk}/purchase/',
+                                {'vnp_TransactionNo': number, 'vnp_TransactionStatus': transaction_status})
+
+    def test_repeated_callback_does_not_extend_twice(self):
+        self.bill('tx-1')
+        self.assertEqual(self.purchase('tx-1').status_code, 201)
+        end_date = EmployerService.objects.get().end_date
+        response = self.purchase('tx-1')
+        self.assertEqual(response.json(), {'status': 'Giao dịch đã được xử lý'})
+        self.assertEqual(EmployerService.objects.get().end_date, end_date)
+        self.assertEqual(ServicePurchase.objects.count(), 1)
+
+    def test_new_bill_extends_from_current_end_date(self):
+        self.bill('tx-1')
+        self.bill('tx-2')
+        self.purchase('tx-1')
+        end_date = EmployerService.objects.get().end_date
+        self.assertEqual(self.purchase('tx-2').status_code, 200)
+        self.assertEqual(EmployerService.objects.get().end_date, end_date + timedelta(days=30))
+
+    def test_unpaid_bill_does_not_grant_service(self):
+        self.bill('tx-1')
+        self.assertEqual(self.purchase('tx-1', transaction_status='24').status_code, 400)
+        self.assertFalse(EmployerService.objects.exists())
+
+    def test_bill_of_another_user_is_rejected(self):
+        self.bill('tx-1', pay_by=make_employer())
+        self.assertEqual(self.purchase('tx-1').status_code, 403)
+        self.assertFalse(EmployerService.objects.exists())
+
+    def test_bill_amount_must_match_service_price(self):
+        # Hóa đơn của dịch vụ rẻ hơn không dùng được để mua dịch vụ này
+        bill = self.bill('tx-1', amount=Decimal('1000'))
+        response = self.purchase('tx-1')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(EmployerService.objects.exists())
+        self.assertFalse(ServicePurchase.objects.exists())
+        # Trạng thái thanh toán vẫn được lưu để reconcile_billing áp dụng đúng dịch vụ sau này
+        bill.refresh_from_db()
+        self.assertTrue(bill.is_paid)
+
+
+class ReconcileBillingTests(TestCase):
+    def setUp(self):
+        self.employer = make_employer()
+        self.service = Service.objects.create(name='Thống kê', price=Decimal('100000'), duration=1)
+        Service.objects.create(name='Gói A', price=Decimal('50000'))
+        Service.objects.create(name='Gói B', price=Decimal('50000'))
+
+    def reconcile(self):
+        call_command('reconcile_billing', stdout=mock.Mock(), stderr=mock.Mock())
+
+    def test_applies_paid_bills_once(self):
+        Billing.objects.create(amount=Decimal('100000'), reference_number='tx-1', pay_by=self.employer, is_paid=True)
+        Billing.objects.create(amount=Decimal('100000'), reference_number='tx-2', pay_by=self.employer, is_paid=True)
+        Billing.objects.create(amount=Decimal('100000'), reference_number='tx-3', pay_by=self.employer)
+        # Hai dịch vụ cùng giá: không xác định được dịch vụ nên bỏ qua
+        Billing.objects.create(amount=Decimal('50000'), reference_number='tx-4', pay_by=self.employer, is_paid=True)
+        self.reconcile()
+        self.reconcile()
+
+        employer_service = EmployerService.objects.get()
+        self.assertEqual(employer_service.service, self.service)
+        self.assertAlmostEqual(employer_service.end_date, timezone.now() + timedelta(days=60),
+                               delta=timedelta(minutes=1))
+        self.assertEqual(sorted(ServicePurchase.objects.values_list('billing__reference_number', flat=True)),
+                         ['tx-1', 'tx-2'])
@@ -0,0 +1,60 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from jobs.models import Job, JobApplication, CVStatus, Follow, SaveJob
+from jobs.projections import job_values, project_jobs
+from jobs.renderers import FastJSONRenderer
+from jobs.serializer import JobSerializer
+from .factories import make_employer, make_seeker, make_job, make_technology
+
+
+def apply(job, seeker, status=CVStatus.PENDING):
+    return JobApplication.objects.create(job=job, seeker=seeker, status=status, cover_letter='x', cv='sample_cv',
+                                         email='a@example.com', phone='0900000000', name='Ứng viên')
+
+
+class ProjectJobsTests(TestCase):
+    def setUp(self):
+        self.seeker = make_seeker()
+        self.other = make_seeker()
+        first, second = make_employer(), make_employer()
+        # Thêm công nghệ theo thứ tự id giảm dần để thứ tự trong bảng trung gian khác thứ tự id
+        technologies = [make_technology() for _ in range(3)]
+        jobs = [make_job(first), make_job(first, technologies=technologies[:1]), make_job(second)]
+        for technology in reversed(technologies):
+            jobs[0].technologies.add(technology)
+        apply(jobs[0], self.seeker)
+        apply(jobs[1], self.other, CVStatus.OPEN)
+        apply(jobs[2], self.other)
+        Follow.objects.create(follower=self.seeker, following=first)
+        Follow.objects.create(follower=self.other, following=second)
+        SaveJob.objects.create(seeker=self.seeker, job=jobs[1])
+
+    def request(self, user):
+        request = Request(APIRequestFactory().get('/jobs/'))
+        request.user = user
+        return request
+
+    def test_matches_serializer_per_job(self):
+        request = self.request(self.seeker)
+        jobs = Job.objects.order_by('id')
+        # Serialize từng việc làm riêng lẻ: trường tính toán được truy vấn trực tiếp, không qua bản tính gộp
+        expected = [JobSerializer(job, context={'request': request}).data for job in jobs]
+        fast = project_jobs(job_values(jobs), request)
+        self.assertEqual(FastJSONRenderer().render(fast), FastJSONRenderer().render(expected))
+        self.assertEqual([item['id'] for item in fast[0]['technologies']],
+                         sorted(item['id'] for item in fast[0]['technologies']))
+
+    def test_query_count_does_not_grow_with_employers(self):
+        request = self.request(self.seeker)
+        with CaptureQueriesContext(connection) as few:
+            project_jobs(job_values(Job.objects.order_by('id')), request)
+        for _ in range(4):
+            make_job(make_employer(), technologies=[make_technology()])
+        with CaptureQueriesContext(connection) as many:
+            data = project_jobs(job_values(Job.objects.order_by('id')), request)
+        self.assertEqual(len(data), 7)
+        self.assertEqual(len(few), len(many))
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from jobs.recommendations import recommended_job_ids
+from .factories import make_employer, make_seeker, make_job
+
+
+@override_settings(JOB_CHANGES_SETTLE_SECONDS=0)
+class RecommendationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = make_employer()
+        self.seeker = make_seeker(location='Hà Nội')
+        self.jobs = [make_job(self.employer, location='Hà Nội') for _ in range(3)]
+        self.other = make_job(self.employer, location='Đà Nẵng')
+
+    def recommended(self):
+        return recommended_job_ids(self.seeker.pk)
+
+    def expected(self, *jobs):
+        return sorted((job.pk for job in jobs), reverse=True)
+
+    def test_cached_result_needs_only_applied_query(self):
+        self.recommended()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.recommended(), self.expected(*self.jobs))
+        self.assertEqual(len(queries), 1)
+
+    def test_new_and_edited_jobs_are_merged(self):
+        self.recommended()
+        created = make_job(self.employer, location='Hà Nội')
+        self.jobs[0].location = 'Đà Nẵng'
+        self.jobs[0].save()
+        self.other.location = 'Hà Nội'
+        self.other.save()
+        self.assertEqual(self.recommended(), self.expected(created, self.other, self.jobs[1], self.jobs[2]))
+
+    def test_deactivated_and_reactivated_jobs(self):
+        self.recommended()
+        self.jobs[1].is_active = False
+        self.jobs[1].save()
+        self.assertEqual(self.recommended(), self.expected(self.jobs[0], self.jobs[2]))
+        self.jobs[1].is_active = True
+        self.jobs[1].save()
+        self.assertEqual(self.recommended(), self.expected(*self.jobs))
+
+    def test_expiration_date_changes(self):
+        self.jobs[0].expiration_date = timezone.now() - timedelta(days=1)
+        self.jobs[0].save()
+        self.assertEqual(self.recommended(), self.expected(self.jobs[1], self.jobs[2]))
+        # Gia hạn việc làm đã hết hạn: việc làm xuất hiện lại trong kết quả đã cache
+        self.jobs[0].expiration_date = timezone.now() + timedelta(days=10)
+        self.jobs[0].save()
+        self.assertEqual(self.recommended(), self.expected(*self.jobs))
+
+    def test_deleted_job_is_removed(self):
+        self.recommended()
+        self.jobs[2].delete()
+        self.assertEqual(self.recommended(), self.expected(self.jobs[0], self.jobs[1]))
+
+    @override_settings(RECOMMENDATION_LIMIT=2)
+    def test_truncated_list_is_rebuilt_when_a_job_leaves(self):
+        self.assertEqual(self.recommended(), self.expected(self.jobs[1], self.jobs[2]))
+        self.jobs[2].is_active = False
+        self.jobs[2].save()
+        self.assertEqual(self.recommended(), self.expected(self.jobs[0], self.jobs[1]))
+
+    @override_settings(JOB_CHANGES_SETTLE_SECONDS=60)
+    def test_recent_change_is_not_treated_as_synced(self):
+        self.recommended()
+        self.jobs[0].is_active = False
+        self.jobs[0].save()
+        # Thay đổi chưa qua thời gian chờ: kết quả đã cache chưa được coi là mới nhất
+        with CaptureQueriesContext(connection) as queries:
+            self.recommended()
+        self.assertGreater(len(queries), 1)
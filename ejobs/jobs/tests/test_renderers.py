@@ -0,0 +1,47 @@
+import json
+import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+
+from jobs import renderers
+from jobs.renderers import FastJSONRenderer
+
+
+@unittest.skipIf(renderers.orjson is None, 'orjson chưa được cài đặt')
+class FastJSONRendererTests(SimpleTestCase):
+    def assertSameOutput(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_same_output_as_json_renderer(self):
+        self.assertSameOutput({
+            'title': 'Lập trình viên "Python"',
+            'created_date': datetime(2024, 5, 1, 8, 30, 15, 123456, tzinfo=timezone.utc),
+            'salary': Decimal('12.50'),
+            'rate': 0.1,
+            'tags': ['a', None, True, 10 ** 18],
+            'nested': {'empty': [], 'text': 'tab\tnew line\n'},
+        })
+
+    def test_line_and_paragraph_separators_are_escaped(self):
+        data = {'description': 'dòng 1\u2028dòng 2\u2029hết'}
+        self.assertSameOutput(data)
+        self.assertIn(b'\\u2028', FastJSONRenderer().render(data))
+
+    def test_unsupported_values_fall_back(self):
+        self.assertSameOutput({'big': 2 ** 70})
+        self.assertSameOutput({1: 'khóa không phải chuỗi'})
+
+    def test_float_exponent_is_shorter_but_same_value(self):
+        data = [1e-07, 1e16, 1.5e300]
+        fast = FastJSONRenderer().render(data)
+        self.assertEqual(fast, b'[1e-7,1e16,1.5e300]')
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(data)))
+
+    def test_non_finite_floats_become_null(self):
+        data = [float('nan'), float('inf')]
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+        self.assertEqual(FastJSONRenderer().render(data), b'[null,null]')
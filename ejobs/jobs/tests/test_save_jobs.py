@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jobs.models import SaveJob
+from .factories import make_employer, make_seeker, make_job
+
+
+class BulkSaveJobTests(TestCase):
+    def setUp(self):
+        employer = make_employer()
+        self.jobs = [make_job(employer) for _ in range(3)]
+        self.inactive = make_job(employer, is_active=False)
+        self.expired = make_job(employer, expiration_date=timezone.now() - timedelta(days=1))
+        self.seeker = make_seeker()
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def post(self, action, data):
+        return self.client.post(f'/save_job/{action}', data, format='json')
+
+    def saved_ids(self):
+        return sorted(SaveJob.objects.filter(seeker=self.seeker).values_list('job_id', flat=True))
+
+    def test_duplicates_and_not_found(self):
+        first, second, _ = self.jobs
+        response = self.post('bulk_save/', {'job_ids': [second.pk, first.pk, second.pk, 999999]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'saved': [second.pk, first.pk], 'not_found': [999999]})
+        self.assertEqual(self.saved_ids(), sorted([first.pk, second.pk]))
+
+    def test_inactive_and_expired_jobs_are_not_saved(self):
+        response = self.post('bulk_save/', {'job_ids': [self.jobs[0].pk, self.inactive.pk, self.expired.pk]})
+        self.assertEqual(response.json(), {'saved': [self.jobs[0].pk],
+                                           'not_found': [self.inactive.pk, self.expired.pk]})
+        self.assertEqual(self.saved_ids(), [self.jobs[0].pk])
+
+    def test_already_saved_jobs_are_ignored(self):
+        SaveJob.objects.create(seeker=self.seeker, job=self.jobs[0])
+        response = self.post('bulk_save/', {'job_ids': [job.pk for job in self.jobs]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.saved_ids(), sorted(job.pk for job in self.jobs))
+
+    @override_settings(SAVE_JOB_BULK_LIMIT=2)
+    def test_invalid_job_ids(self):
+        for data in ({'job_ids': [job.pk for job in self.jobs]}, {'job_ids': []}, {'job_ids': ['1']},
+                     {'job_ids': [True]}, {}, [self.jobs[0].pk]):
+            with self.subTest(data=data):
+                self.assertEqual(self.post('bulk_save/', data).status_code, 400)
+                self.assertEqual(self.post('bulk_unsave/', data).status_code, 400)
+        self.assertEqual(self.saved_ids(), [])
+
+    def test_bulk_unsave(self):
+        for job in self.jobs[:2]:
+            SaveJob.objects.create(seeker=self.seeker, job=job)
+        response = self.post('bulk_unsave/', {'job_ids': [self.jobs[1].pk, self.jobs[2].pk, self.jobs[1].pk]})
+        self.assertEqual(response.json(), {'removed': [self.jobs[1].pk]})
+        self.assertEqual(self.saved_ids(), [self.jobs[0].pk])
+
+    def test_single_save_rejects_expired_job(self):
+        self.assertEqual(self.post('', {'job_id': self.expired.pk}).status_code, 404)
+        self.assertEqual(self.post('', {'job_id': self.jobs[0].pk}).status_code, 201)
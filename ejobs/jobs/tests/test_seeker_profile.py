@@ -0,0 +1,74 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jobs import throttling
+from jobs.entitlements import CANDIDATE_MATCHING
+from jobs.models import EmployerService, Service
+from .factories import make_employer, make_seeker, make_job, make_technology
+
+
+class UpdateSeekerTechnologiesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['throttle'].clear()
+        throttling._local_buckets.clear()
+        self.python, self.java = make_technology('Python'), make_technology('Java')
+        self.employer = make_employer()
+        service = Service.objects.create(name='Ghép ứng viên', code=CANDIDATE_MATCHING, price=Decimal('1'))
+        EmployerService.objects.create(user=self.employer, service=service,
+                                       end_date=timezone.now() + timedelta(days=30))
+        self.python_job = make_job(self.employer, technologies=[self.python])
+        self.java_job = make_job(self.employer, technologies=[self.java])
+
+        self.seeker = make_seeker(technologies=[self.java])
+        self.seeker_client = APIClient()
+        self.seeker_client.force_authenticate(self.seeker)
+        self.employer_client = APIClient()
+        self.employer_client.force_authenticate(self.employer)
+
+    def patch(self, data, format='multipart'):
+        return self.seeker_client.patch('/users/update_seeker/', data, format=format)
+
+    def candidates(self, job):
+        response = self.employer_client.get(f'/jobs/{job.pk}/candidates/')
+        self.assertEqual(response.status_code, 200)
+        return [candidate['id'] for candidate in response.json()['results']]
+
+    def recommended(self):
+        response = self.seeker_client.get('/jobs/recommend/')
+        self.assertEqual(response.status_code, 200)
+        return [job['id'] for job in response.json()['results']]
+
+    def test_patch_technologies_updates_matching_and_recommendations(self):
+        # Ma trận và kết quả đề xuất đã được dựng trước khi ứng viên sửa hồ sơ
+        self.assertEqual(self.candidates(self.python_job), [])
+        self.assertEqual(self.recommended(), [self.java_job.pk])
+
+        response = self.patch({'technologies': [self.python.pk], 'location': 'Hồ Chí Minh'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.json()['technologies']], [self.python.pk])
+        self.assertEqual(response.json()['location'], 'Hồ Chí Minh')
+
+        self.assertEqual(self.candidates(self.python_job), [self.seeker.pk])
+        self.assertEqual(self.candidates(self.java_job), [])
+        self.assertEqual(self.recommended(), [self.python_job.pk])
+
+    def test_other_fields_keep_technologies(self):
+        self.assertEqual(self.patch({'experience': '2 năm'}).status_code, 200)
+        self.assertEqual(list(self.seeker.seeker.technologies.all()), [self.java])
+
+    def test_empty_value_clears_technologies(self):
+        self.assertEqual(self.patch({'technologies': ''}).status_code, 200)
+        self.assertFalse(self.seeker.seeker.technologies.exists())
+
+    def test_unknown_technology_is_rejected(self):
+        response = self.patch({'technologies': [self.python.pk, 999999], 'location': 'Hà Nội'})
+        self.assertEqual(response.status_code, 400)
+        self.seeker.seeker.refresh_from_db()
+        self.assertEqual(list(self.seeker.seeker.technologies.all()), [self.java])
+        self.assertNotEqual(self.seeker.seeker.location, 'Hà Nội')
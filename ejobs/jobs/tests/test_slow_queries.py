@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from jobs import counters
+from jobs.models import SlowQuery
+from jobs.slow_queries import normalize_sql, fingerprint
+from .factories import make_employer, make_seeker, make_job
+
+
+class NormalizeSQLTests(SimpleTestCase):
+    def assertSameFingerprint(self, *queries):
+        self.assertEqual(len({fingerprint(normalize_sql(sql)) for sql in queries}), 1, queries)
+
+    def test_in_lists(self):
+        self.assertSameFingerprint('SELECT id FROM jobs_job WHERE id IN (%s)',
+                                   'SELECT id FROM jobs_job WHERE id IN (%s, %s, %s)',
+                                   'SELECT id FROM jobs_job WHERE id IN (1, 2)')
+
+    def test_string_and_number_literals(self):
+        self.assertSameFingerprint("SELECT id FROM jobs_job WHERE title = 'dev' LIMIT 10",
+                                   "SELECT id FROM jobs_job WHERE title = 'it''s  a test' LIMIT 20",
+                                   'SELECT id FROM jobs_job\n WHERE title = %s LIMIT %s')
+
+    def test_savepoint_names(self):
+        self.assertSameFingerprint('SAVEPOINT "s140309170568064_x2"', 'SAVEPOINT `s139_x15`')
+        self.assertSameFingerprint('RELEASE SAVEPOINT "s1_x2"', 'RELEASE SAVEPOINT "s2_x3"')
+
+    def test_different_queries_are_kept_apart(self):
+        self.assertNotEqual(normalize_sql('SELECT id FROM jobs_job WHERE id = %s'),
+                            normalize_sql('SELECT id FROM jobs_job WHERE employer_id = %s'))
+
+
+class CounterFlushFingerprintTests(TestCase):
+    def test_batches_of_any_size_share_fingerprints(self):
+        # INSERT nhiều dòng và UPDATE ... CASE WHEN của counters.flush() có số phần tử theo kích thước lô
+        jobs = [make_job(make_employer()) for _ in range(3)]
+        batches = []
+        for size in (1, 3):
+            for job in jobs[:size]:
+                counters.record_view(job.pk)
+                counters.record_impressions([job.pk])
+            queries = []
+
+            def capture(execute, sql, params, many, context):
+                queries.append(normalize_sql(sql))
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(capture):
+                counters.flush()
+            batches.append(queries)
+        self.assertEqual(batches[0], batches[1])
+        self.assertTrue(any('CASE WHEN' in sql for sql in batches[0]))
+
+
+@override_settings(MIDDLEWARE=settings.MIDDLEWARE + ['jobs.slow_queries.SlowQueryMiddleware'],
+                   SLOW_QUERY_THRESHOLD_MS=0)
+class SlowQueryMiddlewareTests(TestCase):
+    def test_records_queries_with_view_name(self):
+        make_job(make_employer(), title='Python developer')
+        client = APIClient()
+        client.force_authenticate(make_seeker())
+        with self.assertLogs('ejobs.slow_queries', level='WARNING'):
+            self.assertEqual(client.get('/jobs/search/?title=Python&fields=id').status_code, 200)
+
+        queries = SlowQuery.objects.filter(view='job-search (JobViewSet.search)')
+        self.assertTrue(queries.exists())
+        query = queries.filter(sql__contains='"jobs_job"').first()
+        self.assertEqual((query.method, query.database), ('GET', 'default'))
+        self.assertNotIn('Python', query.sql)
+        self.assertEqual(query.fingerprint, fingerprint(query.sql))
+        self.assertIn('jobs/views.py', query.stack)
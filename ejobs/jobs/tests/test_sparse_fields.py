@@ -0,0 +1,62 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from jobs.models import Follow, SaveJob
+from .factories import make_employer, make_seeker, make_job, make_technology
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        self.seeker = make_seeker()
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+        self.technology = make_technology()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_fields_limit_job_keys(self):
+        make_job(make_employer(), technologies=[self.technology])
+        _, data = self.count_queries('/jobs/?fields=id,title,salary')
+        self.assertEqual(set(data[0]), {'id', 'title', 'salary'})
+
+    def test_relation_not_expanded_returns_id(self):
+        employer = make_employer()
+        make_job(employer, technologies=[self.technology])
+        _, data = self.count_queries('/jobs/?fields=id,employer,technologies')
+        self.assertEqual(data[0]['employer'], employer.pk)
+        self.assertEqual(data[0]['technologies'], [self.technology.pk])
+
+    def test_expand_employer_query_count_does_not_grow_with_rows(self):
+        employer = make_employer()
+        make_job(employer, technologies=[self.technology])
+        Follow.objects.create(follower=self.seeker, following=employer)
+        url = '/jobs/?fields=id,employer,technologies,is_saved,is_applied&expand=employer,technologies'
+        few, data = self.count_queries(url)
+        self.assertTrue(data[0]['employer']['followed'])
+        self.assertEqual(data[0]['employer']['employer']['followers_count'], 1)
+
+        for _ in range(5):
+            job = make_job(make_employer(), technologies=[self.technology])
+        SaveJob.objects.create(seeker=self.seeker, job=job)
+        many, data = self.count_queries(url)
+        self.assertEqual(len(data), 6)
+        self.assertEqual(few, many)
+        saved = {item['id']: item['is_saved'] for item in data}
+        self.assertTrue(saved[job.pk])
+        self.assertEqual(sum(saved.values()), 1)
+
+    def test_reverse_one_to_one_id_is_selected_with_user(self):
+        employer = make_employer()
+        queries, data = self.count_queries(f'/users/{employer.pk}/?fields=id,employer,seeker')
+        self.assertEqual(data, {'id': employer.pk, 'employer': employer.employer.pk, 'seeker': None})
+        self.assertEqual(queries, 1)
+
+    def test_current_user_respects_fields(self):
+        _, data = self.count_queries('/users/current_user/?fields=id,username')
+        self.assertEqual(data, {'id': self.seeker.pk, 'username': self.seeker.username})
@@ -0,0 +1,61 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from jobs.management.commands import profile_startup
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | io
+import time:      1500 |       2000 |     numpy.core
+import time:       800 |       2800 |   numpy.linalg
+import time:       200 |       3000 | numpy
+"""
+
+
+class StartupImportTests(SimpleTestCase):
+    def run_check(self):
+        output = StringIO()
+        call_command('profile_startup', profile=['web'], repeat=1, top=1, check=True, stdout=output)
+        return output.getvalue()
+
+    def test_parse_importtime(self):
+        self.assertEqual(profile_startup.parse_importtime(IMPORTTIME), [
+            ('_io', 120, 120, 1),
+            ('io', 300, 420, 0),
+            ('numpy.core', 1500, 2000, 2),
+            ('numpy.linalg', 800, 2800, 1),
+            ('numpy', 200, 3000, 0),
+        ])
+
+    def test_eager_modules(self):
+        report = {'modules': ['django', 'drf_yasg', 'numpy']}
+        self.assertEqual(profile_startup.eager_modules('web', report), ['numpy', 'drf_yasg'])
+        # Hồ sơ dev được phép nạp swagger lúc khởi động
+        self.assertEqual(profile_startup.eager_modules('dev', report), ['numpy'])
+
+    def test_dev_tools_are_loaded_only_by_dev_profiles(self):
+        command = profile_startup.Command()
+        web, _ = command.run_worker('web')
+        dev, _ = command.run_worker('dev')
+        self.assertNotIn('drf_yasg', web['apps'])
+        self.assertIn('drf_yasg', dev['apps'])
+        self.assertEqual(set(web['apps']['jobs']), {'import', 'models', 'ready'})
+        self.assertGreater(web['total'], 0)
+
+    def test_report_compares_profiles(self):
+        output = StringIO()
+        call_command('profile_startup', profile=['web', 'dev'], repeat=1, top=3, stdout=output)
+        self.assertIn('So sánh', output.getvalue())
+        self.assertIn('Hồ sơ dev', output.getvalue())
+
+    def test_web_worker_does_not_load_lazy_modules(self):
+        self.assertIn('Hồ sơ web', self.run_check())
+
+    def test_check_fails_on_eager_module(self):
+        with mock.patch.dict(profile_startup.LAZY_MODULES, {'web': ['django']}):
+            with self.assertRaisesMessage(CommandError, 'django'):
+                self.run_check()
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import caches
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from jobs import throttling
+from jobs.throttling import SharedRateThrottle
+from .factories import make_seeker
+
+RATES = {'search_user': '3/m', 'search_ip': '100/m', 'otp_email': '2/m', 'otp_ip': '100/m'}
+
+
+@mock.patch.dict(SharedRateThrottle.THROTTLE_RATES, RATES)
+class SharedRateThrottleTests(TestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        throttling._local_buckets.clear()
+        self.user = make_seeker()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self):
+        return self.client.get('/jobs/search/?title=dev&fields=id').status_code
+
+    def test_user_scope_limits_requests(self):
+        self.assertEqual([self.search() for _ in range(4)], [200, 200, 200, 429])
+
+    def test_counter_is_shared_between_workers(self):
+        # Xóa bucket trong process trước mỗi request, giống như mỗi request tới một worker khác:
+        # chỉ còn bộ đếm trong cache dùng chung giới hạn request
+        statuses = []
+        for _ in range(4):
+            throttling._local_buckets.clear()
+            statuses.append(self.search())
+        self.assertEqual(statuses, [200, 200, 200, 429])
+
+    def test_local_bucket_rejects_without_cache(self):
+        for _ in range(3):
+            self.search()
+        with mock.patch.object(SharedRateThrottle, 'cache') as cache:
+            cache.get.return_value = None
+            self.assertEqual(self.search(), 429)
+        # Scope theo IP vẫn đếm trong cache, scope theo người dùng bị chặn từ bucket trong process
+        keys = [call.args[0] for call in cache.get.call_args_list + cache.set.call_args_list]
+        self.assertTrue(keys)
+        self.assertFalse([key for key in keys if 'search_user' in key])
+
+    def test_no_burst_across_window_boundary(self):
+        # Bộ đếm theo cửa sổ cố định cho qua 3 request cuối phút và 3 request đầu phút sau
+        statuses = []
+        for now in (58, 59, 59.5, 60.5, 61, 62):
+            throttling._local_buckets.clear()
+            with mock.patch.object(SharedRateThrottle, 'timer', return_value=now):
+                statuses.append(self.search())
+        self.assertEqual(statuses, [200, 200, 200, 429, 429, 429])
+
+    def test_tokens_refill_over_time(self):
+        with mock.patch.object(SharedRateThrottle, 'timer', return_value=0):
+            for _ in range(3):
+                self.search()
+        throttling._local_buckets.clear()
+        with mock.patch.object(SharedRateThrottle, 'timer', return_value=10):
+            response = self.client.get('/jobs/search/?title=dev&fields=id')
+        self.assertEqual(response.status_code, 429)
+        # 3/m: một token mỗi 20 giây, đã nạp được 0.5 token sau 10 giây
+        self.assertEqual(response['Retry-After'], '10')
+        throttling._local_buckets.clear()
+        with mock.patch.object(SharedRateThrottle, 'timer', return_value=20):
+            self.assertEqual(self.search(), 200)
+
+    def test_users_are_counted_separately(self):
+        for _ in range(3):
+            self.search()
+        self.client.force_authenticate(make_seeker())
+        self.assertEqual(self.search(), 200)
+
+    def test_otp_email_scope_across_ips(self):
+        client = APIClient()
+        statuses = [
+            client.post('/users/send_otp/', {'email': self.user.email}, REMOTE_ADDR=f'10.0.0.{index}').status_code
+            for index in range(3)
+        ]
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertEqual(len(mail.outbox), 2)
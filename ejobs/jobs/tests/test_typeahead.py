@@ -0,0 +1,58 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs.typeahead import TypeaheadIndex, TITLE
+from .factories import make_employer, make_job, make_technology
+
+
+def texts(results):
+    return [item['text'] for item in results]
+
+
+@override_settings(TYPEAHEAD_SYNC_INTERVAL=0, JOB_CHANGES_SETTLE_SECONDS=0)
+class TypeaheadIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = make_employer()
+        self.python = make_technology('Python')
+        make_job(self.employer, title='Lập trình viên Python', location='Hà Nội', technologies=[self.python])
+        make_job(self.employer, title='Python Developer', location='Hà Nội')
+        make_job(self.employer, title='Kế toán', location='Đà Nẵng',
+                 expiration_date=timezone.now() - timedelta(days=1))
+        self.index = TypeaheadIndex()
+
+    def test_matches_word_prefix_without_accents(self):
+        self.assertEqual(texts(self.index.suggest('ha n')), ['Hà Nội'])
+        self.assertEqual(texts(self.index.suggest('pyth', kind=TITLE)),
+                         ['Lập trình viên Python', 'Python Developer'])
+        self.assertEqual(self.index.suggest('ke toan'), [])
+        self.assertEqual(self.index.keys, sorted(self.index.keys))
+
+    @override_settings(TYPEAHEAD_SYNC_INTERVAL=60)
+    def test_keystrokes_within_sync_interval_do_not_query(self):
+        self.index.suggest('p')
+        with self.assertNumQueries(0), mock.patch('jobs.typeahead.cache.get') as cache_get:
+            for prefix in ('py', 'pyt', 'pyth'):
+                self.index.suggest(prefix)
+        cache_get.assert_not_called()
+
+    def test_changes_from_other_workers_are_applied_incrementally(self):
+        self.assertEqual(texts(self.index.suggest('golang')), [])
+        # Thay đổi ghi nhận qua signal như ở một worker khác, chỉ mục này nhận qua nhật ký JobChange
+        job = make_job(self.employer, title='Golang Engineer', location='Huế')
+        with mock.patch.object(TypeaheadIndex, 'rebuild') as rebuild:
+            self.assertEqual(texts(self.index.suggest('golang')), ['Golang Engineer'])
+            job.delete()
+            self.assertEqual(texts(self.index.suggest('golang')), [])
+            self.assertEqual(texts(self.index.suggest('hue')), [])
+        rebuild.assert_not_called()
+
+    def test_technology_rename_rebuilds(self):
+        self.index.suggest('p')
+        self.python.name = 'Python 3'
+        self.python.save()
+        self.assertEqual(texts(self.index.suggest('python 3')), ['Python 3'])
@@ -0,0 +1,151 @@
+import hashlib
+import threading
+
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.utils.connection import ConnectionProxy
+from rest_framework.throttling import SimpleRateThrottle
+
+# Token bucket trong từng process, dùng để loại bỏ sớm request vượt ngưỡng mà không cần gọi cache
+_local_buckets = {}
+_local_lock = threading.Lock()
+MAX_LOCAL_BUCKETS = 10000
+
+# Token bucket dùng chung, cập nhật nguyên tử trong Redis. Thời gian lấy từ Redis (TIME)
+# để các worker lệch đồng hồ vẫn nạp token như nhau. Trả về [được phép, số token còn lại]
+BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local last = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return {allowed, tostring(tokens)}
+"""
+_bucket_script = None
+
+
+class SharedRateThrottle(SimpleRateThrottle):
+    # Giới hạn số request theo scope bằng token bucket trong cache dùng chung nên đúng khi chạy nhiều
+    # worker, và không cho dồn gấp đôi số request quanh ranh giới cửa sổ như bộ đếm theo cửa sổ cố định.
+    # Lớp con chỉ cần định nghĩa get_ident_key()
+    cache = ConnectionProxy(caches, 'throttle')
+    cache_format = 'throttle_%(scope)s_%(ident)s'
+
+    def get_ident_key(self, request, view):
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        if not self._take_local_token():
+            return self.throttle_failure()
+
+        allowed, self.tokens = self._take_shared_token()
+        if not allowed:
+            return self.throttle_failure()
+        return True
+
+    def _take_local_token(self):
+        rate = self.num_requests / self.duration
+        with _local_lock:
+            if len(_local_buckets) > MAX_LOCAL_BUCKETS:
+                _local_buckets.clear()
+            tokens, last = _local_buckets.get(self.key, (self.num_requests, self.now))
+            tokens = min(self.num_requests, tokens + (self.now - last) * rate)
+            if tokens < 1:
+                _local_buckets[self.key] = (tokens, self.now)
+                return False
+            _local_buckets[self.key] = (tokens - 1, self.now)
+            return True
+
+    def _take_shared_token(self):
+        rate = self.num_requests / self.duration
+        backend = caches['throttle']
+        if isinstance(backend, RedisCache):
+            global _bucket_script
+            key = backend.make_key(self.key)
+            client = backend._cache.get_client(key, write=True)
+            if _bucket_script is None:
+                _bucket_script = client.register_script(BUCKET_SCRIPT)
+            allowed, tokens = _bucket_script(keys=[key], args=[self.num_requests, rate, self.duration + 1],
+                                             client=client)
+            return bool(allowed), float(tokens)
+
+        # Cache khác (locmem khi chạy local/test) nằm trong process nên khóa của process là đủ
+        with _local_lock:
+            tokens, last = self.cache.get(self.key) or (self.num_requests, self.now)
+            tokens = min(self.num_requests, tokens + max(self.now - last, 0) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.cache.set(self.key, (tokens, self.now), self.duration + 1)
+        return allowed, tokens
+
+    def wait(self):
+        # Thời gian tới khi bucket dùng chung nạp đủ một token
+        tokens = getattr(self, 'tokens', 0)
+        return max(1 - tokens, 0) * self.duration / self.num_requests
+
+
+class UserRateThrottle(SharedRateThrottle):
+    # Theo người dùng, người chưa đăng nhập thì theo IP
+    def get_ident_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'user_{request.user.pk}'
+        return f'ip_{self.get_ident(request)}'
+
+
+class IPRateThrottle(SharedRateThrottle):
+    def get_ident_key(self, request, view):
+        return f'ip_{self.get_ident(request)}'
+
+
+class EmailRateThrottle(SharedRateThrottle):
+    # Theo email trong body (vd: send_otp), không có email thì không giới hạn ở scope này
+    def get_ident_key(self, request, view):
+        email = request.data.get('email')
+        if not email:
+            return None
+        return 'email_' + hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+
+class OTPEmailThrottle(EmailRateThrottle):
+    scope = 'otp_email'
+
+
+class OTPIPThrottle(IPRateThrottle):
+    scope = 'otp_ip'
+
+
+class SearchUserThrottle(UserRateThrottle):
+    scope = 'search_user'
+
+
+class SearchIPThrottle(IPRateThrottle):
+    scope = 'search_ip'
+
+
+class ApplyUserThrottle(UserRateThrottle):
+    scope = 'apply_user'
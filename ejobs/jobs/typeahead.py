@@ -0,0 +1,278 @@
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+
+from ejobs.metrics import record_cache
+from . import changes
+from .models import Job, Technology
+
+logger = logging.getLogger('ejobs.typeahead')
+
+TITLE = 'title'
+LOCATION = 'location'
+TECHNOLOGY = 'technology'
+KINDS = (TITLE, LOCATION, TECHNOLOGY)
+
+# Phiên bản chỉ mục dùng chung giữa các worker, tăng khi công nghệ thay đổi (cần xây dựng lại toàn bộ)
+VERSION_KEY = 'typeahead_version'
+MAX_SCAN = 5000
+MAX_MEMO = 10000
+
+
+def normalize(text):
+    # Bỏ dấu tiếng Việt để "ha noi" khớp "Hà Nội"
+    text = unicodedata.normalize('NFD', (text or '').lower()).replace('đ', 'd')
+    return ' '.join(''.join(c for c in text if not unicodedata.combining(c)).split())
+
+
+def _term_keys(display):
+    # Khớp theo đầu mỗi từ: "Python Developer" -> "python developer", "developer"
+    words = normalize(display).split()
+    return [' '.join(words[i:]) for i in range(len(words))]
+
+
+def _bump_version():
+    cache.add(VERSION_KEY, 0, None)
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        return None
+
+
+def _load_terms(jobs):
+    # {job_id: (title, location, [technology_id])} của các việc làm còn hiển thị
+    active = jobs.filter(is_active=True, expiration_date__gte=timezone.now())
+    job_terms = {job_id: (title, location, []) for job_id, title, location in
+                 active.values_list('id', 'title', 'location')}
+    through = (Job.technologies.through.objects.filter(job_id__in=list(job_terms))
+               .values_list('job_id', 'technology_id'))
+    for job_id, technology_id in through:
+        job_terms[job_id][2].append(technology_id)
+    return job_terms
+
+
+class TypeaheadIndex:
+    # Chỉ mục tiền tố: danh sách (khóa chuẩn hóa, loại, tên hiển thị) đã sắp xếp, tra bằng bisect.
+    # Thay đổi việc làm từ worker khác được áp dụng tăng dần từ nhật ký JobChange, xây dựng lại toàn bộ
+    # (định kỳ hoặc khi đổi công nghệ) chạy ở luồng nền và hoán đổi khi xong, tra cứu vẫn dùng chỉ mục cũ
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.sync_lock = threading.Lock()
+        self.built = False
+        self.built_at = 0
+        self.synced_at = 0
+        self.rebuilding = False
+        self.version = None
+        self.token = 0
+        self.keys = []
+        self.counts = {kind: Counter() for kind in KINDS}
+        self.job_terms = {}  # job_id -> (title, location, [technology_id])
+        self.tech_names = {}
+        self.memo = {}
+
+    # Xây dựng lại toàn bộ
+    def rebuild(self):
+        version = cache.get(VERSION_KEY)
+        # Lấy token trước khi đọc dữ liệu: thay đổi xen giữa sẽ được áp dụng lại từ nhật ký (idempotent)
+        token = changes.current_token()
+        job_terms = _load_terms(Job.objects.all())
+        tech_names = dict(Technology.objects.values_list('id', 'name'))
+
+        counts = {kind: Counter() for kind in KINDS}
+        for title, location, technology_ids in job_terms.values():
+            if title:
+                counts[TITLE][title] += 1
+            if location:
+                counts[LOCATION][location] += 1
+            for technology_id in technology_ids:
+                if technology_id in tech_names:
+                    counts[TECHNOLOGY][tech_names[technology_id]] += 1
+        # Sắp xếp một lần thay vì chèn từng khóa
+        keys = sorted({(key, kind, display)
+                       for kind, displays in ((TITLE, counts[TITLE]), (LOCATION, counts[LOCATION]),
+                                              (TECHNOLOGY, tech_names.values()))
+                       for display in displays for key in _term_keys(display)})
+
+        with self.lock:
+            self.job_terms = job_terms
+            self.tech_names = tech_names
+            self.counts = counts
+            self.keys = keys
+            self.memo = {}
+            self.version = version
+            self.token = token
+            self.built = True
+            self.built_at = time.monotonic()
+
+    def _rebuild_in_background(self):
+        if not settings.TYPEAHEAD_BACKGROUND_REBUILD:
+            self.rebuild()
+            return
+        with self.lock:
+            if self.rebuilding:
+                return
+            self.rebuilding = True
+        threading.Thread(target=self._run_rebuild, name='typeahead-rebuild', daemon=True).start()
+
+    def _run_rebuild(self):
+        close_old_connections()
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception('Không xây dựng lại được chỉ mục gợi ý tìm kiếm')
+        finally:
+            self.rebuilding = False
+            close_old_connections()
+
+    def _ensure_fresh(self):
+        if not self.built:
+            # Chỉ lần tra cứu đầu tiên của process phải chờ xây dựng chỉ mục
+            with self.sync_lock:
+                if not self.built:
+                    self.rebuild()
+                    self.synced_at = time.monotonic()
+            return
+        # Kiểm tra thay đổi tối đa một lần mỗi TYPEAHEAD_SYNC_INTERVAL giây, không truy vấn theo từng phím gõ
+        if time.monotonic() - self.synced_at < settings.TYPEAHEAD_SYNC_INTERVAL:
+            return
+        if not self.sync_lock.acquire(blocking=False):
+            return
+        try:
+            self.synced_at = time.monotonic()
+            if (cache.get(VERSION_KEY) != self.version or
+                    self.synced_at - self.built_at > settings.TYPEAHEAD_REBUILD_INTERVAL):
+                self._rebuild_in_background()
+            else:
+                self._apply_changes()
+        finally:
+            self.sync_lock.release()
+
+    def _apply_changes(self):
+        if changes.is_expired(self.token):
+            self._rebuild_in_background()
+            return
+        token, has_more, _, changed, removed = changes.changes_since(self.token)
+        if has_more:
+            # Quá nhiều thay đổi: xây dựng lại rẻ hơn áp dụng từng thay đổi
+            self._rebuild_in_background()
+            return
+        if token == self.token:
+            return
+        job_terms = _load_terms(Job.objects.filter(id__in=changed)) if changed else {}
+        with self.lock:
+            for job_id in changed + removed:
+                self._remove_job(job_id)
+            for job_id, terms in job_terms.items():
+                self._add_job(job_id, terms)
+            self.memo = {}
+            self.token = max(self.token, token)
+
+    # Cập nhật tăng dần
+    def _add_keys(self, kind, display):
+        for key in _term_keys(display):
+            insort(self.keys, (key, kind, display))
+
+    def _remove_keys(self, kind, display):
+        for key in _term_keys(display):
+            i = bisect_left(self.keys, (key, kind, display))
+            if i < len(self.keys) and self.keys[i] == (key, kind, display):
+                del self.keys[i]
+
+    def _increment(self, kind, display, delta):
+        if not display:
+            return
+        before = self.counts[kind][display]
+        self.counts[kind][display] = before + delta
+        if kind == TECHNOLOGY:
+            return  # Công nghệ luôn có trong chỉ mục
+        if before <= 0 < before + delta:
+            self._add_keys(kind, display)
+        elif before > 0 >= before + delta:
+            self._remove_keys(kind, display)
+            del self.counts[kind][display]
+
+    def _add_job(self, job_id, terms):
+        title, location, technology_ids = terms
+        self.job_terms[job_id] = terms
+        self._increment(TITLE, title, 1)
+        self._increment(LOCATION, location, 1)
+        for technology_id in technology_ids:
+            self._increment(TECHNOLOGY, self.tech_names.get(technology_id), 1)
+
+    def _remove_job(self, job_id):
+        terms = self.job_terms.pop(job_id, None)
+        if terms is None:
+            return
+        title, location, technology_ids = terms
+        self._increment(TITLE, title, -1)
+        self._increment(LOCATION, location, -1)
+        for technology_id in technology_ids:
+            self._increment(TECHNOLOGY, self.tech_names.get(technology_id), -1)
+
+    # Thay đổi trong process này được áp dụng ngay, các worker khác nhận qua nhật ký JobChange
+    def update_job(self, job):
+        if not self.built:
+            return
+        terms = None
+        if job.is_active and job.expiration_date >= timezone.now():
+            terms = (job.title, job.location, list(job.technologies.values_list('id', flat=True)))
+        with self.lock:
+            self._remove_job(job.pk)
+            if terms:
+                self._add_job(job.pk, terms)
+            self.memo = {}
+
+    def remove_job(self, job_id):
+        if not self.built:
+            return
+        with self.lock:
+            self._remove_job(job_id)
+            self.memo = {}
+
+    def invalidate(self):
+        # Đổi tên/xóa công nghệ: mọi worker xây dựng lại ở lần kiểm tra thay đổi sau
+        _bump_version()
+        self.synced_at = 0
+
+    # Tra cứu
+    def suggest(self, prefix, kind=None, limit=10):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self._ensure_fresh()
+
+        memo_key = (prefix, kind, limit)
+        with self.lock:
+            result = self.memo.get(memo_key)
+        record_cache('typeahead', result is not None)
+        if result is not None:
+            return result
+        with self.lock:
+
+            matches = {}
+            i = bisect_left(self.keys, (prefix,))
+            end = min(len(self.keys), i + MAX_SCAN)
+            while i < end and self.keys[i][0].startswith(prefix):
+                _, term_kind, display = self.keys[i]
+                if kind is None or term_kind == kind:
+                    matches[(term_kind, display)] = self.counts[term_kind][display]
+                i += 1
+
+            top = sorted(matches.items(), key=lambda item: (-item[1], item[0][1]))[:limit]
+            result = [{'text': display, 'type': term_kind, 'count': count}
+                      for (term_kind, display), count in top]
+            if len(self.memo) >= MAX_MEMO:
+                self.memo = {}
+            self.memo[memo_key] = result
+            return result
+
+
+index = TypeaheadIndex()
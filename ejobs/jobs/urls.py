@@ -12,6 +12,8 @@ router.register(r'technology', views.TechnologyViewSet, basename='technology')
 router.register(r'save_job', views.SaveJobViewSet, basename='save_job')
 router.register(r'services', views.ServiceViewSet, basename='service')
 router.register(r'statistics', views.EmployerStatisticsViewSet, basename='statistics')
+router.register(r'archived_jobs', views.ArchivedJobViewSet, basename='archived_job')
+router.register(r'batch', views.BatchViewSet, basename='batch')
 
 
 
@@ -6,23 +6,45 @@ import random
 from datetime import timezone, timedelta, datetime
 
 from django.core.mail import send_mail
-from django.db.models import Q, Sum, Count
-from django.db.models.functions import TruncMonth
+from django.db import transaction, IntegrityError
+from django.db.models import Q, Sum, Count, F, OuterRef, Subquery
+from django.db.models.functions import TruncMonth, Coalesce
+from oauth2_provider.models import RefreshToken
 from vnpay.models import Billing
-from django.utils.timezone import now
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now, is_naive, make_aware
 from django.utils import timezone
-from geopy.distance import geodesic
 from rest_framework.parsers import MultiPartParser
 from rest_framework import viewsets, permissions, status, generics
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .models import Job, User, Employer, Seeker, SaveJob, JobApplication, UserRole, CVStatus, Technology, Follow, \
-    Service, EmployerService
+    Service, EmployerService, JobCounter, ArchivedJob, ArchivedJobApplication
+from .archive import restore_job
+from .batch import parse_operations, run_batch
+from .changes import changes_since, current_token as current_change_token, is_expired as change_token_expired, \
+    sync_until, sync_token, parse_sync_token, expired_between
+from .authentication import invalidate_token
+from .clusters import job_clusters
+from .counters import record_view, record_impressions, click_through_rate
+from .entitlements import STATISTICS, CANDIDATE_MATCHING, require_entitlement
+from .facets import facet_counts
+from .featured import BUILDERS as FEATURED_LISTS, HIGH_SALARY, featured_ids
+from .fieldsets import parse_sparse_fields, sparse_queryset
+from .geo import is_geohash
+from .idempotency import get_idempotency_key, request_fingerprint, get_stored_response, store_response
+from .matching import rank_candidates
 from .pagination import JobPaginator
+from .payments import apply_bill, EXTENDED
+from .projections import job_values, project_jobs
+from .recommendations import recommended_job_ids
 from .serializer import JobSerializer, UserSerializer, EmployerSerializer, SeekerSerializer, SaveJobSerializer, \
     JobApplicationSerializer, JobApplicationCreateSerializer, FilterCVJobApplicationSerializer, TechnologySerializer, \
-    JobCreateSerializer, FollowSerializer, ServiceSerializer, PurchaseServiceSerializer, EmployerServiceSerializer
+    JobCreateSerializer, FollowSerializer, ServiceSerializer, PurchaseServiceSerializer, EmployerServiceSerializer, \
+    ArchivedJobSerializer, ArchivedJobApplicationSerializer, FollowUserSerializer, UserStats
+from .throttling import OTPEmailThrottle, OTPIPThrottle, SearchUserThrottle, SearchIPThrottle, ApplyUserThrottle
+from .typeahead import index as typeahead_index, KINDS
 from django.conf import settings
 
 
@@ -48,16 +70,31 @@ class UserViewSet(viewsets.GenericViewSet, generics.CreateAPIView, generics.Retr
     queryset = User.objects.filter(is_active=True)
     serializer_class = UserSerializer
     parser_classes = [MultiPartParser, ]
+    # Thông tin người dùng ngay sau khi đăng nhập/đăng ký luôn đọc từ primary
+    primary_db_actions = ['current_user']
 
     def get_permissions(self):
-        if self.action in ['retrieve', 'current_user', 'employer_detail', 'retrieve', 'follow', 'following', 'unfollow', 'follower']:
+        if self.action in ['retrieve', 'current_user', 'employer_detail', 'retrieve', 'follow', 'following', 'unfollow', 'followers',
+                           'logout']:
             return [permissions.IsAuthenticated()]
         return [permissions.AllowAny()]
 
+    def get_queryset(self):
+        fields, expand = parse_sparse_fields(self.request)
+        return sparse_queryset(super().get_queryset(), UserSerializer, fields, expand)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs['fields'], kwargs['expand'] = parse_sparse_fields(self.request)
+        return super().get_serializer(*args, **kwargs)
+
     @action(detail=False, methods=['get'], url_path='current_user')
     def current_user(self, request):
         user = request.user
-        user_data = UserSerializer(user).data
+        # Hỗ trợ ?fields=/&expand= như các API đọc khác, user_role_data chỉ được tính khi được chọn
+        fields, expand = parse_sparse_fields(request)
+        user_data = UserSerializer(user, fields=fields, expand=expand).data
+        if fields is not None and 'user_role_data' not in fields:
+            return Response(user_data)
 
         if user.role == UserRole.EMPLOYER.value:
             try:
@@ -108,13 +145,28 @@ class UserViewSet(viewsets.GenericViewSet, generics.CreateAPIView, generics.Retr
         # Lấy thông tin của người tìm việc liên kết với người dùng hiện tại
         seeker = Seeker.objects.get(user=user)
         serializer = SeekerSerializer(seeker, data=request.data, partial=True)
-        if serializer.is_valid():
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+
+        # technologies là trường chỉ đọc của SeekerSerializer: nhận danh sách id (multipart lặp lại khóa
+        # technologies hoặc mảng JSON), gửi một giá trị rỗng để xóa hết kỹ năng
+        technologies = None
+        if 'technologies' in request.data:
+            if hasattr(request.data, 'getlist'):
+                values = request.data.getlist('technologies')
+            else:
+                values = request.data['technologies']
+            values = {str(value) for value in (values if isinstance(values, list) else [values]) if value != ''}
+            technologies = list(Technology.objects.filter(pk__in=[value for value in values if value.isdigit()]))
+            if len(technologies) != len(values):
+                return Response({"technologies": ["Công nghệ không tồn tại."]}, status=400)
+
+        with transaction.atomic():
             serializer.save()
-            technology = request.data.get(Technology, [])
-            if technology:
-                seeker.technologies.set(technology)
-            return Response(serializer.data)
-        return Response(serializer.errors, status=400)
+            if technologies is not None:
+                # Signal m2m_changed cập nhật ma trận ứng viên và đề xuất việc làm
+                seeker.technologies.set(technologies)
+        return Response(SeekerSerializer(seeker).data)
 
     @action(detail=True, methods=['post'], url_path='follow')
     def follow(self, request, pk=None):
@@ -151,18 +203,72 @@ class UserViewSet(viewsets.GenericViewSet, generics.CreateAPIView, generics.Retr
 
     @action(detail=False, methods=['get'], url_path='following')
     def following(self, request):
-        user = request.user
-        following_relations = Follow.objects.filter(follower=user)
-
-        # Lấy danh sách các User mà user hiện tại đang theo dõi
-        following_users = [relation.following for relation in following_relations]
-
-        # Serialize dữ liệu của những người dùng đang theo dõi
-        users_data = UserSerializer(following_users, many=True).data
+        # Nhà tuyển dụng mà người dùng hiện tại đang theo dõi, mới theo dõi trước.
+        # Không có ?page= thì giữ định dạng cũ (danh sách UserSerializer) cho các client chưa cập nhật
+        if 'page' not in request.query_params:
+            return self._legacy_following(request)
+        follows = Follow.objects.filter(follower=request.user)
+        return self._follow_page(request, follows, 'following')
+
+    def _legacy_following(self, request):
+        fields, expand = parse_sparse_fields(request)
+        users = User.objects.filter(follow_following__follower=request.user)
+        if fields is None:
+            users = users.select_related('employer', 'seeker').prefetch_related('seeker__technologies')
+        else:
+            users = sparse_queryset(users, UserSerializer, fields, expand)
+        users = list(users)
+        # Số CV, số người theo dõi và followed của cả danh sách được tính gộp, không truy vấn theo từng người
+        context = {'request': request, 'user_stats': UserStats({user.pk for user in users}, request)}
+        return Response(UserSerializer(users, many=True, fields=fields, expand=expand, context=context).data)
+
+    @action(detail=False, methods=['get'], url_path='followers')
+    def followers(self, request):
+        # Người dùng đang theo dõi người dùng hiện tại
+        follows = Follow.objects.filter(following=request.user)
+        return self._follow_page(request, follows, 'follower')
+
+    def _follow_page(self, request, follows, side):
+        # Mỗi trang: COUNT + một truy vấn lấy người dùng (kèm employer, số người theo dõi) + một truy vấn followed
+        followers_count = Follow.objects.filter(following=OuterRef(f'{side}_id')).order_by() \
+            .values('following').annotate(count=Count('id')).values('count')
+        follows = follows.select_related(side, f'{side}__employer') \
+            .annotate(followers_count=Coalesce(Subquery(followers_count), 0)).order_by('-id')
 
-        return Response(users_data)
+        paginator = JobPaginator()
+        page = paginator.paginate_queryset(follows, request)
+        users = []
+        for relation in page:
+            user = getattr(relation, side)
+            user.followers_count = relation.followers_count
+            users.append(user)
+
+        if side == 'following':
+            followed_ids = {user.pk for user in users}
+        else:
+            followed_ids = set(Follow.objects.filter(follower=request.user, following__in=users)
+                               .values_list('following_id', flat=True))
+        fields, expand = parse_sparse_fields(request)
+        serializer = FollowUserSerializer(users, many=True, fields=fields, expand=expand,
+                                          context={'request': request, 'followed_ids': followed_ids})
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='logout')
+    def logout(self, request):
+        token = request.auth
+        if token is None:
+            return Response({"detail": "Access token is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Xóa token khỏi cache xác thực, thu hồi cả refresh token đi kèm
+        invalidate_token(token.token)
+        refresh_token = RefreshToken.objects.filter(access_token_id=token.pk).first()
+        if refresh_token:
+            refresh_token.revoke()
+        else:
+            token.revoke()
+        return Response(status=status.HTTP_200_OK)
 
-    @action(detail=False, methods=['post'], url_path='send_otp')
+    @action(detail=False, methods=['post'], url_path='send_otp', throttle_classes=[OTPIPThrottle, OTPEmailThrottle])
     def send_otp(self, request):
         email = request.data.get("email")
         user = User.objects.filter(email=email).first()
@@ -207,17 +313,56 @@ class UserViewSet(viewsets.GenericViewSet, generics.CreateAPIView, generics.Retr
 
 
 
+CANDIDATE_MATCHING_REQUIRED = 'Bạn chưa mua dịch vụ "Tìm ứng viên phù hợp" hoặc dịch vụ đã hết hạn.'
+
+
 class JobViewSet(viewsets.ModelViewSet):
     queryset = Job.objects.filter(is_active=True)
+    # Các danh sách được tính lượt hiển thị (impression)
+    impression_actions = ['list', 'search', 'recommend', 'high_salary_jobs', 'featured', 'cluster_jobs']
 
     def get_serializer_class(self):
         if self.action == 'create':
             return JobCreateSerializer
         return JobSerializer
 
+    def get_serializer(self, *args, **kwargs):
+        if self.get_serializer_class() is JobSerializer:
+            kwargs['fields'], kwargs['expand'] = parse_sparse_fields(self.request)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        return self.sparse(super().get_queryset())
+
+    def sparse(self, queryset):
+        # Chỉ truy vấn các cột cần thiết khi client truyền ?fields=
+        fields, expand = parse_sparse_fields(self.request)
+        return sparse_queryset(queryset, JobSerializer, fields, expand)
+
+    def use_fast_path(self):
+        # Danh sách đầy đủ (không có ?fields=) được dựng trực tiếp từ values()
+        return parse_sparse_fields(self.request)[0] is None
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_path():
+            return super().list(request, *args, **kwargs)
+        jobs = self.filter_queryset(self.get_queryset())
+        return Response(project_jobs(job_values(jobs), request))
+
     def perform_create(self, serializer):
         serializer.save(employer=self.request.user)
 
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Ghi nhận lượt xem/lượt hiển thị vào bộ đệm, không cập nhật bảng Job
+        if response.status_code == status.HTTP_200_OK:
+            if self.action == 'retrieve':
+                record_view(int(kwargs['pk']))
+            elif self.action in self.impression_actions:
+                data = response.data
+                items = data.get('results', []) if isinstance(data, dict) else data
+                record_impressions([item['id'] for item in items if 'id' in item])
+        return super().finalize_response(request, response, *args, **kwargs)
+
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
             # Chỉ employer mới có thể tạo, cập nhật, hoặc xóa công việc
@@ -227,7 +372,7 @@ class JobViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='employer_jobs')
     def list_employer_jobs(self, request):
-        jobs = Job.objects.filter(employer=request.user).order_by('-is_active')
+        jobs = self.sparse(Job.objects.filter(employer=request.user).order_by('-is_active'))
         paginator = JobPaginator()
         page = paginator.paginate_queryset(jobs, request)
 
@@ -238,7 +383,7 @@ class JobViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(jobs, many=True)
         return Response(serializer.data)
 
-    @action(detail=False, methods=['get'], url_path='search')
+    @action(detail=False, methods=['get'], url_path='search', throttle_classes=[SearchIPThrottle, SearchUserThrottle])
     def search(self, request):
         current_time = now()
         # Lấy các tham số tìm kiếm từ truy vấn
@@ -268,71 +413,133 @@ class JobViewSet(viewsets.ModelViewSet):
             query &= Q(title__icontains=title)
 
         # Áp dụng các điều kiện tìm kiếm cho queryset
-        jobs = Job.objects.filter(query).distinct()
+        jobs = self.sparse(Job.objects.filter(query).distinct())
+
+        if request.query_params.get('facets'):
+            # Kết quả phân trang kèm số đếm cho các bộ lọc (?facets=1)
+            base_query = Q(is_active=True, expiration_date__gte=current_time)
+            if title:
+                base_query &= Q(title__icontains=title)
+            facets = facet_counts(Job.objects.filter(base_query), {
+                'technologies': {int(t) for t in technologies if str(t).isdigit()},
+                'salary': salary,
+                'location': location,
+                'experience': experience,
+            })
+
+            paginator = JobPaginator()
+            if self.use_fast_path():
+                page = paginator.paginate_queryset(job_values(jobs.order_by('id')), request)
+                response = paginator.get_paginated_response(project_jobs(page, request))
+            else:
+                page = paginator.paginate_queryset(jobs.order_by('id'), request)
+                response = paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+            response.data['facets'] = facets
+            return response
+
+        if self.use_fast_path():
+            return Response(project_jobs(job_values(jobs), request))
         serializer = self.get_serializer(jobs, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], url_path='autocomplete')
+    def autocomplete(self, request):
+        # Gợi ý tiêu đề, địa điểm, công nghệ theo tiền tố, sắp xếp theo số việc làm
+        q = request.query_params.get('q', '')
+        kind = request.query_params.get('type')
+        if kind and kind not in KINDS:
+            return Response({"detail": "type phải là một trong: " + ", ".join(KINDS)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), 50)
+        except ValueError:
+            return Response({"detail": "limit không hợp lệ"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(typeahead_index.suggest(q, kind, limit))
+
     @action(detail=True, methods=['get'], url_path='jobs_by_employer')
     # Danh sách công việc của nhà tuyển dụng mà seeker có thể xem
     def jobs_by_employer(self, request, pk=None):
         current_time = now()
 
-        jobs = Job.objects.filter(
+        jobs = self.sparse(Job.objects.filter(
             employer_id=pk,
             is_active=True,
             expiration_date__gte=current_time  # Lọc các công việc chưa hết hạn
-        )
+        ))
         serializer = self.get_serializer(jobs, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'], url_path='recommend')
-    # Danh sách việc làm đề xuất cho ứng viên
+    # Danh sách việc làm đề xuất cho ứng viên, kết quả được cache theo hồ sơ (jobs/recommendations.py)
     def recommend(self, request):
-        current_time = now()
-        seeker = request.user.seeker
-        experience = seeker.experience
-        location = seeker.location
-        technologies = seeker.technologies.values_list('id', flat=True)
-
-        query = Q(is_active=True, expiration_date__gte=current_time)
-
-        if experience:
-            query &= Q(experience__icontains=experience)
-        if location:
-            query &= Q(location__icontains=location)
-        if technologies:  # Kiểm tra nếu seeker có công nghệ
-            query &= Q(technologies__id__in=technologies)
-        jobs = Job.objects.filter(query).distinct()
-
-        paginator = JobPaginator()  # Tạo đối tượng phân trang
-        page = paginator.paginate_queryset(jobs, request)  # Phân trang danh sách công việc
-
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return paginator.get_paginated_response(serializer.data)  # Trả về kết quả đã phân trang
-
-        serializer = self.get_serializer(jobs, many=True)
-        return Response(serializer.data)
+        return self.id_page(recommended_job_ids(request.user.pk))
 
     @action(detail=False, methods=['get'], url_path='high_salary')
     def high_salary_jobs(self, request):
-        current_time = now()
-        # Lọc các công việc có mức lương từ 20 triệu trở lên
-        jobs = Job.objects.filter(
-            is_active=True,
-            expiration_date__gte=current_time,
-            salary__in=['20 - 25 triệu', '25 - 30 triệu', '30 - 50 triệu', 'Trên 50 triệu']
-        ).order_by('-salary')[:20]  # Lấy 20 công việc có mức lương cao nhất
+        # Việc làm lương từ 20 triệu trở lên, lấy từ danh sách tính sẵn (jobs/featured.py)
+        return self.id_page(featured_ids(HIGH_SALARY))
+
+    @action(detail=False, methods=['get'], url_path=r'featured/(?P<name>[a-z_]+)')
+    def featured(self, request, name=None):
+        # Danh sách nổi bật: high_salary, newest, most_applied, trending
+        if name not in FEATURED_LISTS:
+            return Response({"detail": "Danh sách không tồn tại."}, status=status.HTTP_404_NOT_FOUND)
+        return self.id_page(featured_ids(name))
+
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request):
+        # Đồng bộ delta cho client lưu danh sách việc làm offline: lấy token (gọi không có since) trước khi tải
+        # toàn bộ danh sách, sau đó gọi với since=<token> để nhận việc làm mới/đã sửa và id việc làm cần xóa
+        since = request.query_params.get('since')
+        until = sync_until()
+        if not since:
+            return Response({'token': sync_token(current_change_token(), until), 'has_more': False,
+                             'created': [], 'updated': [], 'removed': []})
+        try:
+            since, since_time = parse_sync_token(since)
+        except ValueError:
+            return Response({"detail": "Sync token không hợp lệ."}, status=status.HTTP_400_BAD_REQUEST)
+        if change_token_expired(since):
+            return Response({"detail": "Sync token đã hết hạn, cần tải lại toàn bộ danh sách việc làm."},
+                            status=status.HTTP_410_GONE)
+
+        token, has_more, created, changed, removed = changes_since(since)
+        # Việc làm bị ẩn hoặc đã hết hạn sau khi thay đổi cũng được trả về như việc làm đã xóa
+        rows = list(job_values(Job.objects.filter(id__in=changed, is_active=True, expiration_date__gte=now())
+                               .order_by('id')))
+        visible = {row['id'] for row in rows}
+        removed = set(removed) | {job_id for job_id in changed if job_id not in visible}
+        if since_time is not None:
+            # Việc làm hết hạn không có trong nhật ký thay đổi
+            removed.update(expired_between(since_time, until))
+        data = project_jobs(rows, request)
+        return Response({
+            'token': sync_token(token, until),
+            'has_more': has_more,
+            'created': [job for job in data if job['id'] in created],
+            'updated': [job for job in data if job['id'] not in created],
+            'removed': sorted(removed),
+        })
 
-        paginator = JobPaginator()  # Tạo một đối tượng phân trang
-        page = paginator.paginate_queryset(jobs, request)  # Phân trang danh sách công việc
+    def id_page(self, job_ids):
+        # Phân trang trên danh sách id đã sắp xếp, chỉ tải đầy đủ các việc làm của trang hiện tại.
+        # Việc làm bị ẩn/hết hạn sau lần tính gần nhất được bỏ trước khi phân trang (một truy vấn chỉ lấy id),
+        # để trang không bị thiếu và count đúng
+        visible = set(Job.objects.filter(id__in=job_ids, is_active=True, expiration_date__gte=now())
+                      .values_list('id', flat=True))
+        paginator = JobPaginator()
+        page_ids = paginator.paginate_queryset([job_id for job_id in job_ids if job_id in visible], self.request)
+        position = {job_id: index for index, job_id in enumerate(page_ids)}
+        jobs = Job.objects.filter(id__in=page_ids)
 
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return paginator.get_paginated_response(serializer.data)
+        if self.use_fast_path():
+            rows = sorted(job_values(jobs), key=lambda row: position[row['id']])
+            return paginator.get_paginated_response(project_jobs(rows, self.request))
 
+        jobs = sorted(self.sparse(jobs), key=lambda job: position[job.id])
         serializer = self.get_serializer(jobs, many=True)
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=False, methods=['get'], url_path='nearby')
     def nearby_jobs(self, request):
@@ -353,22 +560,73 @@ class JobViewSet(viewsets.ModelViewSet):
         except ValueError:
             return Response({"error": "Tọa độ hoặc bán kính không hợp lệ"}, status=status.HTTP_400_BAD_REQUEST)
 
-        jobs = Job.objects.filter(is_active=True)  # Lọc công việc đang hoạt động
-        nearby_jobs = []
+        # geopy chỉ cần cho API này, import khi gọi để worker khởi động nhanh hơn
+        from geopy.distance import geodesic
 
-        for job in jobs:
-            if job.latitude is not None and job.longitude is not None:
-                job_location = (job.latitude, job.longitude)
+        # Chỉ lấy tọa độ để tính khoảng cách, dữ liệu đầy đủ được truy vấn sau
+        jobs = Job.objects.filter(is_active=True).values_list('id', 'latitude', 'longitude')
+        nearby_ids = []
+
+        for job_id, latitude, longitude in jobs:
+            if latitude is not None and longitude is not None:
+                job_location = (latitude, longitude)
                 user_location = (user_lat, user_lon)
                 distance = geodesic(user_location, job_location).kilometers
 
                 if distance <= max_distance:
-                    nearby_jobs.append(job)
+                    nearby_ids.append(job_id)
+
+        nearby_jobs = self.sparse(Job.objects.filter(id__in=nearby_ids))
 
         # Trả về danh sách công việc gần nhất
         serializer = self.get_serializer(nearby_jobs, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'], url_path='candidates')
+    @require_entitlement(CANDIDATE_MATCHING, CANDIDATE_MATCHING_REQUIRED)
+    def candidates(self, request, pk=None):
+        # Ứng viên phù hợp nhất với việc làm của nhà tuyển dụng: ?limit=20
+        job = Job.objects.filter(pk=pk, employer=request.user).first()
+        if job is None:
+            return Response({"detail": "Không tìm thấy việc làm"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), 100)
+        except ValueError:
+            return Response({"detail": "limit không hợp lệ"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'job': job.id, 'results': rank_candidates(job, limit)})
+
+    @action(detail=False, methods=['get'], url_path='clusters')
+    def clusters(self, request):
+        # Cụm việc làm trong khung nhìn bản đồ: ?south=&west=&north=&east=&zoom=
+        try:
+            south, west, north, east = (float(request.query_params[name])
+                                        for name in ('south', 'west', 'north', 'east'))
+            zoom = int(request.query_params.get('zoom', 10))
+        except (KeyError, ValueError):
+            return Response({"detail": "Vui lòng cung cấp south, west, north, east và zoom hợp lệ"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if south > north:
+            return Response({"detail": "south phải nhỏ hơn north"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(job_clusters(south, west, north, east, zoom))
+
+    @action(detail=False, methods=['get'], url_path='cluster_jobs')
+    def cluster_jobs(self, request):
+        # Danh sách việc làm của một cụm khi người dùng mở cụm: ?cell=<geohash>
+        cell = request.query_params.get('cell', '')
+        if not is_geohash(cell):
+            return Response({"detail": "cell không hợp lệ"}, status=status.HTTP_400_BAD_REQUEST)
+
+        jobs = self.sparse(Job.objects.filter(is_active=True, expiration_date__gte=now(),
+                                              geohash__startswith=cell).order_by('id'))
+        paginator = JobPaginator()
+        if self.use_fast_path():
+            page = paginator.paginate_queryset(job_values(jobs), request)
+            return paginator.get_paginated_response(project_jobs(page, request))
+        page = paginator.paginate_queryset(jobs, request)
+        return paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+
 
 class JobApplicationViewSet(viewsets.GenericViewSet, generics.UpdateAPIView, generics.RetrieveAPIView,
                             generics.DestroyAPIView):
@@ -392,11 +650,23 @@ class JobApplicationViewSet(viewsets.GenericViewSet, generics.UpdateAPIView, gen
             return [permissions.IsAuthenticated(), IsEmployer()]  # Hoặc quyền phù hợp cho nhà tuyển dụng
         return [permissions.AllowAny()]
 
-    @action(methods=['post'], url_path='apply_job', detail=True, permission_classes=[IsAuthenticated])
+    @action(methods=['post'], url_path='apply_job', detail=True, permission_classes=[IsAuthenticated],
+            throttle_classes=[ApplyUserThrottle])
     def apply_job(self, request, pk=None):
-        job = Job.objects.get(pk=pk)
         seeker = request.user  # Lấy đối tượng seeker từ người dùng hiện tại
 
+        # Client gửi lại request với cùng Idempotency-Key thì trả lại kết quả lần đầu
+        idempotency_key = get_idempotency_key(request)
+        fingerprint = request_fingerprint(request, pk)
+        if idempotency_key:
+            stored_response = get_stored_response(request, idempotency_key, fingerprint)
+            if stored_response is not None:
+                return stored_response
+
+        job = Job.objects.filter(pk=pk).first()
+        if job is None:
+            return Response({"detail": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+
         # Lấy dữ liệu từ yêu cầu
         cover_letter = request.data.get('cover_letter')
         cv = request.data.get('cv')
@@ -407,27 +677,51 @@ class JobApplicationViewSet(viewsets.GenericViewSet, generics.UpdateAPIView, gen
         if not cover_letter or not cv:
             return Response({"detail": "Cover letter and CV are required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        print("CV:", cv)
+        # Đã ứng tuyển rồi thì không tải CV lên lại
+        existing = JobApplication.objects.filter(job=job, seeker=seeker).first()
+        if existing is not None:
+            return self._already_applied(existing)
 
-        # Tạo đơn ứng tuyển mới
-        job_application = JobApplication.objects.create(
-            job=job,
-            seeker=seeker,
-            cover_letter=cover_letter,
-            cv=cv,
-            name=name,
-            email=email,
-            phone=phone
-        )
+        # Tạo đơn ứng tuyển mới, ràng buộc unique (job, seeker) chặn request song song
+        try:
+            with transaction.atomic():
+                job_application = JobApplication.objects.create(
+                    job=job,
+                    seeker=seeker,
+                    cover_letter=cover_letter,
+                    cv=cv,
+                    name=name,
+                    email=email,
+                    phone=phone
+                )
+        except IntegrityError:
+            existing = JobApplication.objects.filter(job=job, seeker=seeker).first()
+            if existing is None:
+                raise
+            if idempotency_key:
+                stored_response = get_stored_response(request, idempotency_key, fingerprint)
+                if stored_response is not None:
+                    return stored_response
+            return self._already_applied(existing)
 
         serializer = JobApplicationCreateSerializer(job_application)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        response = Response(serializer.data, status=status.HTTP_201_CREATED)
+        if idempotency_key:
+            store_response(request, idempotency_key, fingerprint, response)
+        return response
+
+    def _already_applied(self, application):
+        data = JobApplicationCreateSerializer(application).data
+        data['detail'] = "You have already applied for this job."
+        return Response(data, status=status.HTTP_409_CONFLICT)
 
     @action(detail=False, methods=['get'], url_path='seeker_apply')  # Danh sách công việc đã ứng tuyển / Seeker
     def seeker_apply(self, request):
         seeker = request.user
-        applications = JobApplication.objects.filter(seeker=seeker)
-        serializer = JobApplicationSerializer(applications, many=True)
+        fields, expand = parse_sparse_fields(request)
+        applications = sparse_queryset(JobApplication.objects.filter(seeker=seeker),
+                                       JobApplicationSerializer, fields, expand)
+        serializer = JobApplicationSerializer(applications, many=True, fields=fields, expand=expand)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'], url_path='employer_apply')  # Danh sách cv đã ứng tuyển / Employer
@@ -439,16 +733,19 @@ class JobApplicationViewSet(viewsets.GenericViewSet, generics.UpdateAPIView, gen
         jobs = Job.objects.filter(employer=employer)
 
         # Lấy các đơn ứng tuyển cho các công việc này
-        applications = JobApplication.objects.filter(job__in=jobs, status=CVStatus.OPEN)
+        fields, expand = parse_sparse_fields(request)
+        applications = sparse_queryset(JobApplication.objects.filter(job__in=jobs, status=CVStatus.OPEN),
+                                       FilterCVJobApplicationSerializer, fields, expand)
         # Phân trang các đơn ứng tuyển
         paginator = JobPaginator()
         paginated_applications = paginator.paginate_queryset(applications, request)
 
         # Nếu có đơn ứng tuyển được phân trang
         if paginated_applications is not None:
-            serializer = FilterCVJobApplicationSerializer(paginated_applications, many=True)
+            serializer = FilterCVJobApplicationSerializer(paginated_applications, many=True, fields=fields,
+                                                          expand=expand)
             return paginator.get_paginated_response(serializer.data)
-        serializer = FilterCVJobApplicationSerializer(applications, many=True)
+        serializer = FilterCVJobApplicationSerializer(applications, many=True, fields=fields, expand=expand)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'], url_path='employer_apply_new')  # Danh sách cv đã ứng tuyển / Employer
@@ -460,17 +757,21 @@ class JobApplicationViewSet(viewsets.GenericViewSet, generics.UpdateAPIView, gen
         jobs = Job.objects.filter(employer=employer)
 
         # Lấy các đơn ứng tuyển cho các công việc này
-        applications = JobApplication.objects.filter(job__in=jobs, status__in=[CVStatus.PENDING, CVStatus.CLOSED])
+        fields, expand = parse_sparse_fields(request)
+        applications = sparse_queryset(
+            JobApplication.objects.filter(job__in=jobs, status__in=[CVStatus.PENDING, CVStatus.CLOSED]),
+            FilterCVJobApplicationSerializer, fields, expand)
 
         paginator = JobPaginator()
         paginated_applications = paginator.paginate_queryset(applications, request)
 
         # Nếu có đơn ứng tuyển được phân trang
         if paginated_applications is not None:
-            serializer = FilterCVJobApplicationSerializer(paginated_applications, many=True)
+            serializer = FilterCVJobApplicationSerializer(paginated_applications, many=True, fields=fields,
+                                                          expand=expand)
             return paginator.get_paginated_response(serializer.data)
 
-        serializer = FilterCVJobApplicationSerializer(applications, many=True)
+        serializer = FilterCVJobApplicationSerializer(applications, many=True, fields=fields, expand=expand)
         return Response(serializer.data)
 
 
@@ -489,14 +790,21 @@ class SaveJobViewSet(viewsets.ViewSet):
             return Response({"detail": "Job ID is required"}, status=status.HTTP_400_BAD_REQUEST)
 
         user = request.user
-        job = Job.objects.get(id=job_id)
+        job = self._active_jobs().filter(id=job_id).first()
+        if job is None:
+            return Response({"detail": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
 
         # Check if the job is already in the list
         if SaveJob.objects.filter(seeker=user, job=job).exists():
             return Response({"detail": "Job is already in the list"}, status=status.HTTP_400_BAD_REQUEST)
 
         save_job = SaveJob(seeker=user, job=job)
-        save_job.save()
+        try:
+            with transaction.atomic():
+                save_job.save()
+        except IntegrityError:
+            # Request song song đã lưu trước (ràng buộc unique_save_job)
+            return Response({"detail": "Job is already in the list"}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = SaveJobSerializer(save_job)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -510,6 +818,50 @@ class SaveJobViewSet(viewsets.ViewSet):
         except SaveJob.DoesNotExist:
             return Response({"detail": "Job not found in the list"}, status=status.HTTP_404_NOT_FOUND)
 
+    def _active_jobs(self):
+        # Chỉ lưu được công việc đang hoạt động và chưa hết hạn
+        return Job.objects.filter(is_active=True, expiration_date__gte=now())
+
+    def _job_ids(self, request):
+        # Danh sách job_ids (số nguyên, không trùng), None nếu không hợp lệ
+        if not isinstance(request.data, dict):
+            return None
+        job_ids = request.data.get('job_ids')
+        if not isinstance(job_ids, list) or not job_ids or len(job_ids) > settings.SAVE_JOB_BULK_LIMIT:
+            return None
+        if not all(isinstance(job_id, int) and not isinstance(job_id, bool) for job_id in job_ids):
+            return None
+        return list(dict.fromkeys(job_ids))
+
+    @action(detail=False, methods=['post'], url_path='bulk_save')
+    def bulk_save(self, request):
+        job_ids = self._job_ids(request)
+        if job_ids is None:
+            return Response({"detail": f"job_ids phải là danh sách tối đa {settings.SAVE_JOB_BULK_LIMIT} id."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        existing = set(self._active_jobs().filter(id__in=job_ids).values_list('id', flat=True))
+        saved = [job_id for job_id in job_ids if job_id in existing]
+        # Công việc đã lưu trước đó được bỏ qua nhờ ràng buộc unique (seeker, job)
+        SaveJob.objects.bulk_create([SaveJob(seeker=request.user, job_id=job_id) for job_id in saved],
+                                    ignore_conflicts=True)
+        return Response({
+            'saved': saved,
+            'not_found': [job_id for job_id in job_ids if job_id not in existing],
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk_unsave')
+    def bulk_unsave(self, request):
+        job_ids = self._job_ids(request)
+        if job_ids is None:
+            return Response({"detail": f"job_ids phải là danh sách tối đa {settings.SAVE_JOB_BULK_LIMIT} id."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        saves = SaveJob.objects.filter(seeker=request.user, job_id__in=job_ids)
+        removed = set(saves.values_list('job_id', flat=True))
+        saves.delete()
+        return Response({'removed': [job_id for job_id in job_ids if job_id in removed]})
+
 
 class FollowViewSet(viewsets.ModelViewSet):
     queryset = Follow.objects.all()
@@ -555,7 +907,9 @@ class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=True, methods=['post'])
     def purchase(self, request, pk):
-        service = Service.objects.get(pk=pk)
+        service = Service.objects.filter(pk=pk).first()
+        if service is None:
+            return Response({"message": "Dịch vụ không tồn tại"}, status=status.HTTP_404_NOT_FOUND)
         user = request.user  # Người dùng đã xác thực
 
         # Kiểm tra thông tin hóa đơn
@@ -563,40 +917,41 @@ class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
         if not transaction_no:
             return Response({"message": "Mã giao dịch không hợp lệ"}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            bill = Billing.objects.get(reference_number=transaction_no)
-        except Billing.DoesNotExist:
-            return Response({"message": "Hóa đơn không tồn tại"}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Cập nhật thông tin hóa đơn
-        bill.result_payment = request.data.get("vnp_TransactionStatus")
-        bill.is_paid = bill.result_payment == "00"  # Kiểm tra trạng thái thanh toán
-        bill.transaction_id = transaction_no
-        pay_at_str = request.data.get("vnp_PayDate")
-
-        if pay_at_str:
-            bill.pay_at = datetime.strptime(pay_at_str, '%Y%m%d%H%M%S')
-        bill.save()
-
-        # Kiểm tra dịch vụ đã tồn tại
-        existing_service = EmployerService.objects.filter(user=user, service=service, is_active=True).first()
-
-        if existing_service:
-            # Cập nhật ngày kết thúc nếu dịch vụ đã hoạt động
-            existing_service.end_date = timezone.now() + timedelta(
-                days=30 * service.duration)  # Điều chỉnh thời gian nếu cần
-            existing_service.save()
+        # Khóa hóa đơn để các callback/retry đồng thời của cùng giao dịch xử lý lần lượt
+        with transaction.atomic():
+            bill = Billing.objects.select_for_update().filter(reference_number=transaction_no).first()
+            if bill is None:
+                return Response({"message": "Hóa đơn không tồn tại"}, status=status.HTTP_400_BAD_REQUEST)
+            if bill.pay_by_id and bill.pay_by_id != user.id:
+                return Response({"message": "Hóa đơn không thuộc về người dùng"}, status=status.HTTP_403_FORBIDDEN)
+
+            if hasattr(bill, 'service_purchase'):
+                # Giao dịch đã được xử lý trước đó, không gia hạn thêm
+                return Response({'status': 'Giao dịch đã được xử lý'}, status=status.HTTP_200_OK)
+
+            # Cập nhật thông tin hóa đơn
+            result_payment = request.data.get("vnp_TransactionStatus")
+            if result_payment:
+                bill.result_payment = result_payment
+                bill.is_paid = bill.is_paid or result_payment == "00"  # Kiểm tra trạng thái thanh toán
+            bill.transaction_id = transaction_no
+            pay_at_str = request.data.get("vnp_PayDate")
+
+            if pay_at_str:
+                bill.pay_at = datetime.strptime(pay_at_str, '%Y%m%d%H%M%S')
+            bill.save()
+
+            if not bill.is_paid:
+                return Response({"message": "Thanh toán không thành công"}, status=status.HTTP_400_BAD_REQUEST)
+            # Hóa đơn không ghi mã dịch vụ: chỉ áp dụng cho dịch vụ có giá đúng bằng số tiền đã thanh toán
+            if bill.amount != service.price:
+                return Response({"message": "Số tiền hóa đơn không khớp với giá dịch vụ"},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+            result, _ = apply_bill(bill, user.id, service)
+
+        if result == EXTENDED:
             return Response({'status': 'Dịch vụ đã được cập nhật'}, status=status.HTTP_200_OK)
-
-        # Tạo bản ghi EmployerService mới
-        end_date = timezone.now() + timedelta(days=30 * service.duration)  # Điều chỉnh thời gian nếu cần
-        EmployerService.objects.create(
-            user=user,
-            service=service,
-            end_date=end_date,
-            amount=service.price,
-        )
-
         return Response({'status': 'Dịch vụ đã được mua'}, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['get'])
@@ -612,21 +967,15 @@ class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+STATISTICS_REQUIRED = 'Bạn chưa mua dịch vụ "Thống kê" hoặc dịch vụ đã hết hạn.'
+
+
 class EmployerStatisticsViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]  # Chỉ cho phép người dùng đã xác thực
 
-    def _has_active_service(self, employer_id):
-        # Kiểm tra xem nhà tuyển dụng có dịch vụ với tên "Thống kê" và còn hoạt động không
-        active_service = EmployerService.objects.filter(
-            user_id=employer_id,
-            service__id=2,
-            is_active=True
-        ).exists()
-        return active_service
+    @require_entitlement(STATISTICS, STATISTICS_REQUIRED)
     def list(self, request):
         employer_id = request.user.id
-        if not self._has_active_service(employer_id):
-            return Response({'detail': 'Bạn chưa mua dịch vụ "Thống kê" hoặc dịch vụ đã hết hạn.'}, status=status.HTTP_403_FORBIDDEN)
         year = request.query_params.get('year')
 
         # Đếm số lượng công việc đang hoạt động (is_active = True)
@@ -643,26 +992,45 @@ class EmployerStatisticsViewSet(viewsets.ViewSet):
         if year:
             applications_per_month_query = applications_per_month_query.filter(created_date__year=year)
 
-        applications_per_month = applications_per_month_query \
-            .annotate(month=TruncMonth('created_date')) \
-            .values('month') \
-            .annotate(applications_count=Count('id')) \
-            .order_by('month')
+        # Cộng cả đơn ứng tuyển của các việc làm đã được lưu trữ
+        archived_applications_query = ArchivedJobApplication.objects.filter(job__employer_id=employer_id)
+        if year:
+            archived_applications_query = archived_applications_query.filter(created_date__year=year)
+
+        applications_by_month = {}
+        for query in (applications_per_month_query, archived_applications_query):
+            rows = query.annotate(month=TruncMonth('created_date')).values('month') \
+                .annotate(applications_count=Count('id')).order_by('month')
+            for row in rows:
+                applications_by_month[row['month']] = applications_by_month.get(row['month'], 0) + row['applications_count']
+        applications_per_month = [{'month': month, 'applications_count': count}
+                                  for month, count in sorted(applications_by_month.items())]
+
+        # Tổng lượt xem / lượt hiển thị các công việc của nhà tuyển dụng
+        counters = JobCounter.objects.filter(job__employer_id=employer_id).aggregate(
+            views=Coalesce(Sum('views'), 0), impressions=Coalesce(Sum('impressions'), 0))
+        archived = ArchivedJob.objects.filter(employer_id=employer_id).aggregate(
+            jobs=Count('id'), views=Coalesce(Sum('views'), 0), impressions=Coalesce(Sum('impressions'), 0))
+        counters['views'] += archived['views']
+        counters['impressions'] += archived['impressions']
         # Tạo dictionary thống kê
         statistics = {      # Tổng số công việc đã đăng
             'active_jobs': active_jobs_count,             # Số công việc đang hoạt động
             'expired_jobs': expired_jobs_count,           # Số công việc đã hết hạn
+            'archived_jobs': archived['jobs'],            # Số công việc đã chuyển vào kho lưu trữ
             'total_spent_on_services': total_spent_on_services,
-            'applications_per_month': list(applications_per_month)
+            'applications_per_month': list(applications_per_month),
+            'total_views': counters['views'],
+            'total_impressions': counters['impressions'],
+            'click_through_rate': click_through_rate(counters['views'], counters['impressions']),
         }
 
         return Response(statistics)
 
     @action(detail=False, methods=['get'])
+    @require_entitlement(STATISTICS, STATISTICS_REQUIRED)
     def applications_per_month(self, request):
         employer_id = request.user.id
-        if not self._has_active_service(employer_id):
-            return Response({'detail': 'Bạn chưa mua dịch vụ "Thống kê" hoặc dịch vụ đã hết hạn.'}, status=status.HTTP_403_FORBIDDEN)
 
         year = request.query_params.get('year')  # Lấy tham số năm từ request
         month = request.query_params.get('month')  # Lấy tham số tháng từ request
@@ -682,12 +1050,94 @@ class EmployerStatisticsViewSet(viewsets.ViewSet):
                 'jobapplication',
                 filter=Q(jobapplication__created_date__year=year) & Q(jobapplication__created_date__month=month) if month else
                 Q(jobapplication__created_date__year=year)
-            )
-        ).values('title', 'applications_count').order_by('title')
+            ),
+            views=Coalesce(F('counter__views'), 0),
+            impressions=Coalesce(F('counter__impressions'), 0),
+        ).values('title', 'applications_count', 'views', 'impressions').order_by('title')
+
+        # Việc làm đã lưu trữ, lọc theo cùng điều kiện
+        archived_jobs = ArchivedJob.objects.filter(employer_id=employer_id)
+        if year:
+            archived_jobs = archived_jobs.filter(created_date__year=year)
+        if month:
+            archived_jobs = archived_jobs.filter(created_date__month=month)
+        archived_counts = archived_jobs.annotate(
+            applications_count=Count(
+                'applications',
+                filter=Q(applications__created_date__year=year) & Q(applications__created_date__month=month) if month else
+                Q(applications__created_date__year=year)
+            ),
+        ).values('title', 'applications_count', 'views', 'impressions')
+
+        job_applications_counts = sorted(list(job_applications_counts) + list(archived_counts),
+                                         key=lambda row: row['title'])
+        for row in job_applications_counts:
+            row['click_through_rate'] = click_through_rate(row['views'], row['impressions'])
 
         return Response({
             'job_applications_counts': list(job_applications_counts)
         })
 
 
+class ArchivedJobViewSet(viewsets.ReadOnlyModelViewSet):
+    # Lịch sử tuyển dụng: việc làm đã chuyển vào kho lưu trữ của nhà tuyển dụng
+    serializer_class = ArchivedJobSerializer
+    pagination_class = JobPaginator
+    permission_classes = [permissions.IsAuthenticated, IsEmployer]
 
+    def get_queryset(self):
+        return ArchivedJob.objects.filter(employer=self.request.user) \
+            .annotate(applications_count=Count('applications')) \
+            .prefetch_related('technologies')
+
+    @action(detail=True, methods=['get'])
+    def applications(self, request, pk=None):
+        job = self.get_object()
+        applications = job.applications.select_related('seeker').order_by('-created_date')
+        paginator = JobPaginator()
+        page = paginator.paginate_queryset(applications, request)
+        serializer = ArchivedJobApplicationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def restore(self, request, pk=None):
+        job = self.get_object()
+        # Bắt buộc có hạn nộp mới ở tương lai, việc làm trong kho đều đã hết hạn
+        expiration_date = parse_datetime(request.data.get('expiration_date') or '')
+        if expiration_date is None:
+            return Response({"detail": "Cần ngày hết hạn mới (expiration_date) hợp lệ"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if is_naive(expiration_date):
+            expiration_date = make_aware(expiration_date)
+        try:
+            job = restore_job(job.pk, expiration_date)
+        except ValueError as error:
+            return Response({"detail": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(JobSerializer(job, context={'request': request}).data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def statistics(self, request):
+        jobs = ArchivedJob.objects.filter(employer=request.user)
+        totals = jobs.aggregate(jobs=Count('id'), views=Coalesce(Sum('views'), 0),
+                                impressions=Coalesce(Sum('impressions'), 0))
+        by_status = ArchivedJobApplication.objects.filter(job__in=jobs) \
+            .values('status').annotate(count=Count('id')).order_by()
+        return Response({
+            'archived_jobs': totals['jobs'],
+            'applications': {row['status'].name: row['count'] for row in by_status},
+            'total_views': totals['views'],
+            'total_impressions': totals['impressions'],
+            'click_through_rate': click_through_rate(totals['views'], totals['impressions']),
+        })
+
+
+class BatchViewSet(viewsets.ViewSet):
+    # Gộp nhiều request của client (vd: đồng bộ khi mở ứng dụng) vào một lần gọi
+    allow_in_batch = False
+    permission_classes = [permissions.IsAuthenticated]
+
+    def create(self, request):
+        operations, error = parse_operations(request.data, settings.BATCH_MAX_REQUESTS)
+        if error:
+            return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': run_batch(request, operations)})